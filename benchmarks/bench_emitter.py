@@ -0,0 +1,57 @@
+"""Benchmarks rendering a new pyproject.toml
+
+Prints the time taken to merge the extracted data of synthetic projects
+and serialize it, into a tomlkit document as done for existing files and
+into plain dicts serialized by the emitter as done for new ones.
+
+    python benchmarks/bench_emitter.py
+"""
+import pathlib
+import tempfile
+import timeit
+
+import corpus
+import tomlkit
+
+from tomlize import converter, emitter, merger
+
+REPEAT = 5
+
+
+def with_tomlkit(extracted: list) -> str:
+    config = tomlkit.TOMLDocument()
+    for data in extracted:
+        merger.add_data(config, data)
+    return tomlkit.dumps(config)
+
+
+def with_emitter(extracted: list) -> str:
+    config = {}
+    for data in extracted:
+        merger.add_data(config, data)
+    return emitter.dumps(config)
+
+
+def measure(function, extracted: list) -> float:
+    # Merging copies the data, so the same extraction is reused for every run
+    return min(timeit.repeat(lambda: function(extracted), number=1, repeat=REPEAT))
+
+
+def main():
+    print(f"{'size':>8} {'lines':>8} {'tomlkit':>10} {'emitter':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as root:
+        for name, size in corpus.SIZES.items():
+            setup_py = corpus.generate(pathlib.Path(root), name, size, pyproject=False)
+            extracted = [converter.extract(setup_py)]
+            rendered = with_emitter(extracted)
+            assert rendered == with_tomlkit(extracted)
+            baseline = measure(with_tomlkit, extracted)
+            elapsed = measure(with_emitter, extracted)
+            print(
+                f"{name:>8} {rendered.count(chr(10)):>8} {baseline:>10.5f}"
+                f" {elapsed:>10.5f} {baseline / elapsed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
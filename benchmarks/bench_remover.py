@@ -0,0 +1,53 @@
+"""Benchmarks removing code targets from large setup.py files
+
+Prints the time taken to remove keyword arguments while growing the
+file size and the number of targets independently, the time per line
+and per target should stay flat if the removal is linear.
+
+    python benchmarks/bench_remover.py
+"""
+import timeit
+
+from tomlize.setup_py.remover import CodeTarget, _remove_lines
+
+REPEAT = 5
+
+
+def generate(lines: int, targets: int) -> tuple:
+    """Generates a setup() call with one keyword per line"""
+    content = "import setuptools\nsetuptools.setup(\n"
+    content += "".join(f"    field_{i}='value_{i}',\n" for i in range(lines))
+    content += ")\n"
+    step = max(lines // max(targets, 1), 1)
+    code_targets = [
+        CodeTarget(2 + line, 0, 3 + line, 0) for line in range(0, lines, step)
+    ][:targets]
+    return content, code_targets
+
+
+def measure(lines: int, targets: int) -> float:
+    content, code_targets = generate(lines, targets)
+    return min(
+        timeit.repeat(
+            lambda: _remove_lines(content, code_targets), number=1, repeat=REPEAT
+        )
+    )
+
+
+def main():
+    print(
+        f"{'lines':>8} {'targets':>8} {'seconds':>10} {'us/line':>8} {'us/target':>9}"
+    )
+    for lines, targets in [
+        *[(lines, 100) for lines in (1_000, 10_000, 100_000)],
+        *[(100_000, targets) for targets in (1_000, 10_000, 100_000)],
+    ]:
+        elapsed = measure(lines, targets)
+        print(
+            f"{lines:>8} {targets:>8} {elapsed:>10.5f}"
+            f" {elapsed / lines * 1e6:>8.3f} {elapsed / targets * 1e6:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Generates synthetic projects to benchmark tomlize
+
+Each project is a folder with a setup.py, a README.md and optionally an
+existing pyproject.toml with tool configuration. The amount of entries
+in the list fields is configurable, from tiny declarative files to huge
+generated ones.
+
+    python benchmarks/corpus.py OUTPUT_DIR [--size huge] [--count 10]
+"""
+import argparse
+import dataclasses
+import pathlib
+import pprint
+
+
+@dataclasses.dataclass(frozen=True)
+class Size:
+    """Number of entries generated for each of the list fields"""
+
+    install_requires: int
+    classifiers: int
+    data_files: int
+    extras: int
+    tool_options: int
+
+
+SIZES = {
+    "tiny": Size(
+        install_requires=2, classifiers=2, data_files=0, extras=0, tool_options=0
+    ),
+    "small": Size(
+        install_requires=10, classifiers=10, data_files=5, extras=2, tool_options=10
+    ),
+    "medium": Size(
+        install_requires=100,
+        classifiers=50,
+        data_files=100,
+        extras=10,
+        tool_options=100,
+    ),
+    "large": Size(
+        install_requires=1_000,
+        classifiers=300,
+        data_files=1_000,
+        extras=50,
+        tool_options=500,
+    ),
+    "huge": Size(
+        install_requires=5_000,
+        classifiers=1_000,
+        data_files=5_000,
+        extras=200,
+        tool_options=2_000,
+    ),
+}
+
+
+def setup_kwargs(name: str, size: Size) -> dict:
+    return {
+        "name": name,
+        "version": "1.0.0",
+        "description": f"Synthetic project {name}",
+        "author": "John Doe",
+        "author_email": "john@doe.com",
+        "url": f"https://example.com/{name}",
+        "python_requires": ">=3.8",
+        "keywords": "synthetic, benchmark",
+        "classifiers": [
+            f"Topic :: Synthetic :: Category {i}" for i in range(size.classifiers)
+        ],
+        "install_requires": [
+            f"dependency-{i}>={i % 10}.{i % 7}" for i in range(size.install_requires)
+        ],
+        "extras_require": {
+            f"extra{i}": [f"extra-dependency-{i}-{j}" for j in range(5)]
+            for i in range(size.extras)
+        },
+        "data_files": [
+            (f"share/{name}/{i}", [f"data/{i}/file.txt"])
+            for i in range(size.data_files)
+        ],
+        "entry_points": {"console_scripts": [f"{name} = {name}.main:main"]},
+        "setup_requires": ["setuptools >= 70.0.0"],
+    }
+
+
+def setup_py_source(name: str, size: Size, declarative: bool = True) -> str:
+    """Source of a setup.py, declarative or needing to be executed"""
+    kwargs = pprint.pformat(setup_kwargs(name, size), indent=4, sort_dicts=False)
+    if declarative:
+        return f"import setuptools\n\nsetuptools.setup(**{kwargs})\n"
+    return (
+        "import setuptools\n\n\n"
+        f"def get_kwargs():\n    return {kwargs}\n\n\n"
+        "setuptools.setup(**get_kwargs())\n"
+    )
+
+
+def pyproject_source(size: Size) -> str:
+    """An existing pyproject.toml with unrelated tool configuration"""
+    lines = ["[tool.black]", "line-length = 88", "", "[tool.synthetic]"]
+    lines += [
+        f'option_{i} = "value {i}"  # comment {i}' for i in range(size.tool_options)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def generate(
+    root: pathlib.Path,
+    name: str,
+    size: Size,
+    declarative: bool = True,
+    pyproject: bool = True,
+) -> pathlib.Path:
+    """Writes a synthetic project to root/name, returns its setup.py"""
+    project = root / name
+    project.mkdir(parents=True, exist_ok=True)
+    project.joinpath("README.md").write_text(f"# {name}\n")
+    if pyproject:
+        project.joinpath("pyproject.toml").write_text(pyproject_source(size))
+    setup_py = project / "setup.py"
+    setup_py.write_text(setup_py_source(name, size, declarative))
+    return setup_py
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output", type=pathlib.Path)
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--exec", action="store_true", help="non declarative files")
+    args = parser.parse_args(argv)
+    for i in range(args.count):
+        generate(args.output, f"project{i}", SIZES[args.size], not args.exec)
+
+
+if __name__ == "__main__":
+    main()
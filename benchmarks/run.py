@@ -0,0 +1,201 @@
+"""Benchmarks each stage of a conversion on synthetic projects
+
+Runs every stage separately and end to end for projects of each size,
+writing the timings as JSON so runs from different commits can be
+compared:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json
+    python benchmarks/run.py --compare before.json after.json
+"""
+import argparse
+import ast
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import corpus
+import tomlkit
+
+from tomlize import merger, project
+from tomlize.setup_py import reader, remover, transformer
+
+MIN_RUNS = 3
+MAX_RUNS = 100
+MIN_TOTAL_TIME = 0.2  # seconds
+DEFAULT_THRESHOLD = 1.2
+
+
+def measure(func, setup=lambda: ()) -> dict:
+    """Times func(*setup()) until enough runs have been done"""
+    timings = []
+    while len(timings) < MAX_RUNS and (
+        len(timings) < MIN_RUNS or sum(timings) < MIN_TOTAL_TIME
+    ):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return {
+        "runs": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+    }
+
+
+def setup_targets(source: str) -> list:
+    """Code targets for every entry of the setup() arguments dict"""
+    tree = ast.parse(source)
+    kwargs = next(node for node in ast.walk(tree) if isinstance(node, ast.Dict))
+    return [
+        remover.CodeTarget(
+            key.lineno - 1, key.col_offset, value.end_lineno - 1, value.end_col_offset
+        )
+        for key, value in zip(kwargs.keys, kwargs.values)
+    ]
+
+
+STAGES = ["read", "transform", "parse", "merge", "remove", "dump", "end2end"]
+
+
+def transform(data: dict, project_root: pathlib.Path):
+    setup_requires = data.pop("setup_requires", [])
+    transformer._generate_build_metadata(setup_requires)
+    return transformer._transform_fields(data, project_root)
+
+
+def bench_case(setup_py: pathlib.Path, stages: list) -> dict:
+    """Times the requested stages, preparing only the inputs they need"""
+    root = setup_py.parent
+    source = setup_py.read_text()
+    pyproject = root / "pyproject.toml"
+    pyproject_text = pyproject.read_text()
+
+    def data():
+        return {
+            key: value["value"]
+            for key, value in reader.extract_setup_args(setup_py).items()
+        }
+
+    def result():
+        return transformer.extract(setup_py)
+
+    def merged():
+        doc = tomlkit.parse(pyproject_text)
+        merger.add_data(doc, result())
+        return doc
+
+    benchmarks = {
+        "read": lambda: measure(lambda: reader.extract_setup_args(setup_py)),
+        "transform": lambda: measure(
+            lambda data: transform(data, root), lambda: (data(),)
+        ),
+        "parse": lambda: measure(lambda: tomlkit.parse(pyproject_text)),
+        "merge": lambda: measure(
+            merger.add_data, lambda: (tomlkit.parse(pyproject_text), result())
+        ),
+        "remove": lambda: measure(
+            remover._remove_lines, lambda: (source, setup_targets(source))
+        ),
+        "dump": lambda: measure(tomlkit.dumps, lambda: (merged(),)),
+        "end2end": lambda: measure(lambda: project.render(setup_py, pyproject)),
+    }
+    return {stage: benchmarks[stage]() for stage in stages}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list, stages: list) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            for declarative in (True, False):
+                case = f"{size}-{'declarative' if declarative else 'exec'}"
+                setup_py = corpus.generate(
+                    pathlib.Path(tmp_dir), case, corpus.SIZES[size], declarative
+                )
+                for stage, timing in bench_case(setup_py, stages).items():
+                    results.append({"case": case, "stage": stage, **timing})
+                    print(
+                        f"{case:>20} {stage:>10} {timing['min'] * 1e3:>10.3f}ms",
+                        file=sys.stderr,
+                    )
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+
+
+def compare(before: dict, after: dict, threshold: float) -> bool:
+    """Prints the speed ratio of each benchmark, False if any regressed"""
+    previous = {(r["case"], r["stage"]): r["min"] for r in before["results"]}
+    ok = True
+    print(f"{'case':>20} {'stage':>10} {'before':>10} {'after':>10} {'ratio':>6}")
+    for result in after["results"]:
+        key = result["case"], result["stage"]
+        if key not in previous:
+            continue
+        ratio = result["min"] / previous[key]
+        flag = ""
+        if ratio > threshold:
+            ok = False
+            flag = " REGRESSION"
+        print(
+            f"{key[0]:>20} {key[1]:>10} {previous[key] * 1e3:>8.3f}ms"
+            f" {result['min'] * 1e3:>8.3f}ms {ratio:>6.2f}{flag}"
+        )
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes",
+        default="tiny,small,medium,large",
+        help="comma separated project sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help="comma separated stages (default: %(default)s)",
+    )
+    parser.add_argument("--output", type=pathlib.Path, default=None)
+    parser.add_argument(
+        "--compare", nargs=2, type=pathlib.Path, metavar=("BEFORE", "AFTER")
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="slowdown ratio considered a regression (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        before, after = (json.loads(path.read_text()) for path in args.compare)
+        sys.exit(0 if compare(before, after, args.threshold) else 1)
+
+    results = run(args.sizes.split(","), args.stages.split(","))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Converts many projects in parallel
+
+The files given in the same folder make up a project, its
+pyproject.toml is written next to them. Failures are isolated
+per project and reported once all of them have been processed.
+
+Alternatively, the data extracted from each project can be streamed
+as records, without rendering any pyproject.toml.
+
+Folders are walked by threads while projects are converted, so nothing
+is forked from the main process before the walk is over: workers are
+started without forking and, in a single process, inputs are collected
+first when setup.py is executed in forked children.
+"""
+import concurrent.futures
+import contextlib
+import dataclasses
+import functools
+import logging
+import multiprocessing
+import os
+import pathlib
+import sys
+import tempfile
+import typing
+
+from . import converter, discovery, merger, profiling, project
+from .options import Options
+from .report import CACHED, EXEC, STATIC, Report
+from .setup_py import forkserver
+
+
+@dataclasses.dataclass
+class Result:
+    """Outcome of converting a single project"""
+
+    input_file: pathlib.Path
+    error: typing.Optional[str] = None
+    changed: bool = False
+    diff: str = ""
+    report: Report = dataclasses.field(default_factory=Report)
+    profile: dict = dataclasses.field(default_factory=dict)
+
+
+def find_inputs(
+    paths: typing.Iterable[pathlib.Path], options: Options = None
+) -> typing.Iterator[list]:
+    """Yields the input files of each project, see `converter.project_inputs`
+
+    Directories are expanded into the projects found within them, which
+    are yielded as they are found, so conversions can start while the
+    folders are still being walked. Their inputs are the ones found by
+    the walk, ignored files are left out. Files are grouped by folder.
+    """
+    groups = {}
+    for path in paths:
+        if path.is_dir():
+            for found in discovery.find_projects([path]):
+                yield converter.project_inputs(
+                    found.project_file, options, names=found.inputs
+                )
+        else:
+            path = path.absolute()
+            groups.setdefault(path.parent, []).append(path)
+    for group in groups.values():
+        yield converter.project_inputs(group, options)
+
+
+def _needs_inputs_first(jobs: typing.Optional[int], options: Options) -> bool:
+    """Whether children are forked from this process, see the module docs"""
+    return jobs == 1 and (options.fork or options.limited)
+
+
+def _mp_context():
+    """Start method of workers that does not fork this process"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+@contextlib.contextmanager
+def _chdir(path: pathlib.Path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+@contextlib.contextmanager
+def _project_dir(input_file):
+    """Runs from the folder of input_file, an empty one if it is not on disk
+
+    Files not on disk (see `git`) are read through their path objects,
+    nothing is to be read from the current folder instead.
+    """
+    if isinstance(input_file, pathlib.Path):
+        with _chdir(input_file.parent):
+            yield
+        return
+    with tempfile.TemporaryDirectory() as empty, _chdir(empty):
+        yield
+
+
+class _WarningsHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+
+def extract_project(input_files, options: Options = None) -> dict:
+    """Returns the record of the data extracted from a project
+
+    input_files are the inputs of the project, as found by `find_inputs`.
+    The data of every input of the project is merged as it would be in
+    its pyproject.toml, which is not read nor written.
+    """
+    options = options or Options()
+    input_file = input_files[0]
+    record = {"path": str(input_file), "data": None, "warnings": [], "error": None}
+    handler = _WarningsHandler()
+    logging.getLogger().addHandler(handler)
+    try:
+        with _project_dir(input_file):
+            data = {}
+            for path in input_files:
+                merger.add_data(
+                    data,
+                    converter.extract(path, options),
+                    on_conflict=options.on_conflict,
+                )
+        record["data"] = data
+    except (Exception, SystemExit) as error:
+        record["error"] = str(error) or repr(error)
+    finally:
+        logging.getLogger().removeHandler(handler)
+    record["warnings"] = handler.messages
+    return record
+
+
+def iter_records(
+    input_files: typing.Iterable,
+    jobs: typing.Optional[int] = None,
+    options: Options = None,
+    extract: typing.Callable = extract_project,
+) -> typing.Iterator[dict]:
+    """Yields the record of each project as soon as it is extracted
+
+    Records are yielded in no particular order. Only a few projects per
+    worker are in flight at any time, so memory does not grow with the
+    number of projects. extract is called with each of input_files and
+    the options to get its record.
+    """
+    options = options or Options()
+    extract = functools.partial(extract, options=options)
+    if _needs_inputs_first(jobs, options):
+        input_files = list(input_files)
+    if jobs == 1:
+        yield from map(extract, input_files)
+        return
+    workers = jobs or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_mp_context(),
+        initializer=forkserver.preload if options.fork else None,
+    ) as executor:
+        pending = set()
+        for input_file in input_files:
+            if len(pending) >= max_in_flight:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                yield from (future.result() for future in done)
+            pending.add(executor.submit(extract, input_file))
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+
+def convert_project(
+    input_files,
+    options: Options = None,
+    dry_run: bool = False,
+    diff: bool = False,
+    profile: typing.Optional[dict] = None,
+    strip: bool = False,
+) -> Result:
+    """Converts a project, running from within its folder
+
+    input_files are the inputs of the project, as found by `find_inputs`.
+    With dry_run the pyproject.toml is not written, diff adds the changes
+    that are (or would be) done to the result. profile holds the arguments
+    of the `profiling.Profiler` used to profile the conversion, if any.
+    With strip the arguments migrated are removed from setup.py as well.
+    """
+    input_file = input_files[0]
+    result = Result(input_file)
+    profiler = None if profile is None else profiling.Profiler(**profile)
+    output_file = input_file.parent / "pyproject.toml"
+    label = os.path.relpath(output_file)
+    cwd = os.getcwd()
+    try:
+        with _chdir(input_file.parent), profiler or contextlib.nullcontext():
+            current, rendered = project.render(
+                input_files, output_file, options=options, report=result.report
+            )
+            stripped = project.strip(result.report) if strip else []
+            result.changed = current != rendered or any(
+                setup_py_current != content for _, setup_py_current, content in stripped
+            )
+            if diff:
+                result.diff = project.diff(current, rendered, label) + "".join(
+                    project.diff(
+                        setup_py_current, content, os.path.relpath(setup_py, cwd)
+                    )
+                    for setup_py, setup_py_current, content in stripped
+                )
+            if not dry_run:
+                project.write(output_file, rendered)
+                for setup_py, _, content in stripped:
+                    project.write(setup_py, content)
+    except (Exception, SystemExit) as error:
+        result.error = str(error) or repr(error)
+    if profiler is not None:
+        result.profile = profiler.report()
+    return result
+
+
+def run(
+    input_files: typing.Iterable,
+    jobs: typing.Optional[int] = None,
+    options: Options = None,
+    dry_run: bool = False,
+    diff: bool = False,
+    profile: typing.Optional[dict] = None,
+    strip: bool = False,
+) -> list:
+    options = options or Options()
+    convert = functools.partial(
+        convert_project,
+        options=options,
+        dry_run=dry_run,
+        diff=diff,
+        profile=profile,
+        strip=strip,
+    )
+    if _needs_inputs_first(jobs, options):
+        input_files = list(input_files)
+    if jobs == 1:
+        return [convert(project_files) for project_files in input_files]
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=_mp_context(),
+        # Workers act as the warm parent of the setup.py children they fork
+        initializer=forkserver.preload if options.fork else None,
+    ) as executor:
+        return list(executor.map(convert, input_files))
+
+
+def print_summary(results: list, dry_run: bool = False, file=None):
+    file = file or sys.stderr
+    failures = [result for result in results if result.error is not None]
+    for result in failures:
+        print(f"{result.input_file}: {result.error}", file=file)
+    if dry_run:
+        changed = [result for result in results if result.changed]
+        for result in changed:
+            print(f"{result.input_file}: pyproject.toml would change", file=file)
+        print(f"{len(changed)} projects would change", file=file)
+    evaluations = [
+        evaluation
+        for result in results
+        for evaluation in result.report.evaluations.values()
+    ]
+    print(
+        f"Converted {len(results) - len(failures)} projects, {len(failures)} failed"
+        f" ({evaluations.count(STATIC)} setup.py read statically,"
+        f" {evaluations.count(EXEC)} executed,"
+        f" {evaluations.count(CACHED)} from cache)",
+        file=file,
+    )
@@ -0,0 +1,196 @@
+"""Persistent cache of extraction results
+
+Results are addressed by the content of the input file, the content of
+every local file read while extracting it and the versions of tomlize
+and setuptools. Identical projects, even on different paths, share
+entries. The cache is bounded in size, evicting the least recently
+used entries first.
+
+Two kinds of files are stored:
+    - A manifest, keyed by the input and the versions, listing the
+      local files that were read during the extraction.
+    - The entry, keyed by the manifest key and the content of those files.
+
+Executed files can look for files without reading them, with
+`os.path.exists` for instance, so their entries are keyed by the names in
+the project folder as well.
+"""
+import contextlib
+import functools
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import typing
+
+MANIFEST_SUFFIX = ".manifest.json"
+ENTRY_SUFFIX = ".json"
+MISSING_FILE_HASH = "missing"
+# Bumped whenever the results stored change, in shape or in content
+FORMAT_VERSION = 4
+# Written by tomlize itself, not part of the listing of a project folder
+UNLISTED_FILES = {"pyproject.toml"}
+
+
+def _version(distribution: str) -> str:
+    try:
+        return importlib.metadata.version(distribution)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _hash_file(path: pathlib.Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except (FileNotFoundError, IsADirectoryError):
+        return MISSING_FILE_HASH
+
+
+class Cache:
+    """Cache of extraction results stored in a folder"""
+
+    def __init__(self, directory: pathlib.Path, max_size: int):
+        self.directory = pathlib.Path(directory)
+        self.max_size = max_size
+        self._size = None  # Computed lazily, then tracked on every write
+        self._versions = (
+            f"{FORMAT_VERSION}:{_version('tomlize')}:{_version('setuptools')}"
+        )
+
+    def get(self, input_file: pathlib.Path, extra_files=()) -> typing.Any:
+        """Returns the cached result for input_file, None if not present"""
+        manifest_key = self._manifest_key(input_file)
+        manifest = self._read(manifest_key + MANIFEST_SUFFIX)
+        if manifest is None:
+            return None
+        entry_key = self._entry_key(
+            manifest_key,
+            input_file.parent,
+            [*manifest["files"], *extra_files],
+            manifest["listed"],
+        )
+        entry = self._read(entry_key + ENTRY_SUFFIX)
+        return None if entry is None else entry["result"]
+
+    def put(
+        self,
+        input_file: pathlib.Path,
+        files_read,
+        result,
+        extra_files=(),
+        listed: bool = False,
+    ):
+        """Stores the result of extracting input_file
+
+        Only the files read within the project folder are part of the key,
+        others are expected to be covered by the versions. With listed, the
+        names in the project folder are part of the key as well.
+        """
+        project_root = input_file.parent.resolve()
+        relative_files = sorted(
+            {
+                os.path.relpath(path, project_root)
+                for path in files_read
+                if pathlib.Path(path).is_relative_to(project_root)
+                and pathlib.Path(path) != input_file.resolve()
+            }
+        )
+        try:
+            entry = json.dumps({"result": result})
+        except (TypeError, ValueError):
+            logging.debug("Not caching %s, the result is not serializable", input_file)
+            return
+        manifest_key = self._manifest_key(input_file)
+        entry_key = self._entry_key(
+            manifest_key, input_file.parent, [*relative_files, *extra_files], listed
+        )
+        self._write(entry_key + ENTRY_SUFFIX, entry)
+        self._write(
+            manifest_key + MANIFEST_SUFFIX,
+            json.dumps({"files": relative_files, "listed": listed}),
+        )
+
+    def _manifest_key(self, input_file: pathlib.Path) -> str:
+        digest = hashlib.sha256(self._versions.encode())
+        digest.update(input_file.name.encode())
+        digest.update(input_file.read_bytes())
+        return digest.hexdigest()
+
+    def _entry_key(
+        self, manifest_key: str, project_root: pathlib.Path, files, listed: bool
+    ) -> str:
+        digest = hashlib.sha256(manifest_key.encode())
+        for name in sorted(set(files)):
+            digest.update(f"{name}:{_hash_file(project_root / name)}".encode())
+        if listed:
+            digest.update(json.dumps(self._listing(project_root)).encode())
+        return digest.hexdigest()
+
+    def _listing(self, project_root: pathlib.Path) -> list:
+        """Names in the project folder, folders ending with a slash"""
+        cache_dir = self.directory.resolve()
+        with os.scandir(project_root) as it:
+            return sorted(
+                entry.name + "/" if entry.is_dir() else entry.name
+                for entry in it
+                if entry.name not in UNLISTED_FILES
+                and pathlib.Path(entry.path).resolve() != cache_dir
+            )
+
+    def _read(self, name: str) -> typing.Any:
+        path = self.directory / name
+        try:
+            content = path.read_text()
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(content)
+        except ValueError:
+            return None
+
+    def _write(self, name: str, content: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, suffix=".tmp", delete=False
+        ) as fp:
+            fp.write(content)
+        os.replace(fp.name, self.directory / name)
+        if self._size is None:
+            self._size = self._entries_size()
+        else:
+            self._size += len(content)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _entries(self) -> list:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _entries_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Removes the least recently used entries until 90% of the limit"""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_size * 0.9:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            self._size -= size
+
+
+@functools.lru_cache(maxsize=None)
+def get_cache(directory: pathlib.Path, max_size: int) -> Cache:
+    return Cache(directory, max_size)
@@ -1,8 +1,168 @@
 import argparse
+import os
 import pathlib
 
 
 def parse_args(args):
     parser = argparse.ArgumentParser()
-    parser.add_argument("input_file", type=pathlib.Path)
-    return parser.parse_args(args=args)
+    parser.add_argument(
+        "input_files",
+        nargs="+",
+        type=pathlib.Path,
+        metavar="input",
+        help="file to convert, files in the same folder being converted together,"
+        " or folder to search for projects to convert",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of projects converted in parallel (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="do not write pyproject.toml, exit with 1 if it would change",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="do not write pyproject.toml, print the changes as a unified diff",
+    )
+    parser.add_argument(
+        "--strip",
+        action="store_true",
+        help="remove the arguments of setup() migrated to pyproject.toml"
+        " from setup.py",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["toml", "jsonl"],
+        default="toml",
+        help="toml writes pyproject.toml files, jsonl prints the data extracted"
+        " from each project as a JSON line instead (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--git-ref",
+        action="append",
+        dest="git_refs",
+        default=None,
+        metavar="REF",
+        help="read the projects of the input folders from git at REF instead of"
+        " the working tree, printing a record per ref (can be repeated, needs"
+        " --format jsonl)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running, updating pyproject.toml whenever the inputs change",
+    )
+    parser.add_argument(
+        "--on-conflict",
+        choices=["error", "keep", "overwrite"],
+        default="error",
+        help="what to do with values that differ from the existing ones"
+        " (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-tools",
+        action="store_false",
+        dest="tools",
+        help="do not convert the configuration of the tools next to the project"
+        " files (tox.ini, .flake8, pytest.ini, mypy.ini, .coveragerc, .isort.cfg)",
+    )
+    parser.add_argument(
+        "--requirements",
+        action="store_true",
+        help="convert the requirements*.txt files next to the project files"
+        " into dependencies and optional dependencies",
+    )
+    parser.add_argument(
+        "--fork-server",
+        action="store_true",
+        help="import setuptools once and execute each setup.py in a forked child",
+    )
+    parser.add_argument(
+        "--stub-imports",
+        action="store_true",
+        help="replace the modules imported by setup.py that are not installed"
+        " with stubs, ignoring the arguments of setup() derived from them",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="stop executing a setup.py after this wall-clock time",
+    )
+    parser.add_argument(
+        "--cpu-limit",
+        type=int,
+        default=None,
+        metavar="SECONDS",
+        help="stop executing a setup.py after this CPU time",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=None,
+        metavar="MiB",
+        help="maximum address space of the process executing a setup.py",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        default=None,
+        help="folder where extraction results are cached across runs",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=None,
+        metavar="MiB",
+        help="maximum size of the cache (default: 100)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time spent in each stage of the conversion",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=pathlib.Path,
+        default=None,
+        metavar="FILE",
+        help="profile the functions and peak memory of each stage as well,"
+        " and write it all to FILE as JSON",
+    )
+    parsed_args = parser.parse_args(args=args)
+    if parsed_args.fork_server and not hasattr(os, "fork"):
+        parser.error("--fork-server is not supported on this platform")
+    limited = any(
+        limit is not None
+        for limit in (
+            parsed_args.timeout,
+            parsed_args.cpu_limit,
+            parsed_args.memory_limit,
+        )
+    )
+    if limited and not hasattr(os, "fork"):
+        parser.error("resource limits are not supported on this platform")
+    if parsed_args.format == "jsonl" and (
+        parsed_args.check or parsed_args.diff or parsed_args.watch
+    ):
+        parser.error(
+            "--format jsonl cannot be combined with --check, --diff or --watch"
+        )
+    if parsed_args.git_refs and parsed_args.format != "jsonl":
+        parser.error("--git-ref needs --format jsonl")
+    if parsed_args.strip and (parsed_args.watch or parsed_args.format == "jsonl"):
+        parser.error("--strip cannot be combined with --watch or --format jsonl")
+    if parsed_args.watch and (parsed_args.check or parsed_args.diff):
+        parser.error("--watch cannot be combined with --check or --diff")
+    if parsed_args.watch and (
+        len(parsed_args.input_files) > 1 or parsed_args.input_files[0].is_dir()
+    ):
+        parser.error("--watch needs a single file to convert")
+    return parsed_args
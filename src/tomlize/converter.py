@@ -1,21 +1,134 @@
+import fnmatch
+import os
 import pathlib
+import typing
 
 import tomlkit
 
 from tomlize.exceptions import ConversionError
 
-from . import merger, setup_py
+from . import merger, profiling, requirements_files, setup_cfg, setup_py, tool_configs
+from .options import Options
+from .report import Report
 
-CONVERTERS = {"setup.py": setup_py.extract}
+# Files defining a project, only the first one found in a folder is converted
+PROJECT_CONVERTERS = {"setup.py": setup_py.extract, "setup.cfg": setup_cfg.extract}
+# Files holding the configuration of tools, converted along with the project
+TOOL_CONVERTERS = {name: tool_configs.extract for name in tool_configs.SECTIONS_MAPPING}
+# Keys can be glob patterns, matched when no name matches exactly
+CONVERTERS = {
+    **PROJECT_CONVERTERS,
+    **TOOL_CONVERTERS,
+    requirements_files.PATTERN: requirements_files.extract,
+}
+
+
+def _find_converter(name: str):
+    if name in CONVERTERS:
+        return CONVERTERS[name]
+    for pattern, converter in CONVERTERS.items():
+        if fnmatch.fnmatchcase(name, pattern):
+            return converter
+    return None
+
+
+def is_input(name: str) -> bool:
+    """Whether files with this name can be converted"""
+    return _find_converter(name) is not None
+
+
+def _as_path(path):
+    """Paths not on disk (see `git`) are used as they are"""
+    return pathlib.Path(path) if isinstance(path, (str, os.PathLike)) else path
+
+
+def project_inputs(
+    input_files, options: Options = None, names: typing.Iterable[str] = None
+) -> list:
+    """Returns the inputs of a project, project file first
+
+    input_files is a path or the paths of the files given for a project,
+    the files related to its project file that were not given follow.
+    names are passed to `find_related_files`.
+    """
+    if isinstance(input_files, (str, os.PathLike)):
+        input_files = [input_files]
+    input_files = sorted(
+        dict.fromkeys(_as_path(path) for path in input_files),
+        key=lambda path: path.name not in PROJECT_CONVERTERS,
+    )
+    related = find_related_files(input_files[0], options, names)
+    return [*input_files, *(path for path in related if path not in input_files)]
+
+
+def find_related_files(
+    input_file: pathlib.Path,
+    options: Options = None,
+    names: typing.Iterable[str] = None,
+) -> list:
+    """Returns the files next to a project file to convert along with it
+
+    names are those of the files in the folder, as found when walking
+    it. Otherwise the folder is scanned once, whatever the number of
+    files supported.
+    """
+    options = options or Options()
+    if input_file.name not in PROJECT_CONVERTERS:
+        return []
+    if names is not None:
+        names = set(names)
+    elif isinstance(input_file, pathlib.Path):
+        with os.scandir(input_file.parent) as it:
+            names = {entry.name for entry in it if entry.is_file()}
+    else:
+        names = {path.name for path in input_file.parent.iterdir() if path.is_file()}
+    related = []
+    if options.requirements:
+        found = sorted(
+            filter(requirements_files.is_requirements_file, names),
+            key=lambda name: (name != requirements_files.DEPENDENCIES_FILE, name),
+        )
+        related.extend(
+            requirements_files.not_included(
+                [input_file.parent / name for name in found]
+            )
+        )
+    if options.tools:
+        related.extend(
+            input_file.parent / name for name in TOOL_CONVERTERS if name in names
+        )
+    return related
+
+
+def extract(
+    input_file: pathlib.Path, options: Options = None, report: Report = None
+) -> dict:
+    """Returns the pyproject data of input_file, without merging it"""
+    converter = _find_converter(input_file.name)
+    if converter is None:
+        raise ConversionError(f"Unrecognized input file: {input_file.name}")
+    return converter(input_file, options=options or Options(), report=report)
 
 
 def convert(
-    input_file: pathlib.Path, config: tomlkit.TOMLDocument
+    input_files: typing.Union[pathlib.Path, typing.Iterable[pathlib.Path]],
+    config: tomlkit.TOMLDocument,
+    options: Options = None,
+    report: Report = None,
 ) -> tomlkit.TOMLDocument:
-    try:
-        converter = CONVERTERS[input_file.name]
-    except KeyError:
-        raise ConversionError(f"Unrecognized input file: {input_file.name}") from None
-    data = converter(input_file)
-    merger.add_data(config, data)
+    """Merges the data of one or several input files into config
+
+    Every file is extracted before anything is merged, so config is left
+    untouched if any of them fails.
+    """
+    options = options or Options()
+    if isinstance(input_files, (str, os.PathLike)):
+        input_files = [input_files]
+    extracted = [
+        extract(input_file, options=options, report=report)
+        for input_file in input_files
+    ]
+    with profiling.stage("merge"):
+        for data in extracted:
+            merger.add_data(config, data, on_conflict=options.on_conflict)
     return config
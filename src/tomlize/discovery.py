@@ -0,0 +1,204 @@
+"""Finds the projects within folders
+
+Folders are listed with `os.scandir`, walking subtrees in parallel
+threads. Folders ignored by git, virtualenvs and well known build and
+cache folders are not descended into. Projects are yielded as soon as
+they are found, so they can be converted while the walk goes on.
+"""
+import concurrent.futures
+import dataclasses
+import os
+import pathlib
+import re
+import typing
+
+from . import converter
+
+GITIGNORE = ".gitignore"
+# Folders never containing projects of their own
+JUNK_NAMES = {
+    ".git",
+    ".hg",
+    ".svn",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    ".eggs",
+    ".mypy_cache",
+    ".pytest_cache",
+    "__pycache__",
+    "node_modules",
+    "site-packages",
+    "build",
+    "dist",
+}
+JUNK_SUFFIXES = (".egg-info",)
+# Present at the root of virtualenvs, whatever their name
+VIRTUALENV_MARKER = "pyvenv.cfg"
+
+
+@dataclasses.dataclass(frozen=True)
+class Project:
+    """Folder with a project file, and the names of the inputs within it"""
+
+    root: pathlib.Path
+    inputs: tuple
+
+    @property
+    def project_file(self) -> pathlib.Path:
+        return self.root / self.inputs[0]
+
+
+def _translate(pattern: str) -> str:
+    """Regular expression for a gitignore glob"""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex, i = regex + "(?:.*/)?", i + 3
+        elif pattern.startswith("**", i):
+            regex, i = regex + ".*", i + 2
+        elif pattern[i] == "*":
+            regex, i = regex + "[^/]*", i + 1
+        elif pattern[i] == "?":
+            regex, i = regex + "[^/]", i + 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            regex, i = regex + pattern[i : end + 1].replace("[!", "[^"), end + 1
+        else:
+            regex, i = regex + re.escape(pattern[i]), i + 1
+    return regex
+
+
+@dataclasses.dataclass(frozen=True)
+class _Rule:
+    base: str
+    regex: re.Pattern
+    negated: bool
+    dir_only: bool
+    anchored: bool
+
+
+class _Ignore:
+    """Rules of the .gitignore files that apply to a folder, last match wins"""
+
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+
+    def extend(self, directory: str, content: str) -> "_Ignore":
+        rules = list(self.rules)
+        for line in content.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            line = line.removeprefix("!")
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            regex = re.compile(_translate(line.lstrip("/")) + r"\Z")
+            rules.append(_Rule(directory, regex, negated, dir_only, anchored))
+        return _Ignore(rules)
+
+    def match(self, path: str, is_dir: bool) -> bool:
+        ignored = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if not path.startswith(rule.base + os.sep):
+                continue
+            relative = path[len(rule.base) + 1 :].replace(os.sep, "/")
+            target = relative if rule.anchored else relative.rpartition("/")[2]
+            if rule.regex.match(target):
+                ignored = not rule.negated
+        return ignored
+
+
+def _read_gitignore(directory: str) -> typing.Optional[str]:
+    try:
+        with open(os.path.join(directory, GITIGNORE), encoding="utf-8") as fp:
+            return fp.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _ancestors_ignore(directory: str) -> _Ignore:
+    """Rules of the .gitignore files above directory, up to the repository root"""
+    ancestors = []
+    while not os.path.exists(os.path.join(directory, ".git")):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return _Ignore()  # Not within a repository
+        ancestors.append(parent)
+        directory = parent
+    ignore = _Ignore()
+    for ancestor in reversed(ancestors):
+        content = _read_gitignore(ancestor)
+        if content is not None:
+            ignore = ignore.extend(ancestor, content)
+    return ignore
+
+
+def _is_junk(name: str) -> bool:
+    return name in JUNK_NAMES or name.endswith(JUNK_SUFFIXES)
+
+
+def _scan(directory: str, ignore: _Ignore) -> tuple:
+    """Returns the project in directory, if any, and the folders to walk"""
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return None, []
+    files = {entry.name for entry in entries if entry.is_file()}
+    if VIRTUALENV_MARKER in files:
+        return None, []
+    if GITIGNORE in files:
+        content = _read_gitignore(directory)
+        if content is not None:
+            ignore = ignore.extend(directory, content)
+
+    inputs = [
+        name
+        for name in sorted(files)
+        if converter.is_input(name)
+        and not ignore.match(os.path.join(directory, name), is_dir=False)
+    ]
+    project_files = [name for name in converter.PROJECT_CONVERTERS if name in inputs]
+    project = None
+    if project_files:
+        others = [name for name in inputs if name not in project_files]
+        project = Project(pathlib.Path(directory), (*project_files, *others))
+    subdirectories = [
+        entry.path
+        for entry in entries
+        if entry.is_dir(follow_symlinks=False)
+        and not _is_junk(entry.name)
+        and not ignore.match(entry.path, is_dir=True)
+    ]
+    return project, [(subdirectory, ignore) for subdirectory in subdirectories]
+
+
+def find_projects(
+    paths: typing.Iterable[pathlib.Path], workers: typing.Optional[int] = None
+) -> typing.Iterator[Project]:
+    """Yields the projects within paths as they are found, in no particular order"""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = set()
+        for path in paths:
+            directory = os.path.abspath(path)
+            pending.add(executor.submit(_scan, directory, _ancestors_ignore(directory)))
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                project, subdirectories = future.result()
+                for subdirectory, ignore in subdirectories:
+                    pending.add(executor.submit(_scan, subdirectory, ignore))
+                if project is not None:
+                    yield project
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
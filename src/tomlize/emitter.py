@@ -0,0 +1,106 @@
+"""Serializes plain dicts to TOML text
+
+Used for new pyproject.toml files, when there is no formatting to
+preserve. The data is written out in a single pass, without building
+tomlkit items for each value, in the layout tomlkit would give it:
+values first, then the tables, tables holding only tables are implied
+by their children, and lists of tables become arrays of tables.
+
+Values that are tomlkit items keep their own representation, anything
+that is not supported is left to tomlkit, which raises the same errors
+it would when adding it to a document.
+"""
+import collections.abc
+import re
+import typing
+
+import tomlkit
+import tomlkit.items
+
+_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+\Z")
+_ESCAPED = re.compile(r'[\x00-\x1f"\\\x7f]')
+_ESCAPES = {"\b": "\\b", "\t": "\\t", "\n": "\\n", "\f": "\\f", "\r": "\\r"}
+_ESCAPES.update({'"': '\\"', "\\": "\\\\"})
+
+
+def _escape(match: re.Match) -> str:
+    char = match.group()
+    return _ESCAPES.get(char) or f"\\u{ord(char):04x}"
+
+
+def _string(value: str) -> str:
+    return '"' + _ESCAPED.sub(_escape, value) + '"'
+
+
+def _key(key: str) -> str:
+    if not isinstance(key, str):
+        raise TypeError("Keys must be strings")
+    return key if _BARE_KEY.match(key) else _string(key)
+
+
+def _is_table(value) -> bool:
+    return isinstance(value, collections.abc.Mapping) and not isinstance(
+        value, tomlkit.items.InlineTable
+    )
+
+
+def _is_array_of_tables(value) -> bool:
+    return (
+        isinstance(value, (list, tuple))
+        and not isinstance(value, tomlkit.items.Array)
+        and bool(value)
+        and all(_is_table(item) for item in value)
+    )
+
+
+def _value(value) -> str:
+    """Inline representation of a value"""
+    if isinstance(value, tomlkit.items.Item):
+        return value.as_string()
+    if isinstance(value, str):
+        return _string(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_value(item) for item in value) + "]"
+    if isinstance(value, collections.abc.Mapping):
+        items = ", ".join(f"{_key(k)} = {_value(v)}" for k, v in value.items())
+        return "{" + items + "}"
+    return tomlkit.item(value).as_string()
+
+
+def _table(path: tuple, table, array: bool = False) -> typing.Iterator[str]:
+    values, tables = [], []
+    for key, value in table.items():
+        if _is_table(value) or _is_array_of_tables(value):
+            tables.append((key, value))
+        else:
+            values.append((key, value))
+    # Tables only holding tables are implied by their children
+    if path and (values or not tables or array):
+        header = ".".join(_key(part) for part in path)
+        yield f"[[{header}]]\n" if array else f"[{header}]\n"
+    for key, value in values:
+        yield f"{_key(key)} = {_value(value)}\n"
+    for key, value in tables:
+        if _is_table(value):
+            yield from _table((*path, key), value)
+        else:
+            for item in value:
+                yield from _table((*path, key), item, array=True)
+
+
+def iter_lines(data: collections.abc.Mapping) -> typing.Iterator[str]:
+    """Yields the lines of the TOML document for data"""
+    first = True
+    for line in _table((), data):
+        if line.startswith("[") and not first:
+            yield "\n"
+        first = False
+        yield line
+
+
+def dumps(data: collections.abc.Mapping) -> str:
+    return "".join(iter_lines(data))
@@ -4,6 +4,9 @@ class FailedToParseError(Exception):
         self.error = error
         super().__init__(f"Failed to parse {filename}: {error!r}")
 
+    def __reduce__(self):
+        return type(self), (self.filename, self.error)
+
 
 class ConversionError(Exception):
     """Error during file conversion"""
@@ -0,0 +1,259 @@
+"""Converts projects from the objects of a git repository
+
+Files are read from the commit a ref points to, without checking it out,
+through a `git cat-file --batch` process kept running for each repository,
+whatever folders of it are converted (one per process, as workers and
+forked children cannot share it). Paths
+within a commit are `GitPath` objects, which offer the part of the
+`pathlib.Path` interface the converters use. Executed setup.py files can
+only `open()` files through them, they run from an empty folder so
+nothing is read from the working tree by mistake.
+"""
+import atexit
+import dataclasses
+import errno
+import functools
+import io
+import os
+import pathlib
+import posixpath
+import subprocess
+import threading
+import typing
+
+from . import batch, converter
+from .options import Options
+
+DIRECTORY_MODE = "40000"
+FILE_MODES = ("100644", "100755")
+
+
+class GitError(Exception):
+    """The objects of a repository could not be read"""
+
+
+class CatFile:
+    """A `git cat-file --batch` process reading objects of a repository"""
+
+    def __init__(self, repository: pathlib.Path):
+        self.repository = repository
+        self._lock = threading.Lock()
+        try:
+            self._process = subprocess.Popen(
+                ["git", "-C", os.fspath(repository), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise GitError(f"Unable to run git: {e}") from None
+
+    def read(self, name: str) -> typing.Optional[tuple]:
+        """Returns the id, type and content of an object, None if missing
+
+        name is anything git can resolve, as `REF:PATH`.
+        """
+        if "\n" in name:
+            return None
+        with self._lock:
+            try:
+                self._process.stdin.write(name.encode() + b"\n")
+                self._process.stdin.flush()
+                header = self._process.stdout.readline()
+            except BrokenPipeError:
+                header = b""
+            if not header:
+                raise GitError(f"git cat-file exited reading {self.repository}")
+            if header.endswith((b" missing\n", b" ambiguous\n")):
+                return None
+            object_id, object_type, size = header.split()
+            # The content is followed by a newline
+            content = self._process.stdout.read(int(size) + 1)[:-1]
+        return object_id.decode(), object_type.decode(), content
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.wait()
+
+
+_processes = {}
+
+
+def cat_file(repository: pathlib.Path) -> CatFile:
+    """The process reading the objects of repository, started once"""
+    key = (os.getpid(), repository)
+    if key not in _processes:
+        _processes[key] = CatFile(repository)
+    return _processes[key]
+
+
+@atexit.register
+def _close_processes():
+    for (pid, _), process in _processes.items():
+        if pid == os.getpid():
+            process.close()
+
+
+@functools.lru_cache(maxsize=1024)
+def _tree(repository: pathlib.Path, revision: str, path: str) -> dict:
+    """Modes of the entries of a folder, by name, empty if not a folder"""
+    found = cat_file(repository).read(f"{revision}:{path}")
+    if found is None or found[1] != "tree":
+        return {}
+    object_id, _, content = found
+    id_size = len(object_id) // 2  # Binary in trees, sha1 or sha256
+    entries, position = {}, 0
+    while position < len(content):
+        end = content.index(b"\0", position)
+        mode, _, name = content[position:end].partition(b" ")
+        entries[os.fsdecode(name)] = mode.decode()
+        position = end + 1 + id_size
+    return entries
+
+
+class GitPath:
+    """Path of a file or folder in a revision of a repository
+
+    revision should be a commit id, the objects read are then cached.
+    """
+
+    def __init__(self, repository: pathlib.Path, revision: str, path: str = ""):
+        self.repository = repository
+        self.revision = revision
+        self.path = path
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    @property
+    def parent(self) -> "GitPath":
+        return GitPath(self.repository, self.revision, posixpath.dirname(self.path))
+
+    def joinpath(self, *parts) -> "GitPath":
+        path = posixpath.normpath(posixpath.join(self.path, *map(str, parts)))
+        return GitPath(self.repository, self.revision, "" if path == "." else path)
+
+    def __truediv__(self, part) -> "GitPath":
+        return self.joinpath(part)
+
+    def _mode(self) -> typing.Optional[str]:
+        if not self.path:
+            return DIRECTORY_MODE
+        return _tree(self.repository, self.revision, self.parent.path).get(self.name)
+
+    def exists(self) -> bool:
+        return self._mode() is not None
+
+    def is_file(self) -> bool:
+        return self._mode() in FILE_MODES
+
+    def is_dir(self) -> bool:
+        return self._mode() == DIRECTORY_MODE
+
+    def iterdir(self) -> typing.Iterator["GitPath"]:
+        for name in _tree(self.repository, self.revision, self.path):
+            yield self / name
+
+    def read_bytes(self) -> bytes:
+        found = None
+        if self.is_file():
+            found = cat_file(self.repository).read(f"{self.revision}:{self.path}")
+        if found is None:
+            raise FileNotFoundError(errno.ENOENT, "No such file in git", str(self))
+        return found[2]
+
+    def read_text(self, encoding=None, errors=None) -> str:
+        return self.read_bytes().decode(encoding or "utf-8", errors or "strict")
+
+    def open(self, mode="r", encoding=None, errors=None):
+        if any(char in mode for char in "wax+"):
+            raise PermissionError(errno.EACCES, "Files in git are read only", str(self))
+        if "b" in mode:
+            return io.BytesIO(self.read_bytes())
+        return io.StringIO(self.read_text(encoding, errors))
+
+    def __eq__(self, other):
+        if not isinstance(other, GitPath):
+            return NotImplemented
+        return (self.repository, self.revision, self.path) == (
+            other.repository,
+            other.revision,
+            other.path,
+        )
+
+    def __hash__(self):
+        return hash((self.repository, self.revision, self.path))
+
+    def __str__(self):
+        return f"{self.revision}:{self.path}"
+
+    def __repr__(self):
+        return f"GitPath({str(self.repository)!r}, {str(self)!r})"
+
+
+@functools.lru_cache(maxsize=None)
+def _location(folder: pathlib.Path) -> tuple:
+    """Root of the repository of folder and the path of folder within it
+
+    Folders of the same repository share the root, and so the process
+    reading its objects.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "-C", os.fspath(folder), "rev-parse"]
+            + ["--show-toplevel", "--show-prefix"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.strip()) from None
+    except OSError as e:
+        raise GitError(f"Unable to run git: {e}") from None
+    root, prefix = output.split("\n")[:2]
+    return pathlib.Path(root), prefix.rstrip("/")
+
+
+def find_project(folder: pathlib.Path, ref: str) -> tuple:
+    """Returns the commit ref points to and the project file of folder in it"""
+    # Fails first, with the error of git, if folder is not in a repository
+    repository, prefix = _location(folder)
+    found = cat_file(repository).read(f"{ref}^{{commit}}")
+    if found is None:
+        raise GitError(f"Unknown revision {ref!r}")
+    commit = found[0]
+    root = GitPath(repository, commit, prefix)
+    for name in converter.PROJECT_CONVERTERS:
+        if (root / name).is_file():
+            return commit, root / name
+    raise GitError(f"No project file found in {ref}:{root.path}")
+
+
+def extract_ref(target: tuple, options: Options = None) -> dict:
+    """Returns the record of the project of a folder at a ref
+
+    target is the folder, in a repository, and the ref. The record is
+    the one of `batch.extract_project`, with the ref and its commit.
+    """
+    folder, ref = target
+    # Entries are keyed by the files on disk, there are none
+    options = dataclasses.replace(options or Options(), cache_dir=None)
+    record = {"path": None, "repository": str(folder), "ref": ref, "commit": None}
+    try:
+        # Projects are extracted from another folder
+        record["commit"], project_file = find_project(folder.absolute(), ref)
+        input_files = converter.project_inputs([project_file], options)
+    except GitError as error:
+        return {**record, "data": None, "warnings": [], "error": str(error)}
+    return {**record, **batch.extract_project(input_files, options)}
+
+
+def iter_records(
+    folders: typing.Iterable[pathlib.Path],
+    refs: typing.Iterable[str],
+    jobs: typing.Optional[int] = None,
+    options: Options = None,
+) -> typing.Iterator[dict]:
+    """Yields the record of each folder at each ref, in no particular order"""
+    targets = ((pathlib.Path(folder), ref) for folder in folders for ref in refs)
+    return batch.iter_records(targets, jobs=jobs, options=options, extract=extract_ref)
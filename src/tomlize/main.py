@@ -1,33 +1,202 @@
+"""Command line entry point
+
+Only what is needed to parse the arguments is imported eagerly, the
+conversion machinery is imported once a stage needs it, so `--help` and
+usage errors start fast.
+"""
+import contextlib
 import pathlib
 import sys
 
-import coloredlogs
-import tomlkit
-
-from . import converter
 from .cli import parse_args
-from .exceptions import ConversionError
+
+
+def _is_batch(args) -> bool:
+    """Whether the inputs make up several projects, files in a folder being one"""
+    folders = {input_file.absolute().parent for input_file in args.input_files}
+    return len(folders) > 1 or any(
+        input_file.is_dir() for input_file in args.input_files
+    )
+
+
+def _options(args):
+    from .options import DEFAULT_CACHE_SIZE, MiB, Options
+
+    cache_size = DEFAULT_CACHE_SIZE
+    if args.cache_size is not None:
+        cache_size = args.cache_size * MiB
+    memory_limit = None
+    if args.memory_limit is not None:
+        memory_limit = args.memory_limit * MiB
+    return Options(
+        fork=args.fork_server,
+        cache_dir=args.cache_dir,
+        cache_size=cache_size,
+        on_conflict=args.on_conflict,
+        tools=args.tools,
+        requirements=args.requirements,
+        stub_imports=args.stub_imports,
+        timeout=args.timeout,
+        cpu_limit=args.cpu_limit,
+        memory_limit=memory_limit,
+    )
+
+
+def _profile(args):
+    """Arguments of the profiler to use, None if not profiling"""
+    if args.profile_output is not None:
+        return {"cprofile": True, "memory": True}
+    if args.profile:
+        return {}
+    return None
+
+
+def _print_profile(args, report: dict):
+    from . import profiling
+
+    print(profiling.format_report(report), file=sys.stderr)
+    if args.profile_output is not None:
+        profiling.write_report(report, args.profile_output)
 
 
 def main(argv=None):
     args = parse_args(argv)
+
+    import coloredlogs
+
     coloredlogs.install(level="INFO", fmt="%(message)s")
-    output_file = pathlib.Path("pyproject.toml")
+    options = _options(args)
+    if options.fork:
+        from .setup_py import forkserver
+
+        forkserver.preload()
+
+    if args.format == "jsonl":
+        _print_records(args, options)
+    elif args.watch:
+        _watch(args, options)
+    elif _is_batch(args):
+        _convert_batch(args, options)
+    else:
+        _convert_single(args, options)
+
+
+def _print_records(args, options):
+    import json
 
-    if output_file.exists():
-        existing_config = tomlkit.parse(output_file.read_text())
+    from . import batch
+
+    failed = False
+    if args.git_refs:
+        from . import git
+
+        records = git.iter_records(
+            args.input_files, args.git_refs, jobs=args.jobs, options=options
+        )
     else:
-        existing_config = tomlkit.TOMLDocument()
+        records = batch.iter_records(
+            batch.find_inputs(args.input_files, options),
+            jobs=args.jobs,
+            options=options,
+        )
+    for record in records:
+        sys.stdout.write(json.dumps(record, default=str) + "\n")
+        sys.stdout.flush()
+        failed = failed or record["error"] is not None
+    if failed:
+        sys.exit(1)
 
+
+def _watch(args, options):
+    from . import watch
+
+    (input_file,) = args.input_files
     try:
-        result = converter.convert(
-            input_file=args.input_file,
-            config=existing_config,
+        watch.watch(input_file, pathlib.Path("pyproject.toml"), options)
+    except KeyboardInterrupt:
+        pass
+
+
+def _convert_batch(args, options):
+    from . import batch
+
+    dry_run = args.check or args.diff
+    results = batch.run(
+        batch.find_inputs(args.input_files, options),
+        jobs=args.jobs,
+        options=options,
+        dry_run=dry_run,
+        diff=args.diff,
+        strip=args.strip,
+        profile=_profile(args),
+    )
+    # Projects are found and converted in no particular order
+    results.sort(key=lambda result: result.input_file)
+    sys.stdout.write("".join(result.diff for result in results))
+    batch.print_summary(results, dry_run)
+    if _profile(args) is not None:
+        from . import profiling
+
+        _print_profile(
+            args, profiling.merge_reports(result.profile for result in results)
         )
-    except ConversionError as error:
+    if any(result.error is not None for result in results):
+        sys.exit(1)
+    if args.check and any(result.changed for result in results):
+        sys.exit(1)
+
+
+def _convert_single(args, options):
+    import logging
+
+    from . import converter, profiling, project
+    from .exceptions import ConversionError, FailedToParseError, MergingError
+    from .report import Report
+
+    output_file = pathlib.Path("pyproject.toml")
+    report = Report()
+    profile = _profile(args)
+    profiler = None if profile is None else profiling.Profiler(**profile)
+    try:
+        with profiler or contextlib.nullcontext():
+            current, rendered = project.render(
+                converter.project_inputs(args.input_files, options),
+                output_file,
+                options=options,
+                report=report,
+            )
+            stripped = project.strip(report) if args.strip else []
+            written = False
+            if not (args.check or args.diff):
+                written = project.write(output_file, rendered)
+                for setup_py, _, content in stripped:
+                    project.write(setup_py, content)
+    except (ConversionError, FailedToParseError, MergingError) as error:
         print(f"Failed to convert files: {error}", file=sys.stderr)
         sys.exit(1)
+    for path, evaluation in report.evaluations.items():
+        logging.info("Arguments of %s obtained via %s", path, evaluation)
+    if profiler is not None:
+        _print_profile(args, profiler.report())
 
-    with output_file.open("w") as fp:
-        tomlkit.dump(result, fp)
-        print("pyproject.toml file updated!")
+    if not (args.check or args.diff):
+        if written:
+            print("pyproject.toml file updated!")
+        else:
+            print("pyproject.toml is already up to date")
+        return
+    if args.diff:
+        sys.stdout.write(project.diff(current, rendered, str(output_file)))
+        for setup_py, setup_py_current, content in stripped:
+            sys.stdout.write(project.diff(setup_py_current, content, str(setup_py)))
+    changed = [
+        setup_py
+        for setup_py, setup_py_current, content in stripped
+        if setup_py_current != content
+    ]
+    if current != rendered:
+        changed.insert(0, output_file)
+    for path in changed:
+        print(f"{path} would change", file=sys.stderr)
+    if changed and args.check:
+        sys.exit(1)
@@ -2,48 +2,101 @@
 
 Provides a function that allows to add additional
 information to an existing pyproject.toml document.
+
+Tables are merged recursively and arrays are extended with the entries
+not present yet, using a hashed index of the existing ones. Only the
+items that change are modified, so the formatting of the rest of the
+document is preserved. Values that differ are handled according to a
+conflict policy.
+
+Both tomlkit documents and plain dicts can be merged into.
 """
-import tomlkit
-import tomlkit.exceptions
-import tomlkit.items
+import collections.abc
 
+from . import requirements
 from .exceptions import MergingError
 
+# Conflict policies
+ERROR = "error"
+KEEP = "keep"
+OVERWRITE = "overwrite"
+CONFLICT_POLICIES = [ERROR, KEEP, OVERWRITE]
 
-def _copy_dict(config: tomlkit.TOMLDocument, data: dict):
-    """Copy all dict values to config"""
-    for key, value in data.items():
-        if key in config and config[key] == value:
-            continue
-        config.add(key, value)
+REQUIREMENTS_ARRAYS = [
+    ("build-system", "requires"),
+    ("project", "dependencies"),
+    ("project", "optional-dependencies", None),  # None matches any key
+]
+
+
+def _is_requirements(path: tuple) -> bool:
+    return any(
+        len(path) == len(pattern)
+        and all(part is None or part == key for part, key in zip(pattern, path))
+        for pattern in REQUIREMENTS_ARRAYS
+    )
 
 
-def _merge_requires(config: tomlkit.items.Array, data: list[str]):
-    for require in data:
-        if require not in config:
-            config.append(require)
+def _hashable(value):
+    """Hashable representation of a value, to index the entries of arrays"""
+    if hasattr(value, "unwrap"):
+        value = value.unwrap()
+    if isinstance(value, collections.abc.Mapping):
+        return tuple((key, _hashable(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
 
 
-def _merge_build_system(config: tomlkit.items.Table, data: dict):
-    if requires := data.pop("requires", None):
-        config.setdefault("requires", [])
-        _merge_requires(config["requires"], requires)
-    _copy_dict(config, data)
+def _copy(value):
+    """Copies the containers within value, so data is never shared with config"""
+    if isinstance(value, collections.abc.Mapping):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _merge_array(config: list, data: list, path: tuple, on_conflict: str):
+    if _is_requirements(path):
+        requirements.merge_into(config, data, on_conflict)
+        return
+    index = {_hashable(item) for item in config}
+    for item in data:
+        item_key = _hashable(item)
+        if item_key not in index:
+            index.add(item_key)
+            config.append(_copy(item))
+
+
+def _merge_table(config: collections.abc.MutableMapping, data, path, on_conflict):
+    for key, value in data.items():
+        key_path = (*path, key)
+        if key not in config:
+            config[key] = _copy(value)
+            continue
+        current = config[key]
+        if isinstance(current, collections.abc.Mapping) and isinstance(
+            value, collections.abc.Mapping
+        ):
+            _merge_table(current, value, key_path, on_conflict)
+        elif isinstance(current, list) and isinstance(value, (list, tuple)):
+            _merge_array(current, value, key_path, on_conflict)
+        elif current != value:
+            _resolve_conflict(config, key, value, key_path, on_conflict)
 
 
-def _merge_project(config: tomlkit.items.Table, data: dict):
-    _copy_dict(config, data)
+def _resolve_conflict(config, key, value, path: tuple, on_conflict: str):
+    if on_conflict == OVERWRITE:
+        config[key] = _copy(value)
+    elif on_conflict == ERROR:
+        raise MergingError(
+            f"Conflicting value for {'.'.join(path)!r}: "
+            f"{config[key]!r} already present, found {value!r}"
+        )
 
 
-def add_data(config: tomlkit.TOMLDocument, data: dict):
-    try:
-        if build_system := data.pop("build-system", None):
-            config.setdefault("build-system", {})
-            _merge_build_system(config["build-system"], build_system)
-        if project := data.pop("project", None):
-            config.setdefault("project", {})
-            _merge_project(config["project"], project)
-        for key, value in data.items():
-            config.add(key, value)
-    except tomlkit.exceptions.KeyAlreadyPresent as e:
-        raise MergingError(e) from None
+def add_data(config: collections.abc.MutableMapping, data: dict, on_conflict=ERROR):
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Invalid conflict policy: {on_conflict!r}")
+    _merge_table(config, data, (), on_conflict)
@@ -0,0 +1,39 @@
+"""Settings shared by every stage of a conversion"""
+import dataclasses
+import pathlib
+import typing
+
+MiB = 1024 * 1024
+DEFAULT_CACHE_SIZE = 100 * MiB
+
+
+@dataclasses.dataclass(frozen=True)
+class Options:
+    """How input files should be converted"""
+
+    # Execute setup.py files in forked children of a preloaded process
+    fork: bool = False
+    # Folder where extraction results are cached, disabled if None
+    cache_dir: typing.Optional[pathlib.Path] = None
+    # Maximum size in bytes of the cache before evicting entries
+    cache_size: int = DEFAULT_CACHE_SIZE
+    # What to do when a value differs from the one in pyproject.toml
+    on_conflict: str = "error"
+    # Convert the configuration of the tools found next to project files
+    tools: bool = True
+    # Convert the requirements*.txt files found next to project files
+    requirements: bool = False
+    # Stub the modules setup.py imports that are not installed
+    stub_imports: bool = False
+    # Limits of each setup.py execution, in seconds of wall-clock and CPU
+    # time and bytes of address space. Executions run in a child if any is set
+    timeout: typing.Optional[float] = None
+    cpu_limit: typing.Optional[int] = None
+    memory_limit: typing.Optional[int] = None
+
+    @property
+    def limited(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.timeout, self.cpu_limit, self.memory_limit)
+        )
@@ -0,0 +1,182 @@
+"""Per stage profiling of conversions
+
+The pipeline delimits its stages with `stage(name)`, which does nothing
+unless a `Profiler` is active in the current thread:
+
+    with profiling.Profiler() as profiler:
+        converter.convert(input_file, config)
+    print(profiler.report())
+
+Wall and CPU time are always recorded per stage, the CPU time including
+the one of the children forked and waited for meanwhile, as setup.py
+files executed with `forkserver`. Optionally each stage
+is run under cProfile, keeping its most expensive functions, and
+tracemalloc, keeping its peak memory. Reports of several conversions
+can be aggregated with `merge_reports`.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import typing
+
+TOP_FUNCTIONS = 20
+
+_local = threading.local()
+
+
+def current() -> typing.Optional["Profiler"]:
+    return getattr(_local, "profiler", None)
+
+
+def _cpu_time() -> float:
+    """CPU time of the current thread and of the children waited for"""
+    times = os.times()
+    return time.thread_time() + times.children_user + times.children_system
+
+
+class Profiler:
+    """Records the resources used by each stage while active"""
+
+    def __init__(self, cprofile: bool = False, memory: bool = False):
+        self.cprofile = cprofile
+        self.memory = memory
+        self.stages = {}
+        self._profiles = {}
+        self._in_stage = False
+        self._previous = None
+
+    def __enter__(self):
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        self._previous = current()
+        _local.profiler = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.profiler = self._previous
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.stop()
+
+    def record(self, name: str):
+        """Context manager recording the resources used by a stage"""
+        if self._in_stage:  # Nested stages are accounted in the outer one
+            return contextlib.nullcontext()
+        return self._record(name)
+
+    @contextlib.contextmanager
+    def _record(self, name: str):
+        stats = self.stages.setdefault(
+            name, {"count": 0, "wall": 0.0, "cpu": 0.0, "peak_memory": 0}
+        )
+        profile = None
+        if self.cprofile:
+            import cProfile
+
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.reset_peak()
+            memory_start, _ = tracemalloc.get_traced_memory()
+        self._in_stage = True
+        wall_start, cpu_start = time.perf_counter(), _cpu_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            stats["wall"] += time.perf_counter() - wall_start
+            stats["cpu"] += _cpu_time() - cpu_start
+            stats["count"] += 1
+            self._in_stage = False
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                stats["peak_memory"] = max(stats["peak_memory"], peak - memory_start)
+
+    def report(self) -> dict:
+        """Resources used per stage, as a JSON serializable dict"""
+        report = {name: dict(stats) for name, stats in self.stages.items()}
+        for name, profile in self._profiles.items():
+            report[name]["functions"] = _top_functions(profile)
+        return report
+
+
+def stage(name: str):
+    """Delimits a stage of the conversion for the active profiler"""
+    profiler = current()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.record(name)
+
+
+def _top_functions(profile) -> list:
+    import pstats
+
+    functions = []
+    for (filename, line, function), stat in pstats.Stats(profile).stats.items():
+        calls, _, own_time, cumulative_time, _ = stat
+        functions.append(
+            {
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "own": own_time,
+                "cumulative": cumulative_time,
+            }
+        )
+    functions.sort(key=lambda function: function["cumulative"], reverse=True)
+    return functions[:TOP_FUNCTIONS]
+
+
+def merge_reports(reports: typing.Iterable[dict]) -> dict:
+    """Aggregates the reports of several conversions"""
+    merged = {}
+    functions = {}
+    for report in reports:
+        for name, stats in report.items():
+            total = merged.setdefault(
+                name, {"count": 0, "wall": 0.0, "cpu": 0.0, "peak_memory": 0}
+            )
+            total["count"] += stats["count"]
+            total["wall"] += stats["wall"]
+            total["cpu"] += stats["cpu"]
+            total["peak_memory"] = max(total["peak_memory"], stats["peak_memory"])
+            for function in stats.get("functions", ()):
+                aggregated = functions.setdefault(name, {}).setdefault(
+                    function["function"],
+                    dict(function, calls=0, own=0.0, cumulative=0.0),
+                )
+                for field in ("calls", "own", "cumulative"):
+                    aggregated[field] += function[field]
+    for name, stage_functions in functions.items():
+        merged[name]["functions"] = sorted(
+            stage_functions.values(),
+            key=lambda function: function["cumulative"],
+            reverse=True,
+        )[:TOP_FUNCTIONS]
+    return merged
+
+
+def format_report(report: dict) -> str:
+    """Renders a report as a table"""
+    lines = [
+        f"{'stage':<12}{'count':>8}{'wall (s)':>12}{'cpu (s)':>12}{'peak (KiB)':>12}"
+    ]
+    for name, stats in sorted(report.items(), key=lambda item: -item[1]["wall"]):
+        lines.append(
+            f"{name:<12}{stats['count']:>8}{stats['wall']:>12.4f}"
+            f"{stats['cpu']:>12.4f}{stats['peak_memory'] / 1024:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+def write_report(report: dict, path):
+    with open(path, "w") as fp:
+        json.dump(report, fp, indent=2)
@@ -0,0 +1,128 @@
+"""Converts the inputs of a project into its pyproject.toml
+
+The document is rendered in memory first, so callers can decide whether
+to write it, check if it would change or show the differences. Files are
+only written when their content changes, atomically, so they are never
+left truncated and their mtime is not bumped needlessly.
+"""
+import contextlib
+import difflib
+import os
+import pathlib
+import tempfile
+import typing
+
+import tomlkit
+
+from . import converter, emitter, profiling
+from .options import Options
+from .report import Report
+from .setup_py import remover
+
+
+def read(output_file: pathlib.Path) -> typing.Optional[str]:
+    """Returns the current content of output_file, None if it does not exist"""
+    try:
+        return output_file.read_text()
+    except FileNotFoundError:
+        return None
+
+
+def render(
+    input_files,
+    output_file: pathlib.Path,
+    options: Options = None,
+    report: Report = None,
+) -> tuple:
+    """Returns the current and the converted content of output_file
+
+    input_files are the inputs of a project, see
+    `converter.project_inputs`. The document is parsed and dumped once,
+    whatever the number of inputs.
+    New documents have no formatting to preserve, they are built from
+    plain dicts and serialized by the emitter instead of tomlkit.
+    """
+    options = options or Options()
+    current = read(output_file)
+    if current is None:
+        config = {}
+    else:
+        with profiling.stage("parse"):
+            config = tomlkit.parse(current)
+    converter.convert(input_files, config=config, options=options, report=report)
+    with profiling.stage("dump"):
+        if current is None:
+            rendered = emitter.dumps(config)
+        else:
+            rendered = tomlkit.dumps(config)
+    return current, rendered
+
+
+def strip(report: Report) -> list:
+    """Returns each setup.py with its current and stripped content
+
+    The arguments of setup() that were migrated are removed, as located
+    while extracting them, keeping the line endings of the file. Files
+    with nothing to strip are left out.
+    """
+    return [
+        (setup_py, remover.read(setup_py), remover.remove(setup_py, code_targets))
+        for setup_py, code_targets in report.code_targets.items()
+        if code_targets
+    ]
+
+
+def diff(current: typing.Optional[str], rendered: str, label: str) -> str:
+    """Unified diff between the current and the rendered content"""
+    return "".join(
+        difflib.unified_diff(
+            (current or "").splitlines(keepends=True),
+            rendered.splitlines(keepends=True),
+            fromfile="/dev/null" if current is None else f"a/{label}",
+            tofile=f"b/{label}",
+        )
+    )
+
+
+def _umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write(output_file: pathlib.Path, rendered: str) -> bool:
+    """Writes rendered to output_file, returns False if it was up to date
+
+    The content goes to a temporary file in the same folder, flushed to
+    disk, that then replaces output_file. Symlinks are written through.
+    """
+    with profiling.stage("write"):
+        path = pathlib.Path(os.path.realpath(output_file))
+        content = rendered.encode()
+        try:
+            if path.read_bytes() == content:
+                return False
+            mode = path.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_umask()
+        fd, temp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(content)
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_path)
+            raise
+        with contextlib.suppress(OSError):  # Not supported on every platform
+            directory = os.open(path.parent, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+        return True
@@ -0,0 +1,19 @@
+"""Findings gathered while converting a project"""
+import dataclasses
+
+# How the arguments of a setup.py file were obtained
+STATIC = "static"
+EXEC = "exec"
+CACHED = "cache"
+
+
+@dataclasses.dataclass
+class Report:
+    """Details about how each of the input files was converted"""
+
+    evaluations: dict = dataclasses.field(default_factory=dict)
+    # Code of the setup() arguments migrated to pyproject.toml, by setup.py
+    code_targets: dict = dataclasses.field(default_factory=dict)
+    # Missing imports stubbed while executing setup.py and the arguments of
+    # setup() ignored for depending on them, by setup.py
+    stubs: dict = dataclasses.field(default_factory=dict)
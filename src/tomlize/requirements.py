@@ -0,0 +1,190 @@
+"""Normalization and merging of PEP 508 requirements
+
+Requirements are indexed by their canonical name, extras and markers so
+lists can be deduplicated and merged in a single pass. Requirements for
+the same project have their specifiers combined, dropping redundant
+bounds. The original strings are kept whenever they are not modified, so
+existing formatting is respected. Requirements that cannot be combined,
+as no version satisfies both or they reference different URLs, are
+conflicts handled according to the same policies as the merger.
+"""
+import functools
+import logging
+import typing
+
+import packaging.requirements
+import packaging.specifiers
+import packaging.utils
+import packaging.version
+
+from .exceptions import MergingError
+
+# Lower and upper bound operators, from loosest to tightest at equal version
+_LOWER_BOUNDS = {">=": 0, ">": 1}
+_UPPER_BOUNDS = {"<=": 0, "<": 1}
+
+
+@functools.lru_cache(maxsize=8192)
+def parse(requirement: str) -> packaging.requirements.Requirement:
+    """Parses a requirement string, results are memoized"""
+    return packaging.requirements.Requirement(requirement)
+
+
+def canonical_name(requirement: str) -> str:
+    return packaging.utils.canonicalize_name(parse(requirement).name)
+
+
+def key(requirement: str) -> typing.Hashable:
+    """Identifies the requirements that should be merged together
+
+    Strings that are not valid requirements are only merged when equal.
+    """
+    try:
+        req = parse(requirement)
+    except packaging.requirements.InvalidRequirement:
+        return requirement
+    return (
+        packaging.utils.canonicalize_name(req.name),
+        frozenset(packaging.utils.canonicalize_name(e) for e in req.extras),
+        str(req.marker) if req.marker else None,
+    )
+
+
+def clean(requirements: typing.Iterable[str]) -> list:
+    """Drops empty lines and comments, as setuptools does"""
+    if isinstance(requirements, str):
+        requirements = requirements.splitlines()
+    cleaned = []
+    for requirement in requirements:
+        requirement = requirement.split(" #", 1)[0].strip()
+        if requirement and not requirement.startswith("#"):
+            cleaned.append(requirement)
+    return cleaned
+
+
+def add_marker(requirement: str, marker: str) -> str:
+    """Restricts a requirement to an additional environment marker"""
+    req = parse(requirement)
+    if req.marker:
+        return f"{requirement.split(';', 1)[0].strip()}; ({req.marker}) and ({marker})"
+    return f"{requirement}; {marker}"
+
+
+def merge_into(
+    config: list, requirements: typing.Iterable[str], on_conflict: str = "error"
+) -> list:
+    """Merges requirements into config in place
+
+    config can be a list or a tomlkit array, only the entries that
+    change are modified. Conflicting requirements raise a MergingError,
+    keep the existing entry or overwrite it, according to on_conflict.
+    """
+    index = {}
+    for position, requirement in enumerate(config):
+        index.setdefault(key(str(requirement)), position)
+    for requirement in requirements:
+        requirement_key = key(requirement)
+        position = index.get(requirement_key)
+        if position is None:
+            index[requirement_key] = len(config)
+            config.append(requirement)
+            continue
+        current = str(config[position])
+        try:
+            merged = _merge_pair(current, requirement)
+        except MergingError as error:
+            if on_conflict == "overwrite":
+                merged = requirement
+            elif on_conflict == "keep":
+                logging.warning("%s, keeping it", error)
+                merged = current
+            else:
+                raise
+        if merged != current:
+            config[position] = merged
+    return config
+
+
+def dedupe(requirements: typing.Iterable[str], on_conflict: str = "error") -> list:
+    return merge_into([], requirements, on_conflict)
+
+
+def _merge_pair(current: str, new: str) -> str:
+    # Strings that are not valid requirements only share a key when equal
+    if current == new:
+        return current
+    current_req, new_req = parse(current), parse(new)
+    if current_req.url and new_req.url and current_req.url != new_req.url:
+        raise _conflict(current, new)
+    if current_req.url or new_req.url:
+        # A direct reference replaces any version constraint
+        return current if current_req.url else new
+    specifier = _simplify(current_req.specifier & new_req.specifier)
+    if not _satisfiable(specifier):
+        raise _conflict(current, new)
+    if specifier == current_req.specifier:
+        return current
+    if specifier == new_req.specifier:
+        return new
+    merged = packaging.requirements.Requirement(new)
+    merged.specifier = specifier
+    return str(merged)
+
+
+def _conflict(current: str, new: str) -> MergingError:
+    return MergingError(
+        f"Conflicting requirement: {current!r} already present, found {new!r}"
+    )
+
+
+def _simplify(
+    specifier: packaging.specifiers.SpecifierSet,
+) -> packaging.specifiers.SpecifierSet:
+    """Drops the bounds made redundant by tighter ones"""
+    lower = upper = None
+    others = []
+    for spec in specifier:
+        try:
+            version = packaging.version.Version(spec.version)
+        except packaging.version.InvalidVersion:
+            others.append(spec)
+            continue
+        if spec.operator in _LOWER_BOUNDS:
+            rank = (version, _LOWER_BOUNDS[spec.operator])
+            if lower is None or rank > lower[0]:
+                lower = rank, spec
+        elif spec.operator in _UPPER_BOUNDS:
+            rank = (version, -_UPPER_BOUNDS[spec.operator])
+            if upper is None or rank < upper[0]:
+                upper = rank, spec
+        else:
+            others.append(spec)
+    kept = others + [bound[1] for bound in (lower, upper) if bound is not None]
+    return packaging.specifiers.SpecifierSet(",".join(str(spec) for spec in kept))
+
+
+def _satisfiable(specifier: packaging.specifiers.SpecifierSet) -> bool:
+    """Whether some version can match specifier, as far as its bounds and pins tell
+
+    specifier is expected to be simplified, with a single bound on each side.
+    """
+    lower = upper = None
+    pins = []
+    for spec in specifier:
+        try:
+            version = packaging.version.Version(spec.version)
+        except packaging.version.InvalidVersion:
+            continue
+        if spec.operator in _LOWER_BOUNDS:
+            lower = version, spec.operator
+        elif spec.operator in _UPPER_BOUNDS:
+            upper = version, spec.operator
+        elif spec.operator in ("==", "==="):
+            pins.append(version)
+    if pins:
+        return any(specifier.contains(pin, prereleases=True) for pin in pins)
+    if lower is None or upper is None:
+        return True
+    if lower[0] != upper[0]:
+        return lower[0] < upper[0]
+    return lower[1] == ">=" and upper[1] == "<="
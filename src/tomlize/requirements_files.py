@@ -0,0 +1,192 @@
+"""Reads pip requirements files
+
+Files are parsed once per process, memoized by path, modification time
+and size, so a file included by many others (or by many projects) is
+only read once. `-r` includes are resolved depth first, each file being
+visited once per resolution. Comments, hashes, constraints and pip
+options are dropped, as they have no equivalent in pyproject.toml.
+"""
+import fnmatch
+import functools
+import logging
+import os
+import pathlib
+import typing
+
+import packaging.requirements
+import packaging.utils
+
+from . import exceptions, profiling, requirements, tracking
+from .options import Options
+from .report import Report
+
+DEPENDENCIES_FILE = "requirements.txt"
+PATTERN = "requirements*.txt"
+_INCLUDE_OPTIONS = ("--requirement", "-r")
+
+
+def _normpath(path):
+    """Paths not on disk (see `git`) are already normalized"""
+    if isinstance(path, pathlib.Path):
+        return pathlib.Path(os.path.normpath(path))
+    return path
+
+
+def _include_path(line: str, base_dir: pathlib.Path) -> typing.Optional[pathlib.Path]:
+    """Path of the file included by a line, None if it does not include one"""
+    for option in _INCLUDE_OPTIONS:
+        if line.startswith(option):
+            path = line[len(option) :].lstrip(" =")
+            return _normpath(base_dir / path) if path else None
+    return None
+
+
+def _logical_lines(lines: typing.Iterable[str]) -> typing.Iterator[str]:
+    """Joins continued lines and drops comments"""
+    current = ""
+    for line in lines:
+        if line.lstrip().startswith("#"):
+            line = ""
+        line = line.split(" #", 1)[0].rstrip()
+        if line.endswith("\\"):
+            current += line[:-1] + " "
+            continue
+        current += line
+        if current.strip():
+            yield current.strip()
+        current = ""
+    if current.strip():
+        yield current.strip()
+
+
+def parse_lines(lines: typing.Iterable[str], base_dir: pathlib.Path, source) -> tuple:
+    """Returns the requirements and included paths in lines, in order"""
+    entries = []
+    for line in _logical_lines(lines):
+        if line.startswith("-"):
+            include = _include_path(line, base_dir)
+            if include is not None:
+                entries.append(include)
+            else:
+                logging.debug("Ignoring option %r in %s", line, source)
+            continue
+        # Per requirement options, as --hash, follow the requirement
+        requirement = line.split(" --", 1)[0].strip()
+        try:
+            requirements.parse(requirement)
+        except packaging.requirements.InvalidRequirement:
+            logging.warning("Ignoring %r in %s, it is not a requirement", line, source)
+            continue
+        entries.append(requirement)
+    return tuple(entries)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_file(path: pathlib.Path, mtime_ns: int, size: int) -> tuple:
+    with open(path, encoding="utf-8") as fp:
+        return parse_lines(fp, path.parent, path)
+
+
+def parse_file(path: pathlib.Path) -> tuple:
+    """Parses a requirements file, memoized while it is not modified"""
+    if not isinstance(path, pathlib.Path):  # Not on disk, never modified
+        try:
+            content = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise exceptions.FailedToParseError(path, "File not found") from None
+        return parse_lines(content.splitlines(), path.parent, path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise exceptions.FailedToParseError(path, "File not found") from None
+    # Memoized reads must still be seen by the extraction cache
+    tracking.record([os.path.abspath(path)])
+    return _parse_file(pathlib.Path(path), stat.st_mtime_ns, stat.st_size)
+
+
+def resolve(entries: tuple, exclude=frozenset(), source=None) -> list:
+    """Requirements in entries, following the paths of the files included
+
+    Files in exclude are not followed. Including a file that is already
+    being resolved raises FailedToParseError.
+    """
+    resolved = []
+    visited = set(exclude)
+    in_progress = []
+
+    def visit(entries, source):
+        for entry in entries:
+            if isinstance(entry, str):
+                resolved.append(entry)
+                continue
+            if entry in in_progress:
+                cycle = " -> ".join(str(path) for path in (*in_progress, entry))
+                raise exceptions.FailedToParseError(source, f"Circular include {cycle}")
+            if entry in visited:
+                continue
+            visited.add(entry)
+            in_progress.append(entry)
+            visit(parse_file(entry), entry)
+            in_progress.pop()
+
+    visit(entries, source)
+    return resolved
+
+
+def expand(lines, base_dir: pathlib.Path) -> list:
+    """Resolves the includes and drops the options in a list of requirements
+
+    As found when setup.py reads a requirements file into install_requires.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    return resolve(parse_lines(lines, base_dir, "setup.py"), source="setup.py")
+
+
+def extra_name(path: pathlib.Path) -> typing.Optional[str]:
+    """Extra of a requirements file, None for the main dependencies"""
+    if path.name == DEPENDENCIES_FILE:
+        return None
+    stem = path.name[len("requirements") : -len(".txt")].lstrip("-_.")
+    return packaging.utils.canonicalize_name(stem) if stem else None
+
+
+def is_requirements_file(name: str) -> bool:
+    return fnmatch.fnmatchcase(name, PATTERN)
+
+
+def not_included(paths: typing.List[pathlib.Path]) -> list:
+    """Paths that none of the others include, besides the main dependencies
+
+    Files only reached through an include are part of the file including
+    them, not extras of their own.
+    """
+    included = {
+        entry
+        for path in paths
+        for entry in parse_file(path)
+        if not isinstance(entry, str)
+    }
+    return [
+        path
+        for path in paths
+        if path.name == DEPENDENCIES_FILE or _normpath(path) not in included
+    ]
+
+
+def extract(
+    requirements_path: pathlib.Path, options: Options = None, report: Report = None
+) -> dict:
+    if isinstance(requirements_path, pathlib.Path):
+        requirements_path = _normpath(requirements_path.absolute())
+    extra = extra_name(requirements_path)
+    exclude = frozenset()
+    if extra is not None:
+        # Dependencies included by extras are already dependencies of the project
+        exclude = frozenset([requirements_path.parent / DEPENDENCIES_FILE])
+    with profiling.stage("read"):
+        resolved = resolve((requirements_path,), exclude, requirements_path)
+    dependencies = requirements.dedupe(resolved)
+    if extra is None:
+        return {"project": {"dependencies": dependencies}}
+    return {"project": {"optional-dependencies": {extra: dependencies}}}
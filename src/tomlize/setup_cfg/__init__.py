@@ -0,0 +1,3 @@
+from .transformer import extract
+
+__all__ = ["extract"]
@@ -0,0 +1,159 @@
+"""Reads setup.cfg into the arguments setup() would receive
+
+Options are parsed as setuptools does, without executing any code.
+Values given through `attr:` and `file:` directives cannot be resolved
+statically, they are returned apart so they can be declared as dynamic.
+"""
+import configparser
+import pathlib
+
+from .. import exceptions
+
+METADATA_SECTION = "metadata"
+OPTIONS_SECTION = "options"
+
+# How the value of each option is parsed, options not listed are kept as str
+_LIST_OPTIONS = {
+    "classifiers",
+    "keywords",
+    "platforms",
+    "provides",
+    "requires",
+    "obsoletes",
+    "license_files",
+    "namespace_packages",
+    "py_modules",
+    "scripts",
+    "packages",
+    "eager_resources",
+    "dependency_links",
+}
+_REQUIREMENTS_OPTIONS = {"install_requires", "setup_requires", "tests_require"}
+_DICT_OPTIONS = {"project_urls", "package_dir"}
+_BOOL_OPTIONS = {"zip_safe", "include_package_data"}
+_ALIASES = {"home_page": "url", "summary": "description", "platform": "platforms"}
+
+# Sections holding a dict of lists, with the option they define
+_SECTIONS = {
+    "options.extras_require": "extras_require",
+    "options.entry_points": "entry_points",
+    "options.package_data": "package_data",
+    "options.exclude_package_data": "exclude_package_data",
+    "options.data_files": "data_files",
+}
+PACKAGES_FIND_SECTION = "options.packages.find"
+PACKAGES_FIND_DIRECTIVES = ["find:", "find_namespace:"]
+
+ATTR_DIRECTIVE = "attr:"
+FILE_DIRECTIVE = "file:"
+
+
+def read_setup_cfg(setup_cfg_path: pathlib.Path) -> tuple:
+    """Returns the arguments for setup() and the ones given via directives
+
+    Directives are returned as {option: {"attr": str} | {"file": list}},
+    options of sections (extras) nest a dict of directives per key.
+    """
+    parser = configparser.ConfigParser(interpolation=None, delimiters=("=",))
+    parser.optionxform = str  # Keys of extras and entry points are case sensitive
+    try:
+        content = setup_cfg_path.read_text(encoding="utf-8")
+        parser.read_string(content, source=str(setup_cfg_path))
+    except FileNotFoundError:
+        raise exceptions.FailedToParseError(setup_cfg_path, "File not found")
+    except configparser.Error as e:
+        raise exceptions.FailedToParseError(setup_cfg_path, e) from None
+    try:
+        return _read_options(parser)
+    except ValueError as e:
+        raise exceptions.FailedToParseError(setup_cfg_path, e) from None
+
+
+def _read_options(parser: configparser.ConfigParser) -> tuple:
+    kwargs, directives = {}, {}
+    for section in (METADATA_SECTION, OPTIONS_SECTION):
+        if not parser.has_section(section):
+            continue
+        for option, value in parser.items(section):
+            option = _ALIASES.get(option.replace("-", "_"), option.replace("-", "_"))
+            if directive := _directive(value):
+                directives[option] = directive
+            else:
+                kwargs[option] = _parse_option(option, value)
+
+    for section, option in _SECTIONS.items():
+        if parser.has_section(section):
+            values = {}
+            for key, value in parser.items(section):
+                if directive := _directive(value):
+                    directives.setdefault(option, {})[key] = directive
+                elif option == "extras_require":
+                    values[key] = _parse_requirements(value)
+                else:
+                    values[key] = _parse_list(value)
+            if values:
+                kwargs[option] = values
+
+    packages = kwargs.get("packages")
+    if packages and packages[0] in PACKAGES_FIND_DIRECTIVES:
+        kwargs["packages"] = _packages_find(parser, packages[0])
+    return kwargs, directives
+
+
+def _directive(value: str):
+    value = value.strip()
+    if value.startswith(ATTR_DIRECTIVE):
+        return {"attr": value[len(ATTR_DIRECTIVE) :].strip()}
+    if value.startswith(FILE_DIRECTIVE):
+        return {"file": _parse_list(value[len(FILE_DIRECTIVE) :])}
+    return None
+
+
+def _parse_option(option: str, value: str):
+    if option in _LIST_OPTIONS:
+        return _parse_list(value)
+    if option in _REQUIREMENTS_OPTIONS:
+        return _parse_requirements(value)
+    if option in _DICT_OPTIONS:
+        return _parse_dict(value)
+    if option in _BOOL_OPTIONS:
+        return value.strip().lower() in ("1", "true", "yes")
+    return value.strip()
+
+
+def _parse_list(value: str) -> list:
+    """Values are given one per line, or comma separated in a single line"""
+    if "\n" in value.strip():
+        items = value.splitlines()
+    else:
+        items = value.split(",")
+    return [item.strip() for item in items if item.strip()]
+
+
+def _parse_requirements(value: str) -> list:
+    """Requirements are given one per line, as they can contain commas"""
+    return [line.strip() for line in value.splitlines() if line.strip()]
+
+
+def _parse_dict(value: str) -> dict:
+    result = {}
+    for line in _parse_list(value):
+        key, separator, item = line.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid line in dict option: {line!r}")
+        result[key.strip()] = item.strip()
+    return result
+
+
+def _packages_find(parser: configparser.ConfigParser, directive: str) -> dict:
+    """Arguments of the package discovery, as in tool.setuptools.packages"""
+    find = {}
+    if parser.has_section(PACKAGES_FIND_SECTION):
+        options = dict(parser.items(PACKAGES_FIND_SECTION))
+        if "where" in options:
+            find["where"] = [options["where"].strip()]
+        for option in ("include", "exclude"):
+            if option in options:
+                find[option] = _parse_list(options[option])
+    find["namespaces"] = directive == "find_namespace:"
+    return {"find": find}
@@ -0,0 +1,24 @@
+"""Transforms setup.cfg metadata to toml dict
+
+setup.cfg holds the same arguments as setup.py, so they are transformed
+the same way once read.
+"""
+import logging
+import pathlib
+
+from .. import profiling
+from ..options import Options
+from ..report import Report
+from ..setup_py import transformer
+from .reader import read_setup_cfg
+
+
+def extract(
+    setup_cfg_path: pathlib.Path, options: Options = None, report: Report = None
+) -> dict:
+    with profiling.stage("read"):
+        data, directives = read_setup_cfg(setup_cfg_path)
+    ret, unexpected = transformer.transform(data, setup_cfg_path.parent, directives)
+    for field in unexpected:
+        logging.warning("Unexpected field found: %s", field)
+    return ret
@@ -5,6 +5,7 @@ Value types can be:
     - List of str: path in the dict to copy towards
     - callable: Call a function that takes the original value and the output dict
 """
+from .. import requirements
 
 
 def keywords(original_value, result: dict):
@@ -24,6 +25,29 @@ def entry_points(original_value, result: dict):
     # TODO: Handle console scripts (Either here or in enhance)
 
 
+def install_requires(original_value, result: dict):
+    dependencies = result["project"].setdefault("dependencies", [])
+    requirements.merge_into(dependencies, requirements.clean(original_value))
+
+
+def extras_require(original_value, result: dict):
+    optional_dependencies = result["project"].setdefault("optional-dependencies", {})
+    for extra, extra_requires in original_value.items():
+        extra, _, marker = extra.partition(":")
+        extra_requires = requirements.clean(extra_requires)
+        if marker:
+            extra_requires = [
+                requirements.add_marker(require, marker) for require in extra_requires
+            ]
+        if not extra:  # Conditional dependencies, as in {":python_version<'3'": []}
+            install_requires(extra_requires, result)
+            continue
+        extra_dependencies = optional_dependencies.setdefault(extra, [])
+        requirements.merge_into(extra_dependencies, extra_requires)
+    if not optional_dependencies:
+        del result["project"]["optional-dependencies"]
+
+
 def _ensure_authors(result: dict):
     if "authors" not in result["project"]:
         result["project"]["authors"] = [{}]
@@ -66,8 +90,8 @@ FIELDS_MAPPING = {
     "maintainer": maintainer,
     "maintainer_email": maintainer_email,
     "python_requires": ["project", "requires-python"],
-    "install_requires": ["project", "dependencies"],
-    "extras_require": ["project", "optional-dependencies"],
+    "install_requires": install_requires,
+    "extras_require": extras_require,
     "project_urls": ["project", "urls"],
     "url": ["project", "urls", "Home-page"],
     "download_url": ["project", "urls", "Download"],
@@ -80,5 +104,19 @@ FIELDS_MAPPING = {
     "package_dir": ["tool", "setuptools", "package-dir"],
     "platform": ["tool", "setuptools", "platform"],
     "packages": ["tool", "setuptools", "packages"],
+    "package_data": ["tool", "setuptools", "package-data"],
+    "exclude_package_data": ["tool", "setuptools", "exclude-package-data"],
     "zip_safe": None,
 }
+
+# Fields that can be given through attr: or file: in setup.cfg, to the
+# pyproject.toml field declared as dynamic
+DYNAMIC_FIELDS_MAPPING = {
+    "version": "version",
+    "description": "description",
+    "long_description": "readme",
+    "classifiers": "classifiers",
+    "install_requires": "dependencies",
+    "extras_require": "optional-dependencies",
+    "entry_points": "entry-points",
+}
@@ -0,0 +1,138 @@
+"""Runs functions in forked children of a warm process
+
+The modules needed to execute setup.py files are imported once in the
+parent via `preload`, then each call forks a fresh child that inherits
+them, runs the function and sends its result back over a pipe. This
+keeps every setup.py isolated while paying the import cost only once.
+
+Children can be bounded in wall-clock time, CPU time and address space.
+CPU and memory are limited with `setrlimit` in the child, the parent
+kills the whole process group of the child once its time is up, so the
+processes it spawned (as compilers) are stopped as well.
+"""
+import contextlib
+import importlib
+import os
+import pickle
+import select
+import signal
+import sys
+import time
+
+PRELOADED_MODULES = [
+    "setuptools",
+    "unittest.mock",
+    "packaging.requirements",
+    "tomlkit",
+]
+
+
+class ForkedChildError(Exception):
+    """The forked child died without sending a result"""
+
+
+class LimitExceededError(ForkedChildError):
+    """The forked child was stopped for exceeding one of its limits"""
+
+
+def preload():
+    for module in PRELOADED_MODULES:
+        importlib.import_module(module)
+
+
+def call(function, *args, timeout=None, cpu_time=None, memory=None):
+    """Runs function(*args) in a forked child and returns its result
+
+    Exceptions raised in the child are raised again in the parent. The
+    child is stopped after timeout seconds, cpu_time seconds of CPU or
+    when allocating more than memory bytes, raising LimitExceededError.
+    """
+    read_fd, write_fd = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover (child)
+        os.close(read_fd)
+        _run_child(write_fd, function, args, timeout, cpu_time, memory)
+    os.close(write_fd)
+    if timeout is not None:
+        # Also done in the child, so the group exists whichever runs first
+        with contextlib.suppress(OSError):
+            os.setpgid(pid, pid)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        payload = _read(read_fd, deadline)
+    finally:
+        os.close(read_fd)
+        if timeout is not None:
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(pid, signal.SIGKILL)
+        _, status = os.waitpid(pid, 0)
+    if payload is None:
+        raise LimitExceededError(f"Exceeded the wall-clock limit of {timeout}s")
+    if not payload:
+        if os.WIFSIGNALED(status) and os.WTERMSIG(status) == signal.SIGXCPU:
+            raise LimitExceededError(f"Exceeded the CPU time limit of {cpu_time}s")
+        raise ForkedChildError(f"Child process exited with status {status}")
+    succeeded, value = pickle.loads(payload)
+    if succeeded:
+        return value
+    raise value
+
+
+def _read(read_fd: int, deadline):
+    """Reads until the child closes the pipe, None if the deadline passes"""
+    chunks = []
+    while True:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                return None
+        chunk = os.read(read_fd, 1 << 16)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def _limit(cpu_time, memory):  # pragma: no cover (child)
+    import resource
+
+    if cpu_time is not None:
+        # SIGXCPU at the soft limit, SIGKILL a second later if it is handled
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time, cpu_time + 1))
+    if memory is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+
+def _caused_by(error: BaseException, error_type) -> bool:
+    while error is not None:
+        if isinstance(error, error_type):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _run_child(
+    write_fd, function, args, timeout, cpu_time, memory
+):  # pragma: no cover (child)
+    if timeout is not None:
+        with contextlib.suppress(OSError):
+            os.setpgid(0, 0)  # Killed as a group by the parent
+    try:
+        _limit(cpu_time, memory)
+        payload = pickle.dumps((True, function(*args)))
+    except BaseException as e:
+        if memory is not None and _caused_by(e, MemoryError):
+            mib = memory // (1024 * 1024)
+            e = LimitExceededError(f"Exceeded the memory limit of {mib} MiB")
+        try:
+            payload = pickle.dumps((False, e))
+        except Exception:
+            payload = pickle.dumps((False, ForkedChildError(repr(e))))
+    try:
+        with os.fdopen(write_fd, "wb") as pipe:
+            pipe.write(payload)
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(0)  # Even if the parent is gone, never return to its code
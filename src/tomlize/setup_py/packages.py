@@ -0,0 +1,177 @@
+"""Intercepts the calls to setuptools.find_packages() made by setup.py
+
+The arguments of `find_packages()` and `find_namespace_packages()` are
+recorded instead of walking the project tree, so they can be converted
+to a `tool.setuptools.packages.find` table. What they return is a list
+that is only filled, walking the tree, if setup.py uses it for anything
+else than passing it to setup(), in which case the packages found are
+converted as is. Relative folders are within the folder of setup.py,
+which setup.py is executed from, even when read statically from another.
+"""
+import contextlib
+import os
+import pathlib
+import typing
+
+# Functions intercepted, to whether they find namespace packages
+FUNCTIONS = {"find_packages": False, "find_namespace_packages": True}
+
+
+def _patterns(value) -> typing.Optional[list]:
+    if isinstance(value, str):
+        value = [value]
+    try:
+        value = list(value)
+    except TypeError:
+        return None
+    return value if all(isinstance(item, str) for item in value) else None
+
+
+def project_root(folder) -> str:
+    """The folder of setup.py, the current one for folders not on disk"""
+    return os.fspath(folder) if isinstance(folder, os.PathLike) else os.curdir
+
+
+def find_table(
+    namespaces: bool, where=None, exclude=None, include=None, *, root=os.curdir
+):
+    """Returns the find table for the arguments given, None if there is none
+
+    Only the arguments that were given are kept, where has to be within
+    the project, which is root.
+    """
+    table = {}
+    if where is not None:
+        if not isinstance(where, (str, os.PathLike)):
+            return None
+        where = os.path.normpath(os.path.relpath(os.path.join(root, where), root))
+        if where == os.pardir or where.startswith(os.pardir + os.sep):
+            return None
+        table["where"] = [pathlib.PurePath(where).as_posix()]
+    for option, value in [("include", include), ("exclude", exclude)]:
+        if value is not None:
+            table[option] = _patterns(value)
+            if table[option] is None:
+                return None
+    table["namespaces"] = namespaces
+    return table
+
+
+class FoundPackages(list):
+    """Result of an intercepted call, filled when first used as a list"""
+
+    def __init__(
+        self,
+        namespaces: bool,
+        where=None,
+        exclude=None,
+        include=None,
+        *,
+        root=os.curdir,
+    ):
+        super().__init__()
+        self.namespaces = namespaces
+        arguments = {"where": where, "exclude": exclude, "include": include}
+        self.arguments = {k: v for k, v in arguments.items() if v is not None}
+        self.root = root
+        self.filled = False
+        self.find = find_table(namespaces, where, exclude, include, root=root)
+        if self.find is None:
+            self.fill()
+
+    def fill(self):
+        if self.filled:
+            return
+        self.filled = True
+        from setuptools.discovery import PackageFinder, PEP420PackageFinder
+
+        finder = PEP420PackageFinder if self.namespaces else PackageFinder
+        where = os.path.join(self.root, self.arguments.get("where", os.curdir))
+        list.extend(self, finder.find(**{**self.arguments, "where": where}))
+
+    def __radd__(self, other):
+        self.fill()
+        return other + list(self)
+
+    def __reduce_ex__(self, protocol):
+        self.fill()
+        return list, (list(self),)
+
+
+def _filling(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.fill()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+# Any use of the list needs the packages, they are found then
+for _name in [
+    "__add__",
+    "__contains__",
+    "__eq__",
+    "__getitem__",
+    "__iadd__",
+    "__imul__",
+    "__iter__",
+    "__len__",
+    "__mul__",
+    "__ne__",
+    "__repr__",
+    "__reversed__",
+    "__rmul__",
+    "__setitem__",
+    "__delitem__",
+    "append",
+    "copy",
+    "count",
+    "extend",
+    "index",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "sort",
+]:
+    if hasattr(list, _name):
+        setattr(FoundPackages, _name, _filling(_name))
+
+
+def _finder(namespaces: bool):
+    def find(where=None, exclude=None, include=None):
+        return FoundPackages(namespaces, where, exclude, include)
+
+    return find
+
+
+@contextlib.contextmanager
+def intercept():
+    """Patches the setuptools functions that find packages while active"""
+    # Slow to import and only needed to execute setup.py
+    from unittest import mock
+
+    with contextlib.ExitStack() as stack:
+        for name, namespaces in FUNCTIONS.items():
+            stack.enter_context(mock.patch(f"setuptools.{name}", _finder(namespaces)))
+        yield
+
+
+def resolve(kwargs: dict) -> dict:
+    """Replaces the packages found by setup() arguments with what to convert
+
+    packages becomes the find table if the call was only passed along,
+    any other result of a call becomes the list of packages found.
+    """
+    resolved = {}
+    for key, value in kwargs.items():
+        if isinstance(value, FoundPackages):
+            if key == "packages" and not value.filled:
+                value = {"find": value.find}
+            else:
+                value = list(value)
+        resolved[key] = value
+    return resolved
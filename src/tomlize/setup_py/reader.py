@@ -1,37 +1,164 @@
-"""Reads the setup.py and extracts information from it"""
+"""Reads the setup.py and extracts information from it
+
+Declarative files are evaluated statically, everything else is executed
+with `setuptools.setup` patched to capture its arguments, optionally in a
+forked child (see `forkserver`), bounded by the limits given in the
+options. Missing imports can be stubbed (see `stubs`), the arguments
+derived from them are then dropped. Packages are not searched for, the
+arguments of find_packages() are converted instead (see `packages`).
+Along with its value, the code of each argument is located, so it can be
+stripped once migrated.
+"""
 
 import logging
+import os
 import pathlib
-import unittest.mock
+import pickle
+
+from .. import exceptions, profiling, tracking
+from ..options import Options
+from ..report import EXEC, STATIC, Report
+from . import forkserver, packages, remover, static, stubs
 
-from .. import exceptions
 
+def extract_setup_args(
+    setup_path: pathlib.Path, options: Options = None, report: Report = None
+):
+    """Returns {argument: {"value": value, "code": CodeTarget | None}}
 
-def extract_setup_args(setup_path: pathlib.Path):
+    The code is None for arguments not given as a keyword of the call.
+    """
+    kwargs, evaluation, targets, stubbed = _extract_setup_args(
+        setup_path, options or Options()
+    )
+    if stubbed["imports"]:
+        logging.warning(
+            "Stubbed the missing imports of %s: %s",
+            setup_path,
+            ", ".join(stubbed["imports"]),
+        )
+    for key in stubbed["arguments"]:
+        logging.warning("Ignoring field %s, its value depends on stubbed imports", key)
+    if report is not None:
+        report.evaluations[setup_path] = evaluation
+        if stubbed["imports"]:
+            report.stubs[setup_path] = stubbed
     return {
-        key: {"value": value} for key, value in _extract_setup_args(setup_path).items()
+        key: {"value": value, "code": targets.get(key)} for key, value in kwargs.items()
     }
 
 
-def _run_setup_py(setup_path: pathlib.Path):
+def _read_setup_py(setup_path: pathlib.Path) -> str:
     try:
-        exec(
-            setup_path.read_text(),
-            {"__name__": "__main__", "__file__": "setup.py"},
-        )
+        return setup_path.read_text()
+    except FileNotFoundError:
+        raise exceptions.FailedToParseError(setup_path, "File not found")
+
+
+def _open_in(folder):
+    """open() for setup.py files not on disk, reading the files of folder
+
+    Paths are relative to the current folder, the one setup.py runs from.
+    """
+
+    def open_(file, mode="r", buffering=-1, encoding=None, errors=None, **kwargs):
+        return (folder / os.path.relpath(file)).open(mode, encoding, errors)
+
+    return open_
+
+
+def _run_setup_py(setup_path: pathlib.Path, source: str, stub_imports=False) -> list:
+    """Executes setup.py, returns the names of the modules stubbed"""
+    namespace = {"__name__": "__main__", "__file__": "setup.py"}
+    if not isinstance(setup_path, pathlib.Path):  # See `git`
+        namespace["open"] = _open_in(setup_path.parent)
+    try:
+        if not stub_imports:
+            exec(source, namespace)
+            return []
+        with stubs.missing_imports(namespace) as stubbed:
+            exec(source, namespace)
+        return stubbed
     except FileNotFoundError:
         raise exceptions.FailedToParseError(setup_path, "File not found")
     except ImportError as e:
         raise exceptions.FailedToParseError(
             setup_path, f"Unable to import {e.name!r}, are you missing a dependency?"
         )
-    except Exception as e:
+    except (Exception, SystemExit) as e:
         logging.error("Failed to load setup.py")
         raise exceptions.FailedToParseError(setup_path, e) from e
 
 
-def _extract_setup_args(setup_path: pathlib.Path) -> dict:
-    with unittest.mock.patch("setuptools.setup") as fake_setup:
-        _run_setup_py(setup_path)
+def _extract_setup_args(setup_path: pathlib.Path, options: Options) -> tuple:
+    """Returns the arguments given to setup(), how they were obtained, the
+    code targets of the arguments given as keywords and what was stubbed
+    """
+    source = _read_setup_py(setup_path)
+    tree = None
+    try:
+        with profiling.stage("static"):
+            tree = static.parse(setup_path, source)
+            kwargs, call = static.evaluate_setup_call(setup_path, tree)
+            kwargs = packages.resolve(kwargs)
+            targets = remover.argument_targets(source, call)
+            return kwargs, STATIC, targets, {"imports": [], "arguments": []}
+    except static.NotStaticError as e:
+        logging.debug("Executing %s, it is not declarative: %s", setup_path, e)
+    with profiling.stage("exec"):
+        if not (options.fork or options.limited):
+            kwargs, stubbed = _exec_setup_args(setup_path, source, options.stub_imports)
+        else:
+            try:
+                kwargs, stubbed, files_read = forkserver.call(
+                    _exec_in_child,
+                    setup_path,
+                    source,
+                    options.stub_imports,
+                    timeout=options.timeout,
+                    cpu_time=options.cpu_limit,
+                    memory=options.memory_limit,
+                )
+            except forkserver.ForkedChildError as e:
+                raise exceptions.FailedToParseError(setup_path, e) from None
+            tracking.record(files_read)
+    call = None if tree is None else static.find_setup_call(tree)
+    targets = {} if call is None else remover.argument_targets(source, call)
+    return kwargs, EXEC, targets, stubbed
+
+
+def _exec_setup_args(
+    setup_path: pathlib.Path, source: str, stub_imports=False
+) -> tuple:
+    """Returns the arguments given to setup() and what was stubbed
+
+    Arguments derived from stubs are left out, as their value is unknown.
+    """
+    import unittest.mock  # Slow to import and only needed to execute setup.py
+
+    with unittest.mock.patch("setuptools.setup") as fake_setup, packages.intercept():
+        stubbed = _run_setup_py(setup_path, source, stub_imports)
     _, kwargs = fake_setup.call_args
-    return kwargs
+    kwargs = packages.resolve(kwargs)
+    derived = [key for key, value in kwargs.items() if stubs.is_derived(value)]
+    kwargs = {key: value for key, value in kwargs.items() if key not in derived}
+    return kwargs, {"imports": stubbed, "arguments": derived}
+
+
+def _exec_in_child(setup_path: pathlib.Path, source: str, stub_imports=False) -> tuple:
+    """Executes setup.py keeping only the arguments that can reach the parent
+
+    What was stubbed and the files read are returned as well, as the
+    parent cannot see them.
+    """
+    kwargs = {}
+    with tracking.reads() as files_read:
+        setup_args, stubbed = _exec_setup_args(setup_path, source, stub_imports)
+    for key, value in setup_args.items():
+        try:
+            pickle.dumps(value)
+        except Exception:
+            logging.warning("Ignoring field %s, its value cannot be copied", key)
+            continue
+        kwargs[key] = value
+    return kwargs, stubbed, files_read
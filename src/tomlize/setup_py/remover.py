@@ -1,4 +1,13 @@
-"""Removes code from setup.py"""
+"""Removes code from setup.py
+
+All the targets are resolved against an index of line offsets built
+once, then the content is rebuilt in a single pass keeping the text
+between targets, so the cost is linear in both file size and targets.
+
+Targets of the arguments of setup() are computed from the AST parsed
+while extracting them, so files are not parsed again to be stripped.
+"""
+import ast
 import dataclasses
 import pathlib
 
@@ -13,58 +22,114 @@ class CodeTarget:
     col_to: int
 
 
-def remove(filename: pathlib.Path, code_targets: list[CodeTarget]):
-    return _remove_lines(filename.read_text(), code_targets)
-
+def argument_targets(source: str, call: ast.Call) -> dict:
+    """Code of each keyword argument of call, by name, with its separator
 
-def _remove_lines(content: str, code_targets: list[CodeTarget]):
-    for target in sorted(code_targets, reverse=True):
-        content = _remove_content(content, target)
-    return content
+    Each target spans up to the next argument, or the closing parenthesis,
+    so the call is still valid when any of them is removed. Arguments
+    starting a line take whole lines, not to leave blank ones behind, up
+    to their separator and comment: the comment lines above the next
+    argument are kept.
+    """
+    lines = source.split("\n")
+
+    def position(line: int, col: int) -> tuple:
+        # AST lines start at 1 and columns are offsets in the UTF-8 bytes
+        text = lines[line - 1]
+        return line - 1, len(text.encode()[:col].decode(errors="ignore"))
+
+    def anchored(line: int, col: int) -> bool:
+        return not lines[line][:col].strip()
+
+    def ends_line(line: int, col: int) -> bool:
+        """Whether only a separator and a comment follow col in line"""
+        rest = lines[line][col:].strip()
+        if rest.startswith(","):
+            rest = rest[1:].lstrip()
+        return not rest or rest.startswith("#")
+
+    arguments = sorted(
+        [*call.args, *call.keywords], key=lambda node: (node.lineno, node.col_offset)
+    )
+    closing_line, closing_col = position(call.end_lineno, call.end_col_offset)
+    bounds = [position(node.lineno, node.col_offset) for node in arguments]
+    bounds.append((closing_line, closing_col - 1))
+    targets = {}
+    for index, node in enumerate(arguments):
+        if not isinstance(node, ast.keyword) or node.arg is None:
+            continue
+        (line_from, col_from), (line_to, col_to) = bounds[index], bounds[index + 1]
+        if anchored(line_from, col_from) and anchored(line_to, col_to):
+            col_from, col_to = 0, 0
+            end_line, end_col = position(node.end_lineno, node.end_col_offset)
+            if end_line < line_to and ends_line(end_line, end_col):
+                line_to = end_line + 1
+        targets[node.arg] = CodeTarget(line_from, col_from, line_to, col_to)
+    return targets
+
+
+def read(filename: pathlib.Path) -> str:
+    """Content of filename with its line endings, as they are written back"""
+    with open(filename, newline="") as fp:
+        return fp.read()
 
 
-def _remove_content(content: str, target: CodeTarget):
-    start_idx, end_idx = _find_str_positions(content, target)
-    content_list = list(content)
-    content_list[start_idx:end_idx] = []
-    return "".join(content_list)
+def remove(filename: pathlib.Path, code_targets: list[CodeTarget]):
+    return _remove_lines(read(filename), code_targets)
 
 
-def _find_str_positions(content: str, code_target: CodeTarget) -> tuple[int, int]:
+def _remove_lines(content: str, code_targets: list[CodeTarget]):
+    line_offsets = _line_offsets(content)
+    spans = sorted(
+        _find_str_positions(content, line_offsets, target)
+        for target in set(code_targets)
+    )
+    pieces = []
+    position = 0
+    previous_span = None
+    for start_idx, end_idx in spans:
+        if start_idx < position:
+            raise ValueError(
+                f"Overlapping code targets at positions {previous_span}"
+                f" and {(start_idx, end_idx)}"
+            )
+        pieces.append(content[position:start_idx])
+        position = end_idx
+        previous_span = start_idx, end_idx
+    pieces.append(content[position:])
+    return "".join(pieces)
+
+
+def _line_offsets(content: str) -> list[int]:
+    """Computes the string position where each line starts"""
+    offsets = [0]
+    position = content.find("\n")
+    while position != -1:
+        offsets.append(position + 1)
+        position = content.find("\n", position + 1)
+    return offsets
+
+
+def _find_str_positions(
+    content: str, line_offsets: list[int], code_target: CodeTarget
+) -> tuple[int, int]:
     """
     Computes the start and end string position that are referenced by a code target
     """
-    content_iter = iter(content)
-    line_no = 0
-    start_idx = 0
-
-    # Place us in the right line
-    while line_no < code_target.line_from:
-        char = next(content_iter)
-        start_idx += 1
-        if char == "\n":
-            line_no += 1
-
-    # Place us in the right col
-    for _ in range(code_target.col_from):
-        char = next(content_iter)
-        assert char != "\n", repr(content[start_idx - 3 : start_idx + 3])
-        start_idx += 1
-
-    end_idx = start_idx
-    # Place us in the right line end
-    while line_no < code_target.line_to:
-        char = next(content_iter)
-        end_idx += 1
-        if char == "\n":
-            line_no += 1
-
-    # Place us in the right col end
-    col_steps = code_target.col_to
-    if code_target.line_from == code_target.line_to:
-        col_steps = code_target.col_to - code_target.col_from
-    for _ in range(col_steps):
-        char = next(content_iter)
-        end_idx += 1
-
+    start_idx = _position(
+        content, line_offsets, code_target.line_from, code_target.col_from
+    )
+    end_idx = _position(content, line_offsets, code_target.line_to, code_target.col_to)
+    if end_idx < start_idx:
+        raise ValueError(f"Invalid code target {code_target}")
     return start_idx, end_idx
+
+
+def _position(content: str, line_offsets: list[int], line: int, col: int) -> int:
+    if line >= len(line_offsets):
+        raise ValueError(f"Line {line} is out of range")
+    position = line_offsets[line] + col
+    line_end = line_offsets[line + 1] if line + 1 < len(line_offsets) else len(content)
+    if position > line_end:
+        raise ValueError(f"Column {col} is out of range in line {line}")
+    return position
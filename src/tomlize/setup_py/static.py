@@ -0,0 +1,398 @@
+"""Evaluates declarative setup.py files without executing them
+
+Walks the module AST resolving literals, module level constants,
+string concatenation, reads of local files and calls to find_packages()
+to find the arguments given to `setuptools.setup`. As soon as something
+is found that cannot be evaluated safely, `NotStaticError` is raised so
+the caller can fall back to executing the file.
+"""
+import ast
+import functools
+import pathlib
+import typing
+
+from . import packages
+
+SETUPTOOLS_MODULE = "setuptools"
+
+# Methods that are safe to call on statically evaluated values
+SAFE_METHODS = {
+    str: {
+        "format",
+        "join",
+        "lower",
+        "lstrip",
+        "replace",
+        "rstrip",
+        "split",
+        "splitlines",
+        "strip",
+        "upper",
+    },
+}
+
+
+class NotStaticError(Exception):
+    """The setup.py file cannot be evaluated statically"""
+
+
+class _OpenFile:
+    """Result of calling `open` on a local file in read mode"""
+
+    def __init__(self, path: pathlib.Path, encoding):
+        self.path = path
+        self.encoding = encoding
+
+    def read(self):
+        try:
+            return self.path.read_text(encoding=self.encoding)
+        except OSError as e:
+            raise NotStaticError(f"Unable to read {self.path}: {e}") from None
+
+    def readlines(self):
+        return self.read().splitlines(keepends=True)
+
+
+SAFE_METHODS[_OpenFile] = {"read", "readlines"}
+_MUTABLE_TYPES = (list, dict, set)
+
+
+def parse(setup_path: pathlib.Path, source: str) -> ast.Module:
+    try:
+        return ast.parse(source, filename=str(setup_path))
+    except SyntaxError as e:
+        raise NotStaticError(f"Invalid syntax: {e}") from None
+
+
+def evaluate_setup_args(setup_path: pathlib.Path, source: str) -> dict:
+    """Returns the keyword arguments given to setup() in setup_path"""
+    return evaluate_setup_call(setup_path, parse(setup_path, source))[0]
+
+
+def evaluate_setup_call(setup_path: pathlib.Path, tree: ast.Module) -> tuple:
+    """Returns the keyword arguments given to setup() and the node of the call"""
+    evaluator = _Evaluator(setup_path.parent)
+    evaluator.run(tree.body)
+    if evaluator.setup_args is None:
+        raise NotStaticError("setup() call not found")
+    return evaluator.setup_args, evaluator.setup_call
+
+
+def find_setup_call(tree: ast.Module) -> typing.Optional[ast.Call]:
+    """Node of the call to setup() in a file that is executed
+
+    Names cannot be resolved without running the file, so any call to a
+    `setup` function or method is taken. None if there is not exactly one.
+    """
+    calls = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call)
+        and (
+            isinstance(node.func, ast.Name)
+            and node.func.id == "setup"
+            or isinstance(node.func, ast.Attribute)
+            and node.func.attr == "setup"
+        )
+    ]
+    return calls[0] if len(calls) == 1 else None
+
+
+class _Evaluator:
+    def __init__(self, project_root: pathlib.Path):
+        self.project_root = project_root
+        self.names = {"__name__": "__main__", "__file__": "setup.py"}
+        self.bound = set(self.names)  # Every name bound in the module
+        self.setuptools_names = set()
+        self.setup_names = set()
+        self.finder_names = {}  # Names of the package finders, to namespaces
+        self.setup_args = None
+        self.setup_call = None
+
+    def run(self, statements: list):
+        for statement in statements:
+            self._statement(statement)
+
+    ### Statements ###
+
+    def _statement(self, node: ast.stmt):
+        method = getattr(self, f"_stmt_{type(node).__name__}", None)
+        if method is None:
+            raise NotStaticError(f"Unsupported statement in line {node.lineno}")
+        method(node)
+
+    def _stmt_Expr(self, node: ast.Expr):
+        if isinstance(node.value, ast.Constant):  # Docstrings
+            return
+        if isinstance(node.value, ast.Call) and self._is_setup(node.value.func):
+            self._setup_call(node.value)
+            return
+        raise NotStaticError(f"Unsupported expression in line {node.lineno}")
+
+    def _stmt_Import(self, node: ast.Import):
+        for alias in node.names:
+            if alias.name == SETUPTOOLS_MODULE:
+                self._bind(alias.asname or alias.name, setuptools_module=True)
+            else:
+                self._unbind(alias.asname or alias.name.partition(".")[0])
+
+    def _stmt_ImportFrom(self, node: ast.ImportFrom):
+        for alias in node.names:
+            if alias.name == "*":
+                raise NotStaticError(f"Star import in line {node.lineno}")
+            name = alias.asname or alias.name
+            if node.module == SETUPTOOLS_MODULE and alias.name == "setup":
+                self._bind(name, setup_function=True)
+            elif node.module == SETUPTOOLS_MODULE and alias.name in packages.FUNCTIONS:
+                self._bind(name, finder=packages.FUNCTIONS[alias.name])
+            else:
+                self._unbind(name)
+
+    def _stmt_Assign(self, node: ast.Assign):
+        if not all(isinstance(target, ast.Name) for target in node.targets):
+            raise NotStaticError(f"Unsupported assignment in line {node.lineno}")
+        self._assign([target.id for target in node.targets], node.value)
+
+    def _stmt_AnnAssign(self, node: ast.AnnAssign):
+        if not isinstance(node.target, ast.Name):
+            raise NotStaticError(f"Unsupported assignment in line {node.lineno}")
+        if node.value is not None:
+            self._assign([node.target.id], node.value)
+
+    def _stmt_If(self, node: ast.If):
+        test = node.test
+        if (
+            isinstance(test, ast.Compare)
+            and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__"
+            and len(test.ops) == 1
+            and isinstance(test.ops[0], ast.Eq)
+            and self._expr(test.comparators[0]) == "__main__"
+        ):
+            self.run(node.body)
+            return
+        raise NotStaticError(f"Unsupported condition in line {node.lineno}")
+
+    def _stmt_Try(self, node: ast.Try):
+        # Allow the classic fallback to distutils, setuptools is always available
+        if not all(
+            isinstance(statement, (ast.Import, ast.ImportFrom))
+            and self._imports_only_setuptools(statement)
+            for statement in node.body
+        ):
+            raise NotStaticError(f"Unsupported try block in line {node.lineno}")
+        self.run(node.body)
+        self.run(node.orelse)
+        self.run(node.finalbody)
+
+    def _stmt_With(self, node: ast.With):
+        for item in node.items:
+            value = self._expr(item.context_expr)
+            if not isinstance(value, _OpenFile):
+                raise NotStaticError(f"Unsupported with block in line {node.lineno}")
+            if item.optional_vars is not None:
+                if not isinstance(item.optional_vars, ast.Name):
+                    raise NotStaticError(f"Unsupported with in line {node.lineno}")
+                self._bind(item.optional_vars.id, value)
+        self.run(node.body)
+
+    def _stmt_Pass(self, node: ast.Pass):
+        pass
+
+    def _setup_call(self, node: ast.Call):
+        if self.setup_args is not None:
+            raise NotStaticError(f"setup() called twice in line {node.lineno}")
+        if node.args:
+            raise NotStaticError("setup() called with positional arguments")
+        setup_args = {}
+        for keyword in node.keywords:
+            value = self._expr(keyword.value)
+            if keyword.arg is not None:
+                setup_args[keyword.arg] = value
+            elif isinstance(value, dict):
+                setup_args.update(value)
+            else:
+                raise NotStaticError(f"Invalid **kwargs in line {node.lineno}")
+        self.setup_args = setup_args
+        self.setup_call = node
+
+    ### Names ###
+
+    def _bind(
+        self,
+        name,
+        value=None,
+        setuptools_module=False,
+        setup_function=False,
+        finder=None,
+    ):
+        self._unbind(name)
+        if setuptools_module:
+            self.setuptools_names.add(name)
+        elif setup_function:
+            self.setup_names.add(name)
+        elif finder is not None:
+            self.finder_names[name] = finder
+        else:
+            self.names[name] = value
+
+    def _unbind(self, name):
+        self.bound.add(name)
+        self.names.pop(name, None)
+        self.setuptools_names.discard(name)
+        self.setup_names.discard(name)
+        self.finder_names.pop(name, None)
+
+    def _assign(self, names: list, value_node: ast.expr):
+        try:
+            value = self._expr(value_node)
+        except NotStaticError:
+            # Unevaluable values can still be ignored as long as they cannot
+            # modify the values we know about, which could be used by setup()
+            for child in ast.walk(value_node):
+                if isinstance(child, ast.Name) and isinstance(
+                    self.names.get(child.id), _MUTABLE_TYPES
+                ):
+                    raise
+            for name in names:
+                self._unbind(name)
+            return
+        for name in names:
+            self._bind(name, value)
+
+    def _is_setup(self, node: ast.expr) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in self.setup_names
+        return (
+            isinstance(node, ast.Attribute)
+            and node.attr == "setup"
+            and isinstance(node.value, ast.Name)
+            and node.value.id in self.setuptools_names
+        )
+
+    def _finder(self, node: ast.expr) -> typing.Optional[bool]:
+        """Whether the package finder called finds namespaces, None if not one"""
+        if isinstance(node, ast.Name):
+            return self.finder_names.get(node.id)
+        if (
+            isinstance(node, ast.Attribute)
+            and node.attr in packages.FUNCTIONS
+            and isinstance(node.value, ast.Name)
+            and node.value.id in self.setuptools_names
+        ):
+            return packages.FUNCTIONS[node.attr]
+        return None
+
+    @staticmethod
+    def _imports_only_setuptools(node) -> bool:
+        if isinstance(node, ast.Import):
+            return all(alias.name == SETUPTOOLS_MODULE for alias in node.names)
+        return node.module == SETUPTOOLS_MODULE
+
+    ### Expressions ###
+
+    def _expr(self, node: ast.expr):
+        method = getattr(self, f"_expr_{type(node).__name__}", None)
+        if method is None:
+            raise NotStaticError(f"Unsupported expression in line {node.lineno}")
+        return method(node)
+
+    def _expr_Constant(self, node: ast.Constant):
+        return node.value
+
+    def _expr_Name(self, node: ast.Name):
+        try:
+            return self.names[node.id]
+        except KeyError:
+            raise NotStaticError(f"Unknown name {node.id!r}") from None
+
+    def _elements(self, nodes: list) -> list:
+        elements = []
+        for node in nodes:
+            if isinstance(node, ast.Starred):
+                elements.extend(self._expr(node.value))
+            else:
+                elements.append(self._expr(node))
+        return elements
+
+    def _expr_List(self, node: ast.List):
+        return self._elements(node.elts)
+
+    def _expr_Tuple(self, node: ast.Tuple):
+        return tuple(self._elements(node.elts))
+
+    def _expr_Set(self, node: ast.Set):
+        return set(self._elements(node.elts))
+
+    def _expr_Dict(self, node: ast.Dict):
+        result = {}
+        for key, value in zip(node.keys, node.values):
+            if key is None:
+                result.update(self._expr(value))
+            else:
+                result[self._expr(key)] = self._expr(value)
+        return result
+
+    def _expr_BinOp(self, node: ast.BinOp):
+        left, right = self._expr(node.left), self._expr(node.right)
+        if (
+            not isinstance(node.op, ast.Add)
+            or type(left) is not type(right)
+            or not isinstance(left, (str, list, tuple))
+        ):
+            raise NotStaticError(f"Unsupported operation in line {node.lineno}")
+        return left + right
+
+    def _expr_JoinedStr(self, node: ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.FormattedValue):
+                if value.conversion != -1 or value.format_spec is not None:
+                    raise NotStaticError(f"Unsupported f-string in line {node.lineno}")
+                value = self._expr(value.value)
+                if not isinstance(value, (str, int)):
+                    raise NotStaticError(f"Unsupported f-string in line {node.lineno}")
+                parts.append(str(value))
+            else:
+                parts.append(self._expr(value))
+        return "".join(parts)
+
+    def _expr_Call(self, node: ast.Call):
+        if any(isinstance(arg, ast.Starred) for arg in node.args) or any(
+            keyword.arg is None for keyword in node.keywords
+        ):
+            raise NotStaticError(f"Unsupported call in line {node.lineno}")
+        args = [self._expr(arg) for arg in node.args]
+        kwargs = {keyword.arg: self._expr(keyword.value) for keyword in node.keywords}
+        func = node.func
+        if (
+            isinstance(func, ast.Name)
+            and func.id == "open"
+            and "open" not in self.bound
+        ):
+            return self._call(node, self._open, args, kwargs)
+        namespaces = self._finder(func)
+        if namespaces is not None:
+            finder = functools.partial(
+                packages.FoundPackages, root=packages.project_root(self.project_root)
+            )
+            return self._call(node, finder, [namespaces, *args], kwargs)
+        if isinstance(func, ast.Attribute):
+            target = self._expr(func.value)
+            if func.attr in SAFE_METHODS.get(type(target), ()):
+                return self._call(node, getattr(target, func.attr), args, kwargs)
+        raise NotStaticError(f"Unsupported call in line {node.lineno}")
+
+    @staticmethod
+    def _call(node, func, args, kwargs):
+        try:
+            return func(*args, **kwargs)
+        except NotStaticError:
+            raise
+        except Exception as e:
+            raise NotStaticError(f"Failed call in line {node.lineno}: {e!r}") from None
+
+    def _open(self, file, mode="r", encoding=None):
+        if not isinstance(file, str) or mode not in ("r", "rt"):
+            raise NotStaticError(f"Unsupported open({file!r}, {mode!r}) call")
+        return _OpenFile(self.project_root / file, encoding)
@@ -0,0 +1,145 @@
+"""Stands in for the modules setup.py imports that are not installed
+
+While active, imports made from the code of setup.py that no finder can
+resolve get a permissive stub module instead of raising ImportError.
+Anything taken from a stub is a stub as well, it can be called, indexed,
+iterated and subclassed, so building `ext_modules` with numpy or Cython
+does not need them installed. Stubs iterate over a single stub, not to
+turn into empty containers that look like genuine values. Stubs turned into text are
+wrapped in a marker, kept through concatenation and formatting, so the
+strings built from them are known to be derived as well. Imports made by
+installed libraries are left alone, as they often probe for optional
+modules.
+"""
+import contextlib
+import importlib.abc
+import importlib.machinery
+import sys
+import types
+
+# Private use character around the text of stubs
+MARKER = "\ue000"
+
+
+class StubObject:
+    """Anything obtained from a stubbed module"""
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_stub_name", name)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return StubObject(f"{self._stub_name}.{name}")
+
+    def __setattr__(self, name: str, value):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return StubObject(f"{self._stub_name}()")
+
+    def __getitem__(self, key):
+        return StubObject(f"{self._stub_name}[{key!r}]")
+
+    def __iter__(self):
+        return iter((self[0],))
+
+    def __len__(self):
+        return 1
+
+    def __mro_entries__(self, bases):
+        return (StubClass,)
+
+    def __str__(self):
+        return f"{MARKER}{self._stub_name}{MARKER}"
+
+    def __format__(self, format_spec):
+        return str(self)
+
+    def __fspath__(self):
+        return str(self)
+
+    def __repr__(self):
+        return f"<stub {self._stub_name}>"
+
+
+class StubClass:
+    """Base of the classes defined by subclassing a stub"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class StubModule(types.ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__path__ = []  # Submodules are stubbed as well
+
+    def __getattr__(self, name: str):
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return StubObject(f"{self.__name__}.{name}")
+
+
+class _Loader(importlib.abc.Loader):
+    def create_module(self, spec):
+        return StubModule(spec.name)
+
+    def exec_module(self, module):
+        pass
+
+
+class _Finder(importlib.abc.MetaPathFinder):
+    """Last finder in sys.meta_path, stubbing the imports of a namespace"""
+
+    def __init__(self, namespace: dict):
+        self.namespace = namespace
+        self.stubbed = []
+
+    def find_spec(self, fullname, path, target=None):
+        if not self._imported_from_namespace():
+            return None
+        self.stubbed.append(fullname)
+        return importlib.machinery.ModuleSpec(fullname, _Loader(), is_package=True)
+
+    def _imported_from_namespace(self) -> bool:
+        # The import system and importlib.import_module() are skipped
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_globals.get("__name__", "").startswith(
+            ("importlib", __name__)
+        ):
+            frame = frame.f_back
+        return frame is not None and frame.f_globals is self.namespace
+
+
+@contextlib.contextmanager
+def missing_imports(namespace: dict):
+    """Stubs the missing modules imported by the code run in namespace
+
+    Yields the list of the names of the modules stubbed. Stubs are removed
+    from sys.modules on exit.
+    """
+    finder = _Finder(namespace)
+    sys.meta_path.append(finder)
+    try:
+        yield finder.stubbed
+    finally:
+        sys.meta_path.remove(finder)
+        for name in finder.stubbed:
+            if isinstance(sys.modules.get(name), StubModule):
+                del sys.modules[name]
+
+
+def is_derived(value) -> bool:
+    """Whether value is, or holds, something obtained from a stub"""
+    if isinstance(value, (StubObject, StubModule)):
+        return True
+    if isinstance(value, str):
+        return MARKER in value
+    if isinstance(value, type):
+        return issubclass(value, StubClass)
+    if isinstance(value, dict):
+        return any(is_derived(key) or is_derived(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return any(is_derived(item) for item in value)
+    return False
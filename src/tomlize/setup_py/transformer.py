@@ -1,41 +1,128 @@
 """Transforms setuptools setup_py metadata to toml dict"""
+import dataclasses
 import logging
 import pathlib
 
-import packaging.requirements
-
-from .fields_mapping import FIELDS_MAPPING
+from .. import cache, profiling, requirements, requirements_files, tracking
+from ..options import Options
+from ..report import CACHED, EXEC, Report
+from ..setup_cfg.reader import read_setup_cfg
+from .fields_mapping import DYNAMIC_FIELDS_MAPPING, FIELDS_MAPPING
 from .reader import extract_setup_args
+from .remover import CodeTarget
 
 MIN_SETUPTOOLS_VERSION = "62.0.0"  # TODO: Find minimal version
+README_FILES = ["README.rst", "README.md"]
+SETUP_CFG = "setup.cfg"
 
 
-def extract(setup_py_path: pathlib.Path) -> dict:
-    data = extract_setup_args(setup_py_path)
-    data = {key: value["value"] for key, value in data.items()}
-    setup_requires = data.pop("setup_requires", [])
-    ret = {}
-    ret["build-system"] = _generate_build_metadata(setup_requires)
-    ret.update(_transform_fields(data, setup_py_path.parent))
+def extract(
+    setup_py_path: pathlib.Path, options: Options = None, report: Report = None
+) -> dict:
+    options = options or Options()
+    report = report or Report()
+    extraction_cache = None
+    if options.cache_dir is not None:
+        extraction_cache = cache.get_cache(options.cache_dir, options.cache_size)
+        if cached := extraction_cache.get(setup_py_path, [*README_FILES, SETUP_CFG]):
+            ret, unexpected, migrated = cached
+            report.evaluations[setup_py_path] = CACHED
+            report.code_targets[setup_py_path] = [
+                CodeTarget(*target) for target in migrated
+            ]
+            _warn_unexpected(unexpected)
+            return ret
+
+    with tracking.reads() as files_read:
+        ret, unexpected, migrated = _extract(setup_py_path, options, report)
+    # Results of stubbed imports depend on the modules installed, not cached
+    if extraction_cache is not None and setup_py_path not in report.stubs:
+        extraction_cache.put(
+            setup_py_path,
+            files_read,
+            [ret, unexpected, [dataclasses.astuple(target) for target in migrated]],
+            [*README_FILES, SETUP_CFG],
+            # Only the files read by static evaluations are known
+            listed=report.evaluations.get(setup_py_path) == EXEC,
+        )
+    report.code_targets[setup_py_path] = migrated
+    _warn_unexpected(unexpected)
     return ret
 
 
+def _extract(setup_py_path: pathlib.Path, options: Options, report: Report) -> tuple:
+    """Returns the pyproject data, the fields that could not be converted
+    and the code targets of the arguments of setup() that were
+    """
+    data = extract_setup_args(setup_py_path, options, report)
+    targets = {key: value["code"] for key, value in data.items() if value["code"]}
+    data = {key: value["value"] for key, value in data.items()}
+    directives = {}
+    setup_cfg_path = setup_py_path.parent / SETUP_CFG
+    if setup_cfg_path.exists():
+        # setup() reads setup.cfg as well, its own arguments take precedence
+        with profiling.stage("read"):
+            cfg_data, cfg_directives = read_setup_cfg(setup_cfg_path)
+        directives = {k: v for k, v in cfg_directives.items() if k not in data}
+        data = {**cfg_data, **data}
+    ret, unexpected = transform(data, setup_py_path.parent, directives)
+    migrated = [target for key, target in targets.items() if key not in unexpected]
+    return ret, unexpected, migrated
+
+
+def transform(data: dict, project_root: pathlib.Path, directives=None) -> tuple:
+    """Returns the pyproject data for the arguments of setup()
+
+    The fields that could not be converted are returned as well. directives
+    are the fields whose value is only known at build time, as read from
+    setup.cfg.
+    """
+    with profiling.stage("transform"):
+        _expand_requirements(data, project_root)
+        setup_requires = data.pop("setup_requires", [])
+        ret = {}
+        ret["build-system"] = _generate_build_metadata(setup_requires)
+        ret.update(_transform_fields(data, project_root))
+        _transform_directives(directives or {}, data, ret)
+    return ret, list(data)
+
+
+def _expand_requirements(data: dict, project_root: pathlib.Path):
+    """Resolves the -r includes and drops the pip options in requirements
+
+    As found when setup.py reads requirements files into install_requires.
+    """
+    if "install_requires" in data:
+        data["install_requires"] = requirements_files.expand(
+            data["install_requires"], project_root
+        )
+    if isinstance(data.get("extras_require"), dict):
+        data["extras_require"] = {
+            extra: requirements_files.expand(extra_requires, project_root)
+            for extra, extra_requires in data["extras_require"].items()
+        }
+
+
+def _warn_unexpected(fields: list):
+    for field in fields:
+        logging.warning("Unexpected field found: %s", field)
+
+
 def _generate_build_metadata(setup_requires):
-    build_system = {"build-backend": "setuptools.build_meta", "requires": []}
-    for req_str in setup_requires:
-        req = packaging.requirements.Requirement(req_str)
-        if req.name == "setuptools":
+    build_system = {"requires": [], "build-backend": "setuptools.build_meta"}
+    has_setuptools = False
+    for req_str in requirements.dedupe(requirements.clean(setup_requires)):
+        req = requirements.parse(req_str)
+        if requirements.canonical_name(req_str) == "setuptools":
             if not req.specifier or list(
                 req.specifier.filter([MIN_SETUPTOOLS_VERSION])
             ):
                 # Specified setuptools is not enough, skip and use default
                 continue
+            has_setuptools = True
         build_system["requires"].append(req_str)
 
-    if not any(
-        packaging.requirements.Requirement(r).name == "setuptools"
-        for r in build_system["requires"]
-    ):
+    if not has_setuptools:
         build_system["requires"].append(
             f"setuptools >= {MIN_SETUPTOOLS_VERSION}",
         )
@@ -65,13 +152,41 @@ def _transform_fields(data: dict, project_root: pathlib.Path) -> dict:
             raise Exception("Invalid mapping type {target!r} for key {field_key!r}")
 
     ### Enhancements ###
-    for name in ["README.rst", "README.md"]:
+    for name in README_FILES:
         if project_root.joinpath(name).exists():
             ret["project"]["readme"] = name
     # TODO: Find and use license-file (glob)
 
-    ### Warn on remaining fields ###
-    for field in data:
-        logging.warning("Unexpected field found: %s", field)
-
     return ret
+
+
+def _transform_directives(directives: dict, data: dict, ret: dict):
+    """Declares the fields given through attr: and file: as dynamic
+
+    Fields that cannot be dynamic are left in data, as unexpected.
+    """
+    dynamic = {}
+    for field_key, directive in directives.items():
+        if field_key not in DYNAMIC_FIELDS_MAPPING:
+            data[field_key] = directive
+            continue
+        dynamic[DYNAMIC_FIELDS_MAPPING[field_key]] = directive
+
+    content_type = data.pop("long_description_content_type", None)
+    readme = dynamic.get("readme", {}).get("file")
+    if readme is not None and len(readme) == 1:
+        # A single file can be declared statically
+        del dynamic["readme"]
+        ret["project"]["readme"] = readme[0]
+        if content_type is not None:
+            ret["project"]["readme"] = {"file": readme[0], "content-type": content_type}
+    elif readme is not None:
+        ret["project"].pop("readme", None)
+        if content_type is not None:
+            dynamic["readme"]["content-type"] = content_type
+    elif content_type is not None:
+        data["long_description_content_type"] = content_type
+
+    if dynamic:
+        ret["project"]["dynamic"] = list(dynamic)
+        ret.setdefault("tool", {}).setdefault("setuptools", {})["dynamic"] = dynamic
@@ -0,0 +1,176 @@
+"""Transforms the INI configuration of tools to toml dict
+
+Each file is parsed once and every section of it is converted with the
+function registered for its name. The sections of tox.ini that belong to
+tox itself are kept verbatim in `tool.tox.legacy_tox_ini`, as tox reads
+its configuration from there.
+"""
+import configparser
+import fnmatch
+import logging
+import pathlib
+import re
+
+import tomlkit
+
+from . import exceptions, profiling
+from .options import Options
+from .report import Report
+
+TOX_INI = "tox.ini"
+_SECTION_HEADER = re.compile(r"^\[([^\]]+)\]\s*$")
+_INTEGER = re.compile(r"^-?\d+$")
+
+# Options of coverage.py that must be given as arrays in pyproject.toml
+COVERAGE_LIST_OPTIONS = {
+    "concurrency",
+    "debug",
+    "disable_warnings",
+    "exclude_also",
+    "exclude_lines",
+    "include",
+    "omit",
+    "partial_branches",
+    "partial_branches_always",
+    "plugins",
+    "source",
+    "source_pkgs",
+}
+
+
+def _value(value: str):
+    """Typed value of an option, values given in lines become arrays"""
+    if "\n" in value:
+        lines = (line.strip().rstrip(",").strip() for line in value.splitlines())
+        return [line for line in lines if line]
+    value = value.strip()
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if _INTEGER.match(value):
+        return int(value)
+    return value
+
+
+def _tool(result: dict, name: str) -> dict:
+    return result.setdefault("tool", {}).setdefault(name, {})
+
+
+def flake8(section: str, values: dict, result: dict):
+    # Read through the flake8-pyproject plugin, flake8 has no support
+    _tool(result, "flake8").update({k: _value(v) for k, v in values.items()})
+
+
+def pytest(section: str, values: dict, result: dict):
+    # ini_options is read as the ini file would, so values are kept as strings
+    ini_options = _tool(result, "pytest").setdefault("ini_options", {})
+    for key, value in values.items():
+        lines = _value(value)
+        ini_options[key] = lines if isinstance(lines, list) else value.strip()
+
+
+def mypy(section: str, values: dict, result: dict):
+    _tool(result, "mypy").update({k: _value(v) for k, v in values.items()})
+
+
+def mypy_override(section: str, values: dict, result: dict):
+    modules = [module.strip() for module in section[len("mypy-") :].split(",")]
+    override = {"module": modules if len(modules) > 1 else modules[0]}
+    override.update({k: _value(v) for k, v in values.items()})
+    _tool(result, "mypy").setdefault("overrides", []).append(override)
+
+
+def isort(section: str, values: dict, result: dict):
+    _tool(result, "isort").update({k: _value(v) for k, v in values.items()})
+
+
+def coverage(section: str, values: dict, result: dict):
+    name = section.removeprefix("coverage:")
+    options = {}
+    for key, value in values.items():
+        value = _value(value)
+        if (name == "paths" or key in COVERAGE_LIST_OPTIONS) and not isinstance(
+            value, list
+        ):
+            value = [item.strip() for item in str(value).split(",") if item.strip()]
+        options[key] = value
+    _tool(result, "coverage").setdefault(name, {}).update(options)
+
+
+COVERAGE_SECTIONS = ["run", "report", "html", "xml", "json", "lcov", "paths"]
+
+# Sections of each file, as glob patterns, to the function converting them
+SECTIONS_MAPPING = {
+    TOX_INI: {
+        "flake8": flake8,
+        "pytest": pytest,
+        "isort": isort,
+        "coverage:*": coverage,
+    },
+    ".flake8": {"flake8": flake8},
+    "pytest.ini": {"pytest": pytest},
+    "mypy.ini": {"mypy": mypy, "mypy-*": mypy_override},
+    ".mypy.ini": {"mypy": mypy, "mypy-*": mypy_override},
+    ".coveragerc": {name: coverage for name in COVERAGE_SECTIONS},
+    ".isort.cfg": {"settings": isort, "isort": isort},
+}
+
+
+def _find_converter(file_name: str, section: str):
+    for pattern, converter in SECTIONS_MAPPING[file_name].items():
+        if fnmatch.fnmatchcase(section, pattern):
+            return converter
+    return None
+
+
+def _raw_sections(content: str) -> dict:
+    """Text of each section, including its header and comments
+
+    The text of sections repeated is concatenated, their options are
+    merged when parsed.
+    """
+    sections = {}
+    current = None
+    for line in content.splitlines(keepends=True):
+        if match := _SECTION_HEADER.match(line):
+            current = match.group(1).strip()
+            sections.setdefault(current, "")
+        if current is not None:
+            sections[current] += line
+    return sections
+
+
+def extract(
+    config_path: pathlib.Path, options: Options = None, report: Report = None
+) -> dict:
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    parser.optionxform = str
+    try:
+        content = config_path.read_text(encoding="utf-8")
+        with profiling.stage("read"):
+            parser.read_string(content, source=str(config_path))
+    except FileNotFoundError:
+        raise exceptions.FailedToParseError(config_path, "File not found")
+    except configparser.Error as e:
+        raise exceptions.FailedToParseError(config_path, e) from None
+
+    with profiling.stage("transform"):
+        result = {}
+        unconverted = []
+        for section in parser.sections():
+            converter = _find_converter(config_path.name, section)
+            if converter is None:
+                unconverted.append(section)
+                continue
+            converter(section, dict(parser.items(section)), result)
+
+        if config_path.name == TOX_INI and unconverted:
+            raw_sections = _raw_sections(content)
+            legacy = "".join(raw_sections[section] for section in unconverted)
+            legacy = legacy.strip("\n") + "\n"
+            _tool(result, "tox")["legacy_tox_ini"] = tomlkit.string(
+                legacy, literal="'''" not in legacy, multiline=True
+            )
+            unconverted = []
+    for section in unconverted:
+        logging.warning("Unexpected section found: %s", section)
+    return result
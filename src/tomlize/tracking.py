@@ -0,0 +1,48 @@
+"""Tracks the files read while converting
+
+Relies on the "open" audit event, so reads done by executed setup.py
+files and by the modules they import are seen as well.
+"""
+import contextlib
+import os
+import sys
+import threading
+
+_local = threading.local()
+_hook_installed = False
+
+
+def _audit_hook(event, args):
+    if event != "open" or not getattr(_local, "recorders", None):
+        return
+    path, mode, flags = args
+    if path is None or isinstance(path, int):
+        return
+    if mode is not None and any(char in mode for char in "wax+"):
+        return
+    if mode is None and flags & (os.O_WRONLY | os.O_RDWR):
+        return
+    record([os.path.abspath(os.fsdecode(path))])
+
+
+def record(paths):
+    """Adds paths read elsewhere (e.g. in a child process) to the active trackers"""
+    for recorder in getattr(_local, "recorders", ()):
+        recorder.update(paths)
+
+
+@contextlib.contextmanager
+def reads():
+    """Yields a set populated with the absolute paths of the files read"""
+    global _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_audit_hook)
+        _hook_installed = True
+    if not hasattr(_local, "recorders"):
+        _local.recorders = []
+    files = set()
+    _local.recorders.append(files)
+    try:
+        yield files
+    finally:
+        _local.recorders.remove(files)
@@ -0,0 +1,139 @@
+"""Keeps pyproject.toml up to date while its inputs are edited
+
+The process stays warm between changes. The files within the project
+that each converter reads are polled, and only the converters whose
+files changed are run again. Their data is merged into the content
+pyproject.toml had when the watch started, so values that are edited
+or removed from the inputs are not left behind, and the file is only
+written when the rendered document differs.
+"""
+import dataclasses
+import logging
+import os
+import pathlib
+import time
+import typing
+
+import tomlkit
+
+from . import converter, emitter, merger, project, tracking
+from .exceptions import MergingError
+from .options import Options
+from .report import Report
+
+POLL_INTERVAL = 0.2
+
+
+def _signature(path: pathlib.Path) -> typing.Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclasses.dataclass
+class _Extraction:
+    """Data of an input file, None if it failed, and the files it depends on"""
+
+    data: typing.Optional[dict]
+    files: dict
+
+    def is_stale(self) -> bool:
+        return any(
+            _signature(path) != signature for path, signature in self.files.items()
+        )
+
+
+class Watcher:
+    """Converts a project, reusing the data of the inputs that did not change"""
+
+    def __init__(
+        self,
+        input_file: pathlib.Path,
+        output_file: pathlib.Path,
+        options: Options = None,
+    ):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.options = options or Options()
+        self.extractions = {}
+        self.base = project.read(output_file)
+        self.written = self.base
+
+    def _extract(self, input_file: pathlib.Path) -> _Extraction:
+        project_root = input_file.parent.resolve()
+        report = Report()
+        data = None
+        with tracking.reads() as files_read:
+            try:
+                data = converter.extract(input_file, self.options, report)
+            except (Exception, SystemExit) as error:
+                logging.error("Failed to convert %s: %s", input_file, error)
+        files = {
+            pathlib.Path(path)
+            for path in files_read
+            if pathlib.Path(path).is_relative_to(project_root)
+        }
+        files.add(input_file.resolve())
+        return _Extraction(data, {path: _signature(path) for path in files})
+
+    def update(self) -> bool:
+        """Converts the inputs that changed, returns if pyproject.toml was written"""
+        input_files = converter.project_inputs(self.input_file, self.options)
+        changed = False
+        for input_file in input_files:
+            extraction = self.extractions.get(input_file)
+            if extraction is None or extraction.is_stale():
+                self.extractions[input_file] = self._extract(input_file)
+                changed = True
+        for input_file in set(self.extractions) - set(input_files):
+            del self.extractions[input_file]
+            changed = True
+
+        current = project.read(self.output_file)
+        if current != self.written:
+            # Edited by someone else, their changes are kept
+            self.base = self.written = current
+            changed = True
+        if not changed or any(
+            self.extractions[input_file].data is None for input_file in input_files
+        ):
+            return False
+        return self._render(input_files, current)
+
+    def _render(self, input_files: list, current: typing.Optional[str]) -> bool:
+        config = tomlkit.parse(self.base) if self.base else {}
+        try:
+            for input_file in input_files:
+                merger.add_data(
+                    config,
+                    self.extractions[input_file].data,
+                    on_conflict=self.options.on_conflict,
+                )
+        except MergingError as error:
+            logging.error("Failed to convert files: %s", error)
+            return False
+        rendered = tomlkit.dumps(config) if self.base else emitter.dumps(config)
+        if rendered == current:
+            return False
+        project.write(self.output_file, rendered)
+        self.written = rendered
+        return True
+
+
+def watch(
+    input_file: pathlib.Path,
+    output_file: pathlib.Path,
+    options: Options = None,
+    interval: float = POLL_INTERVAL,
+):
+    """Updates output_file whenever the inputs change, until interrupted"""
+    watcher = Watcher(input_file, output_file, options)
+    logging.info("Watching %s for changes, press Ctrl+C to stop", input_file)
+    while True:
+        start = time.perf_counter()
+        if watcher.update():
+            elapsed = (time.perf_counter() - start) * 1000
+            logging.info("%s updated in %.1fms", output_file, elapsed)
+        time.sleep(interval)
@@ -0,0 +1,243 @@
+import json
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+from tomlize import batch, main
+from tomlize.options import Options
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name={name!r}, version="1.0.0")
+"""
+
+
+@pytest.fixture(autouse=True)
+def tmp_ws(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_project(root, name, content=None):
+    project_dir = root / name
+    project_dir.mkdir(parents=True)
+    setup_py = project_dir / "setup.py"
+    if content is None:
+        content = SETUP_PY.format(name=project_dir.name)
+    setup_py.write_text(content)
+    return setup_py
+
+
+def run(*args):
+    main.main([os.fspath(arg) for arg in args])
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_folder(tmp_path, capsys, jobs):
+    make_project(tmp_path, "first")
+    make_project(tmp_path, "nested/second")
+
+    run(tmp_path, "--jobs", jobs)
+
+    assert 'name = "first"' in (tmp_path / "first/pyproject.toml").read_text()
+    assert 'name = "second"' in (tmp_path / "nested/second/pyproject.toml").read_text()
+    assert "Converted 2 projects, 0 failed" in capsys.readouterr().err
+    assert not (tmp_path / "pyproject.toml").exists()
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_isolates_failures(tmp_path, capsys, jobs):
+    good = make_project(tmp_path, "good")
+    bad = make_project(tmp_path, "bad", "THIS IS NOT PYTHON")
+
+    with pytest.raises(SystemExit):
+        run(good, bad, "--jobs", jobs)
+
+    assert (tmp_path / "good/pyproject.toml").exists()
+    assert not (tmp_path / "bad/pyproject.toml").exists()
+    captured = capsys.readouterr()
+    assert f"{bad}: Failed to parse" in captured.err
+    assert "Converted 1 projects, 1 failed" in captured.err
+
+
+def test_batch_fork_server(tmp_path, capsys):
+    make_project(tmp_path, "first")
+    make_project(
+        tmp_path,
+        "second",
+        "import setuptools\ndef name(): return 'second'\nsetuptools.setup(name=name())",
+    )
+
+    run(tmp_path, "--jobs", "2", "--fork-server")
+
+    assert 'name = "second"' in (tmp_path / "second/pyproject.toml").read_text()
+    assert "1 setup.py read statically, 1 executed" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--fork-server"], "--fork-server is not supported on this platform"),
+        (["--timeout", "1"], "resource limits are not supported on this platform"),
+    ],
+)
+def test_needs_fork(tmp_path, capsys, monkeypatch, args, message):
+    monkeypatch.delattr(os, "fork")
+    with pytest.raises(SystemExit) as exc_info:
+        run(tmp_path, *args)
+    assert exc_info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_batch_setup_cfg_projects(tmp_path, capsys):
+    make_project(tmp_path, "shim", "import setuptools\nsetuptools.setup()\n")
+    (tmp_path / "shim/setup.cfg").write_text("[metadata]\nname = shim\n")
+    (tmp_path / "declarative").mkdir()
+    (tmp_path / "declarative/setup.cfg").write_text("[metadata]\nname = cfg\n")
+
+    run(tmp_path, "--jobs", "1")
+
+    assert 'name = "shim"' in (tmp_path / "shim/pyproject.toml").read_text()
+    assert 'name = "cfg"' in (tmp_path / "declarative/pyproject.toml").read_text()
+    err = capsys.readouterr().err
+    assert "Converted 2 projects, 0 failed (1 setup.py read statically" in err
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_jsonl(tmp_path, capsys, jobs):
+    make_project(tmp_path, "first")
+    make_project(tmp_path, "bad", "THIS IS NOT PYTHON")
+
+    with pytest.raises(SystemExit):
+        run(tmp_path, "--format", "jsonl", "--jobs", jobs)
+
+    lines = capsys.readouterr().out.splitlines()
+    records = {
+        os.path.basename(os.path.dirname(record["path"])): record
+        for record in map(json.loads, lines)
+    }
+    assert len(lines) == 2
+    assert records["first"]["data"]["project"]["name"] == "first"
+    assert records["first"]["error"] is None
+    assert records["bad"]["data"] is None
+    assert "Failed to parse" in records["bad"]["error"]
+    assert not (tmp_path / "first/pyproject.toml").exists()
+
+
+def test_jsonl_records_warnings(tmp_path, capsys):
+    setup_py = make_project(
+        tmp_path, "warned", 'import setuptools\nsetuptools.setup(name="w", foo=1)\n'
+    )
+
+    run(setup_py, "--format", "jsonl")
+
+    (record,) = map(json.loads, capsys.readouterr().out.splitlines())
+    assert record["data"]["project"]["name"] == "w"
+    assert record["warnings"] == ["Unexpected field found: foo"]
+
+
+@pytest.mark.parametrize("args", [["--check"], ["--diff"], ["--watch"]])
+def test_jsonl_invalid_arguments(tmp_path, capsys, args):
+    setup_py = make_project(tmp_path, "package")
+    with pytest.raises(SystemExit) as exc_info:
+        run(setup_py, "--format", "jsonl", *args)
+    assert exc_info.value.code == 2
+    assert "--format jsonl" in capsys.readouterr().err
+
+
+def test_git_ref_needs_jsonl(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        run(tmp_path, "--git-ref", "HEAD")
+    assert exc_info.value.code == 2
+    assert "--git-ref needs --format jsonl" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_timeout(tmp_path, capsys, jobs):
+    make_project(tmp_path, "good")
+    make_project(tmp_path, "loop", "import setuptools\nwhile True: pass\n")
+
+    with pytest.raises(SystemExit):
+        run(tmp_path, "--jobs", jobs, "--timeout", "0.5")
+
+    assert (tmp_path / "good/pyproject.toml").exists()
+    captured = capsys.readouterr()
+    assert "Exceeded the wall-clock limit of 0.5s" in captured.err
+    assert "Converted 1 projects, 1 failed" in captured.err
+
+
+def test_batch_groups_files_by_folder(tmp_path, capsys):
+    first = make_project(tmp_path, "first")
+    (tmp_path / "first/mypy.ini").write_text("[mypy]\nstrict = True\n")
+    second = make_project(tmp_path, "second")
+
+    run(first, tmp_path / "first/mypy.ini", second, "--no-tools", "--jobs", "1")
+
+    assert "[tool.mypy]" in (tmp_path / "first/pyproject.toml").read_text()
+    assert "Converted 2 projects, 0 failed" in capsys.readouterr().err
+
+
+def test_find_inputs_uses_the_walk(tmp_path):
+    setup_py = make_project(tmp_path, "project")
+    for name in ("mypy.ini", "tox.ini", "requirements.txt", "requirements-dev.txt"):
+        (tmp_path / "project" / name).write_text("")
+    (tmp_path / "project/.gitignore").write_text("tox.ini\nrequirements-dev.txt\n")
+
+    with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+        (inputs,) = batch.find_inputs([tmp_path], Options(requirements=True))
+
+    assert inputs == [
+        setup_py,
+        tmp_path / "project/requirements.txt",
+        tmp_path / "project/mypy.ini",
+    ]
+    # Only scanned by the walk
+    scanned = [os.fspath(call.args[0]) for call in scandir.call_args_list]
+    assert scanned.count(os.fspath(tmp_path / "project")) == 1
+
+
+def _square(input_file, options):
+    return input_file**2
+
+
+def test_iter_records_more_inputs_than_in_flight():
+    records = batch.iter_records(range(10), jobs=2, extract=_square)
+    assert sorted(records) == [index**2 for index in range(10)]
+
+
+# Only set in the process running the tests
+_IN_TESTS_PROCESS = False
+
+
+def _extract_in_tests_process(input_file, options):
+    return _IN_TESTS_PROCESS
+
+
+def test_batch_workers_are_not_forked(monkeypatch):
+    # Discovery threads could be running, forking would copy their locks
+    monkeypatch.setattr(sys.modules[__name__], "_IN_TESTS_PROCESS", True)
+    records = batch.iter_records([1, 2], jobs=2, extract=_extract_in_tests_process)
+    assert list(records) == [False, False]
+
+
+@pytest.mark.parametrize(
+    "options, inputs_first",
+    [(Options(), False), (Options(fork=True), True), (Options(timeout=5), True)],
+)
+def test_batch_inputs_found_before_forking(options, inputs_first):
+    events = []
+
+    def inputs():
+        for name in ["a", "b"]:
+            events.append(f"found {name}")
+            yield name
+
+    def extract(input_file, options):
+        events.append(f"extract {input_file}")
+
+    list(batch.iter_records(inputs(), jobs=1, options=options, extract=extract))
+    if inputs_first:
+        assert events == ["found a", "found b", "extract a", "extract b"]
+    else:
+        assert events == ["found a", "extract a", "found b", "extract b"]
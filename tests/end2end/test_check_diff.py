@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from tomlize import main
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name={name!r}, version="1.0.0")
+"""
+
+
+@pytest.fixture(autouse=True)
+def tmp_ws(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_project(root, name):
+    setup_py = root / name / "setup.py"
+    setup_py.parent.mkdir(parents=True)
+    setup_py.write_text(SETUP_PY.format(name=name))
+    return setup_py
+
+
+def run(*args):
+    main.main([os.fspath(arg) for arg in args])
+
+
+def test_check_fails_when_changes_are_needed(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "package")
+    with pytest.raises(SystemExit) as exc_info:
+        run(setup_py, "--check")
+    assert exc_info.value.code == 1
+    assert not (tmp_path / "pyproject.toml").exists()
+    assert "would change" in capsys.readouterr().err
+
+
+def test_check_passes_when_migrated(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "package")
+    run(setup_py)
+    before = (tmp_path / "pyproject.toml").read_text()
+    run(setup_py, "--check")
+    assert (tmp_path / "pyproject.toml").read_text() == before
+
+
+def test_diff(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "package")
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 88\n")
+    run(setup_py, "--diff")
+    out = capsys.readouterr().out
+    assert out.startswith("--- a/pyproject.toml\n+++ b/pyproject.toml\n")
+    assert '+name = "package"\n' in out
+    assert (
+        tmp_path / "pyproject.toml"
+    ).read_text() == "[tool.black]\nline-length = 88\n"
+
+
+def test_batch_combined_diff(tmp_path, capsys):
+    make_project(tmp_path, "first")
+    make_project(tmp_path, "second")
+    run("second", "--jobs", "1")
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit):
+        run(tmp_path, "--jobs", "2", "--diff", "--check")
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith("--- /dev/null\n+++ b/first/pyproject.toml\n")
+    assert "second/pyproject.toml" not in captured.out
+    assert "1 projects would change" in captured.err
+    assert not (tmp_path / "first/pyproject.toml").exists()
+
+
+def test_rerun_does_not_touch_pyproject_toml(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "package")
+    run(setup_py)
+    os.utime(tmp_path / "pyproject.toml", ns=(0, 0))
+    run(setup_py)
+    assert (tmp_path / "pyproject.toml").stat().st_mtime_ns == 0
+    assert "already up to date" in capsys.readouterr().out
@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+from tomlize import main
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name={name!r}, version="1.0.0")
+"""
+
+
+@pytest.fixture(autouse=True)
+def tmp_ws(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_project(root, name):
+    setup_py = root / name / "setup.py"
+    setup_py.parent.mkdir(parents=True)
+    setup_py.write_text(SETUP_PY.format(name=name))
+    return setup_py
+
+
+def run(*args):
+    main.main([os.fspath(arg) for arg in args])
+
+
+def profile_rows(err):
+    return {line.split()[0]: line.split()[1:] for line in err.splitlines()}
+
+
+def test_profile(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "package")
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 88\n")
+    run(setup_py, "--profile-output", tmp_path / "profile.json")
+    rows = profile_rows(capsys.readouterr().err)
+    for stage in ("static", "transform", "parse", "merge", "dump", "write"):
+        assert rows[stage][0] == "1"
+    profile = json.loads((tmp_path / "profile.json").read_text())
+    assert profile["static"]["count"] == 1
+    assert profile["static"]["functions"]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_profile(tmp_path, capsys, jobs):
+    make_project(tmp_path, "first")
+    make_project(tmp_path, "second")
+    run(tmp_path, "--profile", "--jobs", jobs)
+    rows = profile_rows(capsys.readouterr().err)
+    for stage in ("static", "dump", "write"):
+        assert rows[stage][0] == "2"
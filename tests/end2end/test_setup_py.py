@@ -9,6 +9,7 @@ import tarfile
 
 import pkginfo
 import pytest
+import tomlkit
 
 from tomlize import main
 
@@ -70,6 +71,34 @@ def test_end_to_end_failure(capsys):
     assert "Failed to convert" in captured.err
 
 
+def test_end_to_end_conflict(setup_py, tmp_path, capsys):
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "other"\n')
+    with pytest.raises(SystemExit) as exc_info:
+        run(setup_py)
+
+    assert exc_info.value.code == 1
+    assert "Failed to convert files: " in capsys.readouterr().err
+    assert (tmp_path / "pyproject.toml").read_text() == '[project]\nname = "other"\n'
+
+
+def test_end_to_end_timeout(tmp_path, capsys):
+    setup_py = tmp_path / "setup.py"
+    setup_py.write_text("import setuptools\nwhile True: pass\n")
+    with pytest.raises(SystemExit) as exc_info:
+        run(setup_py, "--timeout", "0.5")
+
+    assert exc_info.value.code == 1
+    captured = capsys.readouterr()
+    assert "Failed to convert files: " in captured.err
+    assert "Exceeded the wall-clock limit of 0.5s" in captured.err
+    assert not (tmp_path / "pyproject.toml").exists()
+
+
+def test_end_to_end_memory_limit(setup_py):
+    run(setup_py, "--memory-limit", "4096")
+    assert 'name = "package"' in pathlib.Path("pyproject.toml").read_text()
+
+
 def test_entry_point():
     proc = subprocess.run(
         [sys.executable, "-m", "tomlize", "-h"],
@@ -226,3 +255,74 @@ def test_top_packages_conversion(tmp_path, monkeypatch, package_name):
     with contextlib.suppress(ValueError):
         mismatches.remove("description")
     assert not mismatches
+
+
+def test_setup_cfg(tmp_path, empty_pyproject_toml):
+    setup_cfg = tmp_path / "setup.cfg"
+    setup_cfg.write_text(
+        """
+[metadata]
+name = package
+version = attr: package.__version__
+long_description = file: README.md
+long_description_content_type = text/markdown
+
+[options]
+packages = find:
+install_requires =
+    six
+"""
+    )
+    run(setup_cfg)
+    assert "[tool.setuptools.dynamic.version]" in empty_pyproject_toml.read_text()
+
+
+def test_tool_configs(tmp_path, setup_py, empty_pyproject_toml):
+    (tmp_path / "tox.ini").write_text(
+        "[tox]\nenvlist = py311\n[flake8]\nmax-complexity = 10\n"
+    )
+    (tmp_path / ".coveragerc").write_text("[run]\nbranch = true\n")
+    (tmp_path / "mypy.ini").write_text("[mypy]\nstrict = True\n")
+    run(setup_py)
+    content = tomlkit.parse(empty_pyproject_toml.read_text())
+    assert content["project"]["name"] == "package"
+    assert content["tool"]["flake8"] == {"max-complexity": 10}
+    assert content["tool"]["coverage"] == {"run": {"branch": True}}
+    assert content["tool"]["mypy"] == {"strict": True}
+    assert content["tool"]["tox"]["legacy_tox_ini"] == "[tox]\nenvlist = py311\n"
+
+
+def test_no_tools(tmp_path, setup_py, empty_pyproject_toml):
+    (tmp_path / "mypy.ini").write_text("[mypy]\nstrict = True\n")
+    run(setup_py, "--no-tools")
+    assert "tool" not in tomlkit.parse(empty_pyproject_toml.read_text())
+
+
+def test_requirements_files(tmp_path, setup_py, empty_pyproject_toml):
+    (tmp_path / "requirements.txt").write_text("attrs\n")
+    (tmp_path / "requirements-test.txt").write_text("-r requirements.txt\npytest\n")
+    run(setup_py, "--requirements")
+    project = tomlkit.parse(empty_pyproject_toml.read_text())["project"]
+    assert project["dependencies"] == ["six", "python-dateutil>=2.7.0", "attrs"]
+    assert project["optional-dependencies"] == {
+        "docker": ["binaryornot"],
+        "test": ["pytest"],
+    }
+
+
+def test_several_inputs(tmp_path, setup_py, empty_pyproject_toml, capsys):
+    (tmp_path / "tox.ini").write_text("[flake8]\nmax-complexity = 10\n")
+    run(setup_py, tmp_path / "tox.ini", "--no-tools", "--profile")
+    content = tomlkit.parse(empty_pyproject_toml.read_text())
+    assert content["project"]["name"] == "package"
+    assert content["tool"]["flake8"] == {"max-complexity": 10}
+    stages = {
+        line.split()[0]: line.split()[1]
+        for line in capsys.readouterr().err.splitlines()
+    }
+    assert stages["parse"] == stages["dump"] == stages["write"] == "1"
+
+
+def test_cache_options(tmp_path, setup_py):
+    run(setup_py, "--cache-dir", tmp_path / "cache", "--cache-size", "1")
+    assert any((tmp_path / "cache").iterdir())
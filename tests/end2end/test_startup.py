@@ -0,0 +1,42 @@
+"""Validates the cost of starting the command line tool"""
+import re
+import subprocess
+import sys
+
+# Budget for importing tomlize when printing the help, in microseconds
+IMPORT_TIME_BUDGET = 100_000
+HEAVY_MODULES = [
+    "coloredlogs",
+    "packaging",
+    "setuptools",
+    "tomlkit",
+    "unittest.mock",
+]
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_times(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if match := IMPORT_TIME_LINE.match(line):
+            _, cumulative, indent, module = match.groups()
+            times[module] = (int(cumulative), len(indent))
+    return times
+
+
+def test_help_import_time():
+    times = import_times("-m", "tomlize", "--help")
+
+    assert not [module for module in HEAVY_MODULES if module in times]
+    tomlize_time = sum(
+        cumulative
+        for module, (cumulative, depth) in times.items()
+        if module.startswith("tomlize") and depth == 1
+    )
+    assert tomlize_time < IMPORT_TIME_BUDGET
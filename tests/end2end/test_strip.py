@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from tomlize import main
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name={name!r}, version="1.0.0")
+"""
+
+
+@pytest.fixture(autouse=True)
+def tmp_ws(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_project(root, name):
+    setup_py = root / name / "setup.py"
+    setup_py.parent.mkdir(parents=True)
+    setup_py.write_text(SETUP_PY.format(name=name))
+    return setup_py
+
+
+def run(*args):
+    main.main([os.fspath(arg) for arg in args])
+
+
+def test_strip(tmp_path):
+    setup_py = tmp_path / "setup.py"
+    setup_py.write_text(
+        """import setuptools
+
+setuptools.setup(
+    name="package",
+    version="1.0.0",
+    install_requires=["six"],
+    tests_require=["pytest"],
+)
+"""
+    )
+    run(setup_py, "--strip")
+    assert 'name = "package"' in (tmp_path / "pyproject.toml").read_text()
+    assert setup_py.read_text() == (
+        """import setuptools
+
+setuptools.setup(
+    tests_require=["pytest"],
+)
+"""
+    )
+    run(setup_py, "--strip", "--check")
+
+
+def test_strip_keeps_crlf_and_comments(tmp_path):
+    setup_py = tmp_path / "setup.py"
+    setup_py.write_bytes(
+        b"import setuptools\r\n"
+        b"setuptools.setup(\r\n"
+        b'    name="package",  # The name\r\n'
+        b'    version="1.0",\r\n'
+        b"    # Only used by tests\r\n"
+        b'    tests_require=["pytest"],\r\n'
+        b")\r\n"
+    )
+    run(setup_py, "--strip")
+    assert setup_py.read_bytes() == (
+        b"import setuptools\r\n"
+        b"setuptools.setup(\r\n"
+        b"    # Only used by tests\r\n"
+        b'    tests_require=["pytest"],\r\n'
+        b")\r\n"
+    )
+
+
+def test_batch_strip_diff(tmp_path, capsys):
+    make_project(tmp_path, "first")
+    setup_py = make_project(tmp_path, "second")
+    run(tmp_path, "--strip", "--diff", "-j", "1")
+    out = capsys.readouterr().out
+    assert "--- a/second/setup.py\n+++ b/second/setup.py\n" in out
+    assert "-setuptools.setup(name='second', version=\"1.0.0\")\n" in out
+    assert "+setuptools.setup()\n" in out
+    assert setup_py.read_text() == SETUP_PY.format(name="second")
+
+
+def test_batch_strip(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "first")
+    make_project(tmp_path, "second")
+    run(tmp_path, "--strip", "-j", "1")
+    assert setup_py.read_text() == "\nimport setuptools\nsetuptools.setup()\n"
+    assert 'name = "first"' in (tmp_path / "first/pyproject.toml").read_text()
+
+
+def test_strip_diff(tmp_path, capsys):
+    setup_py = make_project(tmp_path, "package")
+    run(setup_py, "--strip", "--diff")
+    out = capsys.readouterr().out
+    assert f"--- a/{setup_py}\n+++ b/{setup_py}\n" in out
+    assert "+setuptools.setup()\n" in out
+    assert setup_py.read_text() == SETUP_PY.format(name="package")
+
+
+@pytest.mark.parametrize("args", [["--watch"], ["--format", "jsonl"]])
+def test_strip_invalid_arguments(tmp_path, capsys, args):
+    setup_py = make_project(tmp_path, "package")
+    with pytest.raises(SystemExit) as exc_info:
+        run(setup_py, "--strip", *args)
+    assert exc_info.value.code == 2
+    assert "--strip cannot be combined" in capsys.readouterr().err
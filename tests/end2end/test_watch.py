@@ -0,0 +1,52 @@
+import os
+from unittest import mock
+
+import pytest
+
+from tomlize import main
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name={name!r}, version="1.0.0")
+"""
+
+
+@pytest.fixture(autouse=True)
+def tmp_ws(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_project(root, name):
+    setup_py = root / name / "setup.py"
+    setup_py.parent.mkdir(parents=True)
+    setup_py.write_text(SETUP_PY.format(name=name))
+    return setup_py
+
+
+def run(*args):
+    main.main([os.fspath(arg) for arg in args])
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--check"], "--watch cannot be combined with --check or --diff"),
+        (["--diff"], "--watch cannot be combined with --check or --diff"),
+        (["other/setup.py"], "--watch needs a single file to convert"),
+        (["."], "--watch needs a single file to convert"),
+    ],
+)
+def test_watch_invalid_arguments(tmp_path, capsys, args, message):
+    setup_py = make_project(tmp_path, "package")
+    with pytest.raises(SystemExit) as exc_info:
+        # Inputs after the options would not be parsed as inputs
+        run(setup_py, *args, "--watch")
+    assert exc_info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_watch(tmp_path, monkeypatch):
+    setup_py = make_project(tmp_path, "package")
+    monkeypatch.setattr("time.sleep", mock.Mock(side_effect=KeyboardInterrupt))
+    run(setup_py, "--watch")
+    assert 'name = "package"' in (tmp_path / "pyproject.toml").read_text()
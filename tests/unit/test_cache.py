@@ -0,0 +1,150 @@
+import os
+
+import pytest
+
+from tomlize import cache, tracking
+from tomlize.cache import Cache
+from tomlize.options import Options
+from tomlize.report import CACHED, EXEC, STATIC, Report
+from tomlize.setup_py.transformer import extract
+
+
+@pytest.fixture
+def setup_py(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    monkeypatch.chdir(project)
+    yield project / "setup.py"
+
+
+@pytest.fixture
+def options(tmp_path):
+    return Options(cache_dir=tmp_path / "cache")
+
+
+def run(setup_py, options):
+    report = Report()
+    result = extract(setup_py, options, report)
+    return result, report.evaluations[setup_py]
+
+
+def test_cache_hit(setup_py, options):
+    setup_py.write_text("import setuptools\nsetuptools.setup(name='package')")
+    first = run(setup_py, options)
+    second = run(setup_py, options)
+    assert first == (second[0], STATIC)
+    assert second[1] == CACHED
+
+
+def test_cache_shared_between_identical_projects(tmp_path, setup_py, options):
+    setup_py.write_text("import setuptools\nsetuptools.setup(name='package')")
+    other = tmp_path / "other/setup.py"
+    other.parent.mkdir()
+    other.write_text(setup_py.read_text())
+    run(setup_py, options)
+    assert run(other, options)[1] == CACHED
+
+
+def test_cache_invalidated_by_files_read(setup_py, options):
+    setup_py.write_text(
+        """
+import setuptools
+def version():
+    return open("VERSION").read().strip()
+setuptools.setup(name="package", version=version())
+"""
+    )
+    version_file = setup_py.parent / "VERSION"
+    version_file.write_text("1.0.0")
+    assert run(setup_py, options)[1] == EXEC
+    assert run(setup_py, options) == (run(setup_py, options)[0], CACHED)
+
+    version_file.write_text("2.0.0")
+    result, evaluation = run(setup_py, options)
+    assert evaluation == EXEC
+    assert result["project"]["version"] == "2.0.0"
+
+
+def test_cache_invalidated_by_readme(setup_py, options):
+    setup_py.write_text("import setuptools\nsetuptools.setup(name='package')")
+    run(setup_py, options)
+    setup_py.parent.joinpath("README.md").write_text("")
+    result, evaluation = run(setup_py, options)
+    assert evaluation == STATIC
+    assert result["project"]["readme"] == "README.md"
+
+
+def test_cache_replays_warnings(setup_py, options, caplog):
+    caplog.set_level("WARN")
+    setup_py.write_text("import setuptools\nsetuptools.setup(foo='bar')")
+    run(setup_py, options)
+    assert run(setup_py, options)[1] == CACHED
+    assert caplog.messages == ["Unexpected field found: foo"] * 2
+
+
+def test_cache_eviction(tmp_path, setup_py):
+    cache = Cache(tmp_path / "cache", max_size=300)
+    setup_py.write_text("")
+    for i in range(10):
+        setup_py.write_text(f"# {i}")
+        cache.put(setup_py, [], {"value": "x" * 50})
+    assert cache.get(setup_py) == {"value": "x" * 50}
+    sizes = [entry.stat().st_size for entry in cache.directory.iterdir()]
+    assert sum(sizes) <= 300
+
+
+def test_cache_ignores_corrupted_entries(tmp_path, setup_py):
+    cache = Cache(tmp_path / "cache", max_size=10000)
+    setup_py.write_text("")
+    cache.put(setup_py, [], {"value": 1})
+    for entry in cache.directory.iterdir():
+        entry.write_text("{")
+    assert cache.get(setup_py) is None
+
+
+def test_cache_skips_non_serializable(tmp_path, setup_py):
+    cache = Cache(tmp_path / "cache", max_size=10000)
+    setup_py.write_text("")
+    cache.put(setup_py, [], {"value": {1, 2}})
+    assert not os.path.exists(cache.directory) or not list(cache.directory.iterdir())
+
+
+def test_cache_invalidated_by_files_found(tmp_path, monkeypatch, setup_py, options):
+    source = """
+import os
+import setuptools
+version = "0"
+if os.path.exists("VERSION"):
+    version = open("VERSION").read().strip()
+setuptools.setup(name="package", version=version)
+"""
+    setup_py.write_text(source)
+    other = tmp_path / "other/setup.py"
+    other.parent.mkdir()
+    other.write_text(source)
+    other.parent.joinpath("VERSION").write_text("5")
+    assert run(setup_py, options)[0]["project"]["version"] == "0"
+    setup_py.parent.joinpath("pyproject.toml").write_text("")
+    assert run(setup_py, options)[1] == CACHED
+
+    monkeypatch.chdir(other.parent)
+    result, evaluation = run(other, options)
+    assert evaluation == EXEC
+    assert result["project"]["version"] == "5"
+
+
+def test_cache_version_of_missing_distribution():
+    assert cache._version("tomlize-missing-distribution") == "unknown"
+
+
+def test_tracked_reads(tmp_path):
+    read, written = tmp_path / "read", tmp_path / "written"
+    with tracking.reads() as files:
+        # Called directly, the calls made by the interpreter are not traced
+        tracking._audit_hook("open", (os.fspath(read), "r", 0))
+        tracking._audit_hook("open", (os.fsencode(read) + b"2", None, os.O_RDONLY))
+        tracking._audit_hook("open", (os.fspath(written), "w", 0))
+        tracking._audit_hook("open", (os.fspath(written), None, os.O_WRONLY))
+        tracking._audit_hook("open", (3, "r", 0))
+        tracking._audit_hook("exec", (read,))
+    assert files == {os.fspath(read), os.fspath(read) + "2"}
@@ -59,3 +59,26 @@ def test_preserve_comments(setup_py_extract):
     result_text = tomlkit.dumps(result)
     assert "warn_return_any = true  # leave my comment alone" in result_text
     setup_py_extract.assert_called_once()
+
+
+def test_convert_several_inputs(setup_py_extract):
+    setup_py_extract.side_effect = [{"foo": "bar"}, {"tool": {"x": 1}}]
+    result = convert([TEST_CONVERTER_FILE, TEST_CONVERTER_FILE], empty_toml())
+    assert result == {"foo": "bar", "tool": {"x": 1}}
+
+
+def test_convert_several_inputs_failure_merges_nothing(setup_py_extract):
+    setup_py_extract.return_value = {"foo": "bar"}
+    config = empty_toml()
+    with pytest.raises(ConversionError):
+        convert([TEST_CONVERTER_FILE, Path("not-supported")], config)
+    assert config == {}
+
+
+def test_project_inputs(tmp_path):
+    (tmp_path / "setup.py").touch()
+    (tmp_path / "tox.ini").touch()
+    (tmp_path / "mypy.ini").touch()
+    assert tomlize.converter.project_inputs(
+        [tmp_path / "mypy.ini", tmp_path / "setup.py", tmp_path / "mypy.ini"]
+    ) == [tmp_path / "setup.py", tmp_path / "mypy.ini", tmp_path / "tox.ini"]
@@ -0,0 +1,106 @@
+import pytest
+
+from tomlize.discovery import Project, _Ignore, find_projects
+
+
+def touch(path, content=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def find(*paths):
+    return sorted(find_projects(paths), key=lambda project: project.root)
+
+
+def test_finds_projects_and_their_inputs(tmp_path):
+    touch(tmp_path / "a/setup.py")
+    touch(tmp_path / "a/setup.cfg")
+    touch(tmp_path / "a/tox.ini")
+    touch(tmp_path / "a/README.md")
+    touch(tmp_path / "b/c/setup.cfg")
+    touch(tmp_path / "b/c/requirements-dev.txt")
+    touch(tmp_path / "tools/mypy.ini")  # Not a project
+    assert find(tmp_path) == [
+        Project(tmp_path / "a", ("setup.py", "setup.cfg", "tox.ini")),
+        Project(tmp_path / "b/c", ("setup.cfg", "requirements-dev.txt")),
+    ]
+    assert find(tmp_path)[0].project_file == tmp_path / "a/setup.py"
+
+
+@pytest.mark.parametrize(
+    "folder",
+    [
+        "node_modules/pkg",
+        ".tox/py311/lib",
+        "build/lib",
+        "pkg.egg-info",
+        "src/__pycache__",
+    ],
+)
+def test_junk_folders_are_pruned(tmp_path, folder):
+    touch(tmp_path / folder / "setup.py")
+    assert find(tmp_path) == []
+
+
+def test_virtualenvs_are_pruned(tmp_path):
+    touch(tmp_path / "env/pyvenv.cfg")
+    touch(tmp_path / "env/lib/pkg/setup.py")
+    assert find(tmp_path) == []
+
+
+def test_gitignore(tmp_path):
+    touch(tmp_path / ".gitignore", "# Comment\n/generated\nout/\n*.tmp\n!keep.tmp\n")
+    touch(tmp_path / "generated/setup.py")
+    touch(tmp_path / "src/generated/setup.py")  # Anchored to the root only
+    touch(tmp_path / "deep/out/setup.py")
+    touch(tmp_path / "x.tmp/setup.py")
+    touch(tmp_path / "keep.tmp/setup.py")
+    touch(tmp_path / "sub/.gitignore", "docs/**/setup.py\n")
+    touch(tmp_path / "sub/docs/a/b/setup.py")
+    touch(tmp_path / "sub/docs/a/b/setup.cfg")
+    assert find(tmp_path) == [
+        Project(tmp_path / "keep.tmp", ("setup.py",)),
+        Project(tmp_path / "src/generated", ("setup.py",)),
+        Project(tmp_path / "sub/docs/a/b", ("setup.cfg",)),
+    ]
+
+
+def test_gitignore_patterns(tmp_path):
+    touch(tmp_path / ".gitignore", "a**b\nv?\n[xy]z\nsetup.cfg/\n")
+    for folder in ["a-long-b", "v1", "xz"]:
+        touch(tmp_path / folder / "setup.py")
+    for folder in ["v10", "wz"]:
+        touch(tmp_path / folder / "setup.py")
+        touch(tmp_path / folder / "setup.cfg")  # Only folders are ignored
+    assert find(tmp_path) == [
+        Project(tmp_path / "v10", ("setup.py", "setup.cfg")),
+        Project(tmp_path / "wz", ("setup.py", "setup.cfg")),
+    ]
+
+
+def test_gitignore_rules_only_apply_within_their_folder(tmp_path):
+    ignore = _Ignore().extend(str(tmp_path / "a"), "setup.py\n")
+    assert ignore.match(str(tmp_path / "a/b/setup.py"), is_dir=False)
+    assert not ignore.match(str(tmp_path / "ab/setup.py"), is_dir=False)
+
+
+def test_unreadable_folders_and_gitignore(tmp_path):
+    touch(tmp_path / "setup.py")
+    (tmp_path / ".gitignore").write_bytes(b"\xff\n")
+    assert find(tmp_path, tmp_path / "missing") == [Project(tmp_path, ("setup.py",))]
+
+
+def test_gitignore_of_parent_folders(tmp_path):
+    (tmp_path / ".git").mkdir()
+    touch(tmp_path / ".gitignore", "ignored/\n")
+    touch(tmp_path / "sub/ignored/setup.py")
+    touch(tmp_path / "sub/kept/setup.py")
+    assert find(tmp_path / "sub") == [Project(tmp_path / "sub/kept", ("setup.py",))]
+
+
+def test_streams_projects(tmp_path):
+    for index in range(20):
+        touch(tmp_path / f"p{index}/setup.py")
+    projects = find_projects([tmp_path], workers=2)
+    assert next(projects).inputs == ("setup.py",)
+    projects.close()
@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+import tomlkit
+
+from tomlize import emitter, merger
+
+PROJECT = {
+    "build-system": {
+        "requires": ["setuptools >= 62.0.0"],
+        "build-backend": "setuptools.build_meta",
+    },
+    "project": {
+        "name": "package",
+        "description": 'A "quoted" \\ description é',
+        "dependencies": ["requests>=2", 'click; python_version<"3.8"'],
+        "authors": [{"name": "Author", "email": "author@example.com"}],
+        "entry-points": {"pkg.plugins": {"a": "b:c"}},
+        "urls": {"Home page": "https://example.com"},
+    },
+    "tool": {
+        "setuptools": {
+            "package-dir": {"": "src"},
+            "packages": {"find": {"where": ["src"], "namespaces": False}},
+        },
+        "tox": {
+            "legacy_tox_ini": tomlkit.string("[tox]\n", literal=True, multiline=True)
+        },
+    },
+}
+
+
+def _tomlkit_dumps(data: dict) -> str:
+    document = tomlkit.TOMLDocument()
+    merger.add_data(document, data)
+    return tomlkit.dumps(document)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        PROJECT,
+        {},
+        {"a": 1, "b": {"c": 2}, "d": 3},
+        {"a": {}, "b": {"c": {}}},
+        {"a": [{"b": 1}, {"c": 2}], "e": [{"f": []}]},
+        {"a": [1, {"b": 2}], "c": [[1, 2], []]},
+        {"a": 1.5, "b": 1e20, "c": True, "d": -3},
+        {"": "", "a.b": "\x00\x1b\x7f\t\n\r\f\b", "é": "é", "a b": {"c": 1}},
+        {"a": datetime.date(2020, 1, 2)},
+    ],
+)
+def test_dumps_as_tomlkit(data):
+    rendered = emitter.dumps(data)
+    assert rendered == _tomlkit_dumps(data).replace("\\e", "\\u001b")
+    assert tomlkit.parse(rendered) == data
+    assert tomlkit.dumps(tomlkit.parse(rendered)) == rendered
+
+
+def test_dumps_super_tables():
+    assert emitter.dumps({"tool": {"a": {"b": 1}, "c": {}}}) == (
+        "[tool.a]\nb = 1\n\n[tool.c]\n"
+    )
+
+
+def test_dumps_tables_in_arrays_of_tables():
+    # Every header is preceded by a blank line, unlike tomlkit here
+    data = {"a": [{"b": 1}, {"c": {"d": 2}}]}
+    rendered = emitter.dumps(data)
+    assert rendered == "[[a]]\nb = 1\n\n[[a]]\n\n[a.c]\nd = 2\n"
+    assert tomlkit.parse(rendered) == data
+
+
+@pytest.mark.parametrize(
+    "data, error",
+    [
+        ({"a": None}, tomlkit.exceptions.ConvertError),
+        ({"a": {1, 2}}, tomlkit.exceptions.ConvertError),
+        ({1: "a"}, TypeError),
+    ],
+)
+def test_dumps_unsupported(data, error):
+    with pytest.raises(error):
+        emitter.dumps(data)
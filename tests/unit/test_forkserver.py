@@ -0,0 +1,153 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from tomlize.exceptions import FailedToParseError
+from tomlize.options import Options
+from tomlize.report import EXEC, Report
+from tomlize.setup_py import forkserver
+from tomlize.setup_py.reader import _exec_in_child, extract_setup_args
+
+FORK = Options(fork=True)
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def test_call_runs_in_child():
+    assert forkserver.call(os.getpid) != os.getpid()
+
+
+def test_call_raises_child_errors():
+    with pytest.raises(ValueError, match="boom"):
+        forkserver.call(fail, "boom")
+
+
+def test_call_child_dies():
+    with pytest.raises(forkserver.ForkedChildError):
+        forkserver.call(os._exit, 3)
+
+
+def spin():
+    while True:
+        pass
+
+
+def allocate(size):
+    return len(bytearray(size))
+
+
+def spawn_sleeper(pid_file):
+    import subprocess
+
+    process = subprocess.Popen(["sleep", "30"])
+    pid_file.write_text(str(process.pid))
+    process.wait()
+
+
+def is_running(pid):
+    """Killed processes not reaped yet are still listed, as zombies"""
+    try:
+        with open(f"/proc/{pid}/stat") as fp:
+            return fp.read().rpartition(")")[2].split()[0] not in ("Z", "X")
+    except FileNotFoundError:
+        return False
+
+
+def test_call_timeout():
+    with pytest.raises(forkserver.LimitExceededError, match="wall-clock limit"):
+        forkserver.call(spin, timeout=0.2)
+
+
+def test_call_timeout_kills_spawned_processes(tmp_path):
+    pid_file = tmp_path / "pid"
+    with pytest.raises(forkserver.LimitExceededError):
+        forkserver.call(spawn_sleeper, pid_file, timeout=1)
+    pid = int(pid_file.read_text())
+    for _ in range(100):
+        if not is_running(pid):
+            break
+        time.sleep(0.01)
+    assert not is_running(pid)
+
+
+def test_call_cpu_limit():
+    with pytest.raises(forkserver.LimitExceededError, match="CPU time limit"):
+        forkserver.call(spin, cpu_time=1)
+
+
+def test_call_memory_limit():
+    with pytest.raises(forkserver.LimitExceededError, match="memory limit of 512"):
+        forkserver.call(allocate, 2**33, memory=512 * 2**20)
+
+
+def test_call_within_limits():
+    assert forkserver.call(allocate, 10, timeout=5, cpu_time=5, memory=2**33) == 10
+
+
+def test_caused_by():
+    try:
+        try:
+            raise MemoryError
+        except MemoryError:
+            raise ValueError("while allocating")
+    except ValueError as error:
+        assert forkserver._caused_by(error, MemoryError)
+        assert not forkserver._caused_by(error, KeyError)
+
+
+def test_failed_to_parse_error_pickles():
+    error = pickle.loads(pickle.dumps(FailedToParseError("setup.py", "oops")))
+    assert (error.filename, error.error) == ("setup.py", "oops")
+
+
+@pytest.fixture
+def setup_py(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / "setup.py"
+
+
+def test_extract_in_child(setup_py):
+    setup_py.write_text(
+        """
+import setuptools
+def version(): return "1.0.0"
+setuptools.setup(name="package", version=version())
+"""
+    )
+    report = Report()
+    assert {
+        key: value["value"]
+        for key, value in extract_setup_args(setup_py, FORK, report).items()
+    } == {"name": "package", "version": "1.0.0"}
+    assert report.evaluations == {setup_py: EXEC}
+
+
+def test_extract_in_child_drops_unpicklable_values(setup_py, caplog):
+    setup_py.write_text(
+        """
+import setuptools
+setuptools.setup(name="package", cmdclass={"build": lambda: None})
+"""
+    )
+    assert list(extract_setup_args(setup_py, FORK)) == ["name"]
+    # What the child runs, children are not measured by coverage
+    kwargs, _, _ = _exec_in_child(setup_py, setup_py.read_text())
+    assert kwargs == {"name": "package"}
+    assert "Ignoring field cmdclass, its value cannot be copied" in caplog.text
+
+
+@pytest.mark.parametrize("code", ["import pkgconfig", "import sys; sys.exit(1)"])
+def test_extract_in_child_errors(setup_py, code):
+    setup_py.write_text(code)
+    with pytest.raises(FailedToParseError):
+        extract_setup_args(setup_py, FORK)
+
+
+def test_extract_with_timeout(setup_py):
+    setup_py.write_text("import setuptools\nwhile True: pass\nsetuptools.setup()")
+    with pytest.raises(FailedToParseError, match="wall-clock limit of 0.2s"):
+        extract_setup_args(setup_py, Options(timeout=0.2))
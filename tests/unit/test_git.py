@@ -0,0 +1,196 @@
+import json
+import os
+import subprocess
+from unittest import mock
+
+import pytest
+
+from tomlize import git, main
+from tomlize.options import Options
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name="package", version="1.0.0", install_requires=["six"])
+"""
+EXECUTED_SETUP_PY = """
+import os
+import setuptools
+here = os.path.abspath(os.path.dirname(__file__))
+with open(os.path.join(here, "VERSION")) as fp:
+    version = fp.read().strip()
+setuptools.setup(name="package", version=version)
+"""
+
+
+def _git(repository, *args):
+    subprocess.run(
+        ["git", "-C", str(repository), *args], check=True, capture_output=True
+    )
+
+
+def _commit(repository, files: dict, tag: str):
+    for name, content in files.items():
+        path = repository / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(repository, "add", "--all")
+    _git(repository, "commit", "--quiet", "--message", tag)
+    _git(repository, "tag", tag)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    _git(tmp_path, "init", "--quiet")
+    _git(tmp_path, "config", "user.name", "tomlize")
+    _git(tmp_path, "config", "user.email", "tomlize@example.com")
+    _commit(
+        tmp_path,
+        {
+            "package/setup.py": SETUP_PY,
+            "package/requirements.txt": "-r base/requirements.txt\n",
+            "package/base/requirements.txt": "attrs\n",
+            "package/mypy.ini": "[mypy]\nstrict = True\n",
+        },
+        "v1",
+    )
+    _commit(
+        tmp_path,
+        {"package/setup.py": EXECUTED_SETUP_PY, "package/VERSION": "2.0.0\n"},
+        "v2",
+    )
+    # The working tree is never read
+    (tmp_path / "package/setup.py").write_text("THIS IS NOT PYTHON")
+    return tmp_path
+
+
+def test_git_path(repository):
+    commit, setup_py = git.find_project(repository / "package", "v1")
+    root = setup_py.parent
+    assert str(setup_py) == f"{commit}:package/setup.py"
+    assert setup_py.read_text() == SETUP_PY
+    assert sorted(path.name for path in root.iterdir()) == [
+        "base",
+        "mypy.ini",
+        "requirements.txt",
+        "setup.py",
+    ]
+    assert (root / "base").is_dir() and not (root / "base").is_file()
+    assert (root / "base/../mypy.ini") == root / "mypy.ini"
+    assert not (root / "VERSION").exists()
+    with pytest.raises(FileNotFoundError):
+        (root / "VERSION").read_text()
+    assert not (root / "setup.py/VERSION").exists()
+    assert git.GitPath(repository, commit).is_dir()
+    with setup_py.open("rb") as fp:
+        assert fp.read() == SETUP_PY.encode()
+    with pytest.raises(PermissionError):
+        setup_py.open("w")
+    assert setup_py != str(setup_py)
+    assert (
+        repr(setup_py) == f"GitPath({str(repository.resolve())!r}, {str(setup_py)!r})"
+    )
+
+
+@pytest.mark.parametrize("fork", [False, True])
+def test_iter_records(repository, fork):
+    records = git.iter_records(
+        [repository / "package"],
+        ["v1", "v2", "missing"],
+        jobs=1,
+        options=Options(requirements=True, fork=fork),
+    )
+    records = {record["ref"]: record for record in records}
+    assert records["v1"]["error"] is None
+    assert records["v1"]["data"]["project"] == {
+        "name": "package",
+        "version": "1.0.0",
+        "dependencies": ["six", "attrs"],
+    }
+    assert records["v1"]["data"]["tool"] == {"mypy": {"strict": True}}
+    assert records["v2"]["error"] is None
+    assert records["v2"]["data"]["project"]["version"] == "2.0.0"
+    assert records["v1"]["commit"] != records["v2"]["commit"]
+    assert records["missing"]["error"] == "Unknown revision 'missing'"
+
+
+def test_executed_setup_py_cannot_read_working_tree(repository):
+    source = "import setuptools\ndef readme(): return open('README.md').read()\n"
+    source += "setuptools.setup(name='package', long_description=readme())\n"
+    _commit(repository, {"package/setup.py": source}, "v3")
+    (repository / "package/README.md").write_text("Not in git")
+    (record,) = git.iter_records([repository / "package"], ["v3"], jobs=1)
+    assert "File not found" in record["error"]
+
+
+def test_find_project_errors(repository, tmp_path_factory):
+    with pytest.raises(git.GitError, match="No project file found in v1:"):
+        git.find_project(repository, "v1")
+    outside = tmp_path_factory.mktemp("outside")
+    with pytest.raises(git.GitError, match="not a git repository"):
+        git.find_project(outside, "v1")
+
+
+def test_cat_file(repository, tmp_path_factory):
+    cat_file = git.CatFile(repository)
+    assert cat_file.read("v1\n") is None
+    assert cat_file.read("v1:missing") is None
+    assert cat_file.read("v1:package/mypy.ini")[1:] == (
+        "blob",
+        b"[mypy]\nstrict = True\n",
+    )
+    cat_file.close()
+
+    cat_file = git.CatFile(tmp_path_factory.mktemp("outside"))
+    cat_file._process.wait()
+    with pytest.raises(git.GitError, match="git cat-file exited"):
+        cat_file.read("v1")
+
+
+def test_git_not_installed(monkeypatch, tmp_path):
+    monkeypatch.setenv("PATH", os.fspath(tmp_path))
+    with pytest.raises(git.GitError, match="Unable to run git"):
+        git.CatFile(tmp_path)
+    with pytest.raises(git.GitError, match="Unable to run git"):
+        git.find_project(tmp_path, "v1")
+
+
+def test_processes_closed_at_exit(repository, monkeypatch):
+    monkeypatch.setattr(git, "_processes", {})
+    process = git.cat_file(repository)
+    # Started by another process, only that one closes it
+    other = git._processes[(os.getpid() + 1, repository)] = git.CatFile(repository)
+    git._close_processes()
+    assert process._process.poll() == 0
+    assert other._process.poll() is None
+    other.close()
+
+
+def test_one_process_per_repository(repository, monkeypatch):
+    _commit(
+        repository, {"package/setup.py": SETUP_PY, "other/setup.py": SETUP_PY}, "v3"
+    )
+    monkeypatch.setattr(git, "_processes", {})
+    with mock.patch.object(git, "CatFile", wraps=git.CatFile) as fake_cat_file:
+        records = list(
+            git.iter_records([repository / "package", repository / "other"], ["v3"], 1)
+        )
+    assert [record["error"] for record in records] == [None, None]
+    fake_cat_file.assert_called_once_with(repository.resolve())
+    (process,) = git._processes.values()
+    process.close()
+
+
+def test_missing_include(repository):
+    files = {"package/setup.py": SETUP_PY, "package/requirements.txt": "-r missing.txt"}
+    _commit(repository, files, "v3")
+    options = Options(requirements=True)
+    (record,) = git.iter_records([repository / "package"], ["v3"], 1, options)
+    assert "File not found" in record["error"]
+
+
+def test_main_git_refs(repository, capsys):
+    folder = os.fspath(repository / "package")
+    main.main([folder, "--format", "jsonl", "--git-ref", "v1", "--jobs", "1"])
+    (record,) = map(json.loads, capsys.readouterr().out.splitlines())
+    assert record["ref"] == "v1"
+    assert record["data"]["project"]["name"] == "package"
@@ -2,7 +2,7 @@ import pytest
 import tomlkit
 
 from tomlize.exceptions import MergingError
-from tomlize.merger import add_data
+from tomlize.merger import KEEP, OVERWRITE, add_data
 
 
 def _as_toml_doc(data):
@@ -61,7 +61,7 @@ def test_insert_project_table():
                 "build-backend": "setuptools.build_meta",
             },
         ),
-        pytest.param(  # Merge 2 requires same key
+        (  # Merge 2 requires same key
             {
                 "requires": ["setuptools>1"],
             },
@@ -71,7 +71,6 @@ def test_insert_project_table():
             {
                 "requires": ["setuptools>2"],
             },
-            marks=pytest.mark.xfail(reason="Needs dedup logic"),
         ),
     ],
 )
@@ -106,3 +105,119 @@ def test_merge_project_key():
     doc = _as_toml_doc({"project": {"name": "poochie"}})
     new = {"project": {"version": "1.0.0"}}
     add_data(doc, new)
+
+
+def test_merge_project_dependencies():
+    doc = _as_toml_doc(
+        {
+            "project": {
+                "dependencies": ["six", "attrs>=20"],
+                "optional-dependencies": {"test": ["pytest"]},
+            }
+        }
+    )
+    new = {
+        "project": {
+            "dependencies": ["six>=1.0", "Attrs >= 20", "requests"],
+            "optional-dependencies": {"test": ["pytest"], "docs": ["sphinx"]},
+        }
+    }
+    add_data(doc, new)
+    assert doc["project"] == {
+        "dependencies": ["six>=1.0", "attrs>=20", "requests"],
+        "optional-dependencies": {"test": ["pytest"], "docs": ["sphinx"]},
+    }
+
+
+EXISTING_PROJECT = """\
+[project]
+name = "poochie"  # the dog
+classifiers = ["Programming Language :: Python"]
+authors = [{name = "Roy"}]
+
+[project.urls]
+Code = "https://example.com/code"
+
+[tool.setuptools]
+zip-safe = false
+"""
+
+
+@pytest.mark.parametrize(
+    ["on_conflict", "name"], [(KEEP, "poochie"), (OVERWRITE, "itchy")]
+)
+def test_deep_merge(on_conflict, name):
+    doc = tomlkit.parse(EXISTING_PROJECT)
+    add_data(
+        doc,
+        {
+            "project": {
+                "name": "itchy",
+                "classifiers": [
+                    "Programming Language :: Python",
+                    "Programming Language :: Python :: 3",
+                ],
+                "authors": [{"name": "Roy"}, {"name": "Scratchy"}],
+                "urls": {"Home-page": "https://example.com"},
+            },
+            "tool": {"setuptools": {"packages": ["poochie"]}},
+        },
+        on_conflict=on_conflict,
+    )
+    assert doc["project"]["name"] == name
+    assert doc["project"]["classifiers"] == [
+        "Programming Language :: Python",
+        "Programming Language :: Python :: 3",
+    ]
+    assert doc["project"]["authors"] == [{"name": "Roy"}, {"name": "Scratchy"}]
+    assert doc["project"]["urls"] == {
+        "Code": "https://example.com/code",
+        "Home-page": "https://example.com",
+    }
+    assert doc["tool"]["setuptools"] == {"zip-safe": False, "packages": ["poochie"]}
+    assert "# the dog" in tomlkit.dumps(doc)
+
+
+def test_merge_conflict_error():
+    doc = tomlkit.parse(EXISTING_PROJECT)
+    with pytest.raises(MergingError, match="project.name"):
+        add_data(doc, {"project": {"name": "itchy"}})
+
+
+@pytest.mark.parametrize(
+    ["on_conflict", "dependencies"],
+    [(KEEP, ["six>=1"]), (OVERWRITE, ["six<1"])],
+)
+def test_merge_conflicting_requirements(on_conflict, dependencies):
+    config = {"project": {"dependencies": ["six>=1"]}}
+    new = {"project": {"dependencies": ["six<1"]}}
+    with pytest.raises(MergingError, match="six<1"):
+        add_data(config, new)
+    add_data(config, new, on_conflict=on_conflict)
+    assert config["project"]["dependencies"] == dependencies
+
+
+def test_merge_unchanged_document_keeps_format():
+    doc = tomlkit.parse(EXISTING_PROJECT)
+    add_data(doc, tomlkit.parse(EXISTING_PROJECT).unwrap())
+    assert tomlkit.dumps(doc) == EXISTING_PROJECT
+
+
+def test_merge_into_plain_dict():
+    data = {"project": {"classifiers": ("a",)}}
+    config = {}
+    add_data(config, data)
+    add_data(config, {"project": {"classifiers": ["a", "b"]}})
+    assert config == {"project": {"classifiers": ["a", "b"]}}
+    assert data == {"project": {"classifiers": ("a",)}}
+
+
+def test_merge_nested_arrays():
+    config = {"tool": {"tox": {"matrix": [["py310", "lint"]]}}}
+    add_data(config, {"tool": {"tox": {"matrix": [["py310", "lint"], ["py311"]]}}})
+    assert config == {"tool": {"tox": {"matrix": [["py310", "lint"], ["py311"]]}}}
+
+
+def test_invalid_conflict_policy():
+    with pytest.raises(ValueError):
+        add_data({}, {}, on_conflict="whatever")
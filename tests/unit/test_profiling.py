@@ -0,0 +1,93 @@
+import time
+
+from tomlize import profiling
+from tomlize.setup_py import forkserver
+
+
+def test_stage_without_profiler():
+    assert profiling.current() is None
+    with profiling.stage("transform"):
+        pass
+
+
+def test_records_stages():
+    with profiling.Profiler() as profiler:
+        with profiling.stage("exec"):
+            time.sleep(0.01)
+        with profiling.stage("merge"):
+            pass
+        with profiling.stage("merge"):
+            pass
+    assert profiling.current() is None
+    report = profiler.report()
+    assert set(report) == {"exec", "merge"}
+    assert report["exec"]["count"] == 1
+    assert report["exec"]["wall"] >= 0.01
+    assert report["merge"]["count"] == 2
+
+
+def _spin(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def test_cpu_of_forked_children():
+    with profiling.Profiler() as profiler:
+        with profiling.stage("exec"):
+            forkserver.call(_spin, 0.1)
+    assert profiler.report()["exec"]["cpu"] >= 0.09
+
+
+def test_nested_stages_are_accounted_in_the_outer_one():
+    with profiling.Profiler() as profiler:
+        with profiling.stage("exec"):
+            with profiling.stage("transform"):
+                pass
+    assert set(profiler.report()) == {"exec"}
+
+
+def test_functions_and_memory():
+    with profiling.Profiler(cprofile=True, memory=True) as profiler:
+        with profiling.stage("dump"):
+            data = [str(number) for number in range(10000)]
+    del data
+    (stats,) = profiler.report().values()
+    assert stats["peak_memory"] > 10000
+    assert any("<listcomp>" in f["function"] for f in stats["functions"])
+
+
+def test_merge_reports():
+    function = {"function": "f", "calls": 1, "own": 0.5, "cumulative": 1.0}
+    first = {"exec": {"count": 1, "wall": 1.0, "cpu": 0.5, "peak_memory": 10}}
+    second = {
+        "exec": {
+            "count": 2,
+            "wall": 2.0,
+            "cpu": 1.0,
+            "peak_memory": 5,
+            "functions": [function],
+        },
+        "dump": {"count": 1, "wall": 0.5, "cpu": 0.5, "peak_memory": 0},
+    }
+    merged = profiling.merge_reports([first, second, second])
+    assert merged["exec"] == {
+        "count": 5,
+        "wall": 5.0,
+        "cpu": 2.5,
+        "peak_memory": 10,
+        "functions": [{"function": "f", "calls": 2, "own": 1.0, "cumulative": 2.0}],
+    }
+    assert merged["dump"]["count"] == 2
+    table = profiling.format_report(merged).splitlines()
+    assert table[0].split() == [
+        "stage",
+        "count",
+        "wall",
+        "(s)",
+        "cpu",
+        "(s)",
+        "peak",
+        "(KiB)",
+    ]
+    assert table[1].split()[:2] == ["exec", "5"]
@@ -0,0 +1,49 @@
+import os
+from unittest import mock
+
+import pytest
+
+from tomlize import project
+
+
+@pytest.fixture
+def pyproject_toml(tmp_path):
+    path = tmp_path / "pyproject.toml"
+    path.write_text('[project]\nname = "package"\n')
+    os.chmod(path, 0o640)
+    os.utime(path, ns=(0, 0))
+    return path
+
+
+def test_write_skips_identical_content(pyproject_toml):
+    assert not project.write(pyproject_toml, '[project]\nname = "package"\n')
+    assert pyproject_toml.stat().st_mtime_ns == 0
+
+
+def test_write_replaces_content(tmp_path, pyproject_toml):
+    assert project.write(pyproject_toml, '[project]\nname = "other"\n')
+    assert pyproject_toml.read_text() == '[project]\nname = "other"\n'
+    assert pyproject_toml.stat().st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["pyproject.toml"]
+
+
+def test_write_new_file(tmp_path):
+    output_file = tmp_path / "pyproject.toml"
+    assert project.write(output_file, "[project]\n")
+    assert output_file.read_text() == "[project]\n"
+
+
+def test_write_through_symlinks(tmp_path, pyproject_toml):
+    link = tmp_path / "link.toml"
+    link.symlink_to(pyproject_toml)
+    assert project.write(link, "[project]\n")
+    assert link.is_symlink()
+    assert pyproject_toml.read_text() == "[project]\n"
+
+
+def test_write_failure_keeps_the_file(tmp_path, pyproject_toml):
+    with mock.patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            project.write(pyproject_toml, "[project]\n")
+    assert pyproject_toml.read_text() == '[project]\nname = "package"\n'
+    assert os.listdir(tmp_path) == ["pyproject.toml"]
@@ -1,4 +1,8 @@
-from tomlize.setup_py.remover import CodeTarget, _remove_lines, remove
+import ast
+
+import pytest
+
+from tomlize.setup_py.remover import CodeTarget, _remove_lines, argument_targets, remove
 
 
 def test_remove_nothing_keeps_format():
@@ -77,3 +81,132 @@ def test_remove_in_a_file(tmp_path):
         some text in a file
 """
     assert remove(file_, [CodeTarget(1, 17, 1, 25)]) == to
+
+
+def test_remove_many_targets_in_any_order():
+    from_ = "".join(f"line {i}\n" for i in range(1000))
+    targets = [CodeTarget(i, 0, i + 1, 0) for i in range(0, 1000, 2)]
+    assert _remove_lines(from_, targets[::-1]) == "".join(
+        f"line {i}\n" for i in range(1, 1000, 2)
+    )
+
+
+def test_remove_duplicated_targets():
+    assert _remove_lines("TOKEN = 1", [CodeTarget(0, 0, 0, 6)] * 2) == "= 1"
+
+
+@pytest.mark.parametrize(
+    "targets",
+    [
+        [CodeTarget(0, 0, 0, 6), CodeTarget(0, 5, 0, 9)],
+        [CodeTarget(0, 0, 1, 1), CodeTarget(0, 5, 0, 6)],
+    ],
+)
+def test_remove_overlapping_targets(targets):
+    with pytest.raises(ValueError, match="Overlapping"):
+        _remove_lines("TOKEN = 1\n2\n", targets)
+
+
+@pytest.mark.parametrize("target", [CodeTarget(5, 0, 5, 1), CodeTarget(0, 0, 0, 20)])
+def test_remove_out_of_range(target):
+    with pytest.raises(ValueError, match="out of range"):
+        _remove_lines("TOKEN = 1\n", [target])
+
+
+def test_remove_inverted_target():
+    with pytest.raises(ValueError, match="Invalid code target"):
+        _remove_lines("TOKEN = 1\n", [CodeTarget(0, 5, 0, 1)])
+
+
+def strip(source, names):
+    call = next(
+        node for node in ast.walk(ast.parse(source)) if isinstance(node, ast.Call)
+    )
+    targets = argument_targets(source, call)
+    return _remove_lines(source, [targets[name] for name in names])
+
+
+MULTILINE_CALL = """setup(
+    name="é",  # Non ASCII
+    version=("1.0"),
+    cmdclass=commands,
+)
+"""
+
+
+@pytest.mark.parametrize(
+    "names, expected",
+    [
+        ([], MULTILINE_CALL),
+        (["name"], 'setup(\n    version=("1.0"),\n    cmdclass=commands,\n)\n'),
+        (["version", "name"], "setup(\n    cmdclass=commands,\n)\n"),
+        (
+            ["cmdclass"],
+            'setup(\n    name="é",  # Non ASCII\n    version=("1.0"),\n)\n',
+        ),
+        (["name", "version", "cmdclass"], "setup(\n)\n"),
+    ],
+)
+def test_argument_targets_multiline(names, expected):
+    assert strip(MULTILINE_CALL, names) == expected
+
+
+@pytest.mark.parametrize(
+    "names, expected",
+    [
+        (["name"], 'setup(version="1", **extra)'),
+        (["version"], 'setup(name="é", **extra)'),
+        (["name", "version"], "setup(**extra)"),
+    ],
+)
+def test_argument_targets_inline(names, expected):
+    assert strip('setup(name="é", version="1", **extra)', names) == expected
+
+
+COMMENTED_CALL = """setup(
+    name="package",  # Trailing comment
+    # About the version
+    version="1.0",
+
+    # About the commands
+    cmdclass=commands
+    # Before the end
+)
+"""
+
+
+@pytest.mark.parametrize(
+    "names, expected",
+    [
+        (
+            ["name"],
+            'setup(\n    # About the version\n    version="1.0",\n\n'
+            "    # About the commands\n    cmdclass=commands\n"
+            "    # Before the end\n)\n",
+        ),
+        (
+            ["cmdclass"],
+            'setup(\n    name="package",  # Trailing comment\n'
+            '    # About the version\n    version="1.0",\n\n'
+            "    # About the commands\n    # Before the end\n)\n",
+        ),
+    ],
+)
+def test_argument_targets_keep_comments_of_others(names, expected):
+    assert strip(COMMENTED_CALL, names) == expected
+
+
+def test_remove_keeps_line_endings(tmp_path):
+    setup_py = tmp_path / "setup.py"
+    setup_py.write_bytes(MULTILINE_CALL.replace("\n", "\r\n").encode())
+    call = ast.parse(setup_py.read_text()).body[0].value
+    targets = argument_targets(setup_py.read_text(), call)
+    assert remove(setup_py, [targets["version"]]) == (
+        'setup(\r\n    name="é",  # Non ASCII\r\n    cmdclass=commands,\r\n)\r\n'
+    )
+
+
+def test_argument_targets_skip_unpacked_kwargs():
+    source = "setup(**extra, name='x')"
+    call = ast.parse(source).body[0].value
+    assert list(argument_targets(source, call)) == ["name"]
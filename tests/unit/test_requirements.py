@@ -0,0 +1,76 @@
+import pytest
+
+from tomlize.exceptions import MergingError
+from tomlize.requirements import add_marker, clean, dedupe, merge_into
+
+
+@pytest.mark.parametrize(
+    ["existing", "new", "output"],
+    [
+        (["six"], ["six"], ["six"]),
+        (["six"], ["six>=1.0"], ["six>=1.0"]),
+        (["six>=1.0"], ["six"], ["six>=1.0"]),
+        (["Six >= 1.0"], ["six>=1.0"], ["Six >= 1.0"]),
+        (["zope.interface"], ["Zope_Interface>1"], ["Zope_Interface>1"]),
+        (["setuptools>1"], ["setuptools>2"], ["setuptools>2"]),
+        (["setuptools>=2"], ["setuptools>2"], ["setuptools>2"]),
+        (["attrs>1"], ["attrs<3"], ["attrs<3,>1"]),
+        (["attrs>1,<4"], ["attrs<3,!=2.0"], ["attrs!=2.0,<3,>1"]),
+        (["attrs"], ["attrs[extra]"], ["attrs", "attrs[extra]"]),
+        (
+            ["attrs; python_version<'3'"],
+            ["attrs"],
+            ["attrs; python_version<'3'", "attrs"],
+        ),
+        (["pkg>1"], ["pkg @ https://x.org/pkg.zip"], ["pkg @ https://x.org/pkg.zip"]),
+        (["not a requirement!"], ["not a requirement!"], ["not a requirement!"]),
+        (["attrs==1.*"], ["attrs>1"], ["attrs==1.*,>1"]),
+        (["attrs>=1"], ["attrs<=1"], ["attrs<=1,>=1"]),
+    ],
+)
+def test_merge_into(existing, new, output):
+    assert merge_into(existing, new) == output
+
+
+def test_dedupe_keeps_order():
+    assert dedupe(["b", "a", "B>1", "c"]) == ["B>1", "a", "c"]
+
+
+@pytest.mark.parametrize(
+    ["existing", "new"],
+    [
+        (["six>=1"], ["six<1"]),
+        (["six>1"], ["six<=1"]),
+        (["attrs==1.0"], ["attrs>1"]),
+        (["pkg @ https://x.org/pkg.zip"], ["pkg @ https://y.org/pkg.zip"]),
+    ],
+)
+def test_merge_into_conflict(existing, new):
+    with pytest.raises(MergingError, match="Conflicting requirement"):
+        merge_into(existing, new)
+
+
+@pytest.mark.parametrize(
+    ["on_conflict", "output"], [("keep", ["six>=1"]), ("overwrite", ["six<1"])]
+)
+def test_dedupe_conflict_policy(caplog, on_conflict, output):
+    assert dedupe(["six>=1", "six<1", "Six"], on_conflict) == output
+    assert ("Conflicting requirement" in caplog.text) is (on_conflict == "keep")
+
+
+def test_clean():
+    assert clean("six\n\n# comment\nattrs  # inline\n") == ["six", "attrs"]
+
+
+@pytest.mark.parametrize(
+    ["requirement", "output"],
+    [
+        ("six", "six; os_name == 'nt'"),
+        (
+            "six; python_version < '3'",
+            "six; (python_version < \"3\") and (os_name == 'nt')",
+        ),
+    ],
+)
+def test_add_marker(requirement, output):
+    assert add_marker(requirement, "os_name == 'nt'") == output
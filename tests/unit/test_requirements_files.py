@@ -0,0 +1,148 @@
+"""Validates the reading of pip requirements files"""
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from tomlize import requirements_files
+from tomlize.converter import find_related_files
+from tomlize.exceptions import FailedToParseError
+from tomlize.options import Options
+from tomlize.setup_py.transformer import extract as extract_setup_py
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_requirements(project):
+    (project / "requirements.txt").write_text(
+        """\
+# Comment
+--index-url https://example.com/simple
+six>=1.0  # Inline comment
+requests==2.31.0 \\
+    --hash=sha256:aaaa \\
+    --hash=sha256:bbbb
+-e ./local
+-c constraints.txt
+attrs; python_version < "3.12"
+SIX<2
+"""
+    )
+    assert requirements_files.extract(project / "requirements.txt") == {
+        "project": {
+            "dependencies": [
+                "SIX<2,>=1.0",
+                "requests==2.31.0",
+                'attrs; python_version < "3.12"',
+            ]
+        }
+    }
+
+
+def test_continued_last_line(project):
+    (project / "requirements.txt").write_text("six\\\n>=1.0 \\")
+    assert requirements_files.extract(project / "requirements.txt") == {
+        "project": {"dependencies": ["six >=1.0"]}
+    }
+
+
+def test_includes(project):
+    (project / "requirements").mkdir()
+    (project / "requirements/shared.txt").write_text("attrs\n")
+    (project / "requirements/base.txt").write_text("-r shared.txt\nsix\n")
+    (project / "requirements.txt").write_text("-r requirements/base.txt\nrequests\n")
+    (project / "requirements-test.txt").write_text(
+        "-rrequirements.txt\n--requirement=requirements/shared.txt\npytest\n"
+    )
+    assert requirements_files.extract(project / "requirements.txt") == {
+        "project": {"dependencies": ["attrs", "six", "requests"]}
+    }
+    # The main dependencies are not repeated in the extras
+    assert requirements_files.extract(project / "requirements-test.txt") == {
+        "project": {"optional-dependencies": {"test": ["attrs", "pytest"]}}
+    }
+
+
+def test_included_files_are_not_extras(project):
+    (project / "setup.py").touch()
+    (project / "requirements.txt").write_text("-r requirements-base.txt\n")
+    (project / "requirements-base.txt").write_text("six\n")
+    (project / "requirements-dev.txt").write_text("-r requirements.txt\npytest\n")
+    options = Options(requirements=True)
+    assert find_related_files(Path("setup.py"), options) == [
+        Path("requirements.txt"),
+        Path("requirements-dev.txt"),
+    ]
+
+
+def test_shared_files_are_parsed_once(project):
+    (project / "shared.txt").write_text("attrs\n")
+    for name in ("first", "second"):
+        (project / name).mkdir()
+        (project / name / "requirements.txt").write_text("-r ../shared.txt\n")
+    requirements_files._parse_file.cache_clear()
+    with mock.patch("builtins.open", wraps=open) as fake_open:
+        for name in ("first", "second"):
+            requirements_files.extract(project / name / "requirements.txt")
+    opened = [call.args[0].name for call in fake_open.call_args_list]
+    assert opened.count("shared.txt") == 1
+    # Modified files are parsed again
+    (project / "shared.txt").write_text("attrs\nsix\n")
+    assert requirements_files.extract(project / "first/requirements.txt") == {
+        "project": {"dependencies": ["attrs", "six"]}
+    }
+
+
+def test_circular_include(project):
+    (project / "requirements.txt").write_text("-r base.txt\n")
+    (project / "base.txt").write_text("-r requirements.txt\n")
+    with pytest.raises(FailedToParseError, match="Circular include"):
+        requirements_files.extract(project / "requirements.txt")
+
+
+def test_missing_include(project):
+    (project / "requirements.txt").write_text("-r missing.txt\n")
+    with pytest.raises(FailedToParseError, match="File not found"):
+        requirements_files.extract(project / "requirements.txt")
+
+
+def test_invalid_requirement_warns(project, caplog):
+    caplog.set_level("WARN")
+    (project / "requirements-docs.txt").write_text("sphinx\n./local/path\n")
+    assert requirements_files.extract(project / "requirements-docs.txt") == {
+        "project": {"optional-dependencies": {"docs": ["sphinx"]}}
+    }
+    assert len(caplog.messages) == 1
+    assert "./local/path" in caplog.messages[0]
+
+
+@pytest.mark.parametrize(
+    ["name", "extra"],
+    [
+        ("requirements.txt", None),
+        ("requirements-dev.txt", "dev"),
+        ("requirements_Test.txt", "test"),
+        ("requirements.docs.txt", "docs"),
+    ],
+)
+def test_extra_name(tmp_path, name, extra):
+    assert requirements_files.extra_name(tmp_path / name) == extra
+
+
+def test_setup_py_reading_requirements(project):
+    (project / "base.txt").write_text("six\n")
+    (project / "requirements.txt").write_text("-r base.txt\nattrs --hash=sha256:aa\n")
+    (project / "setup.py").write_text(
+        """
+import setuptools
+setuptools.setup(install_requires=open("requirements.txt").read().splitlines())
+"""
+    )
+    assert extract_setup_py(project / "setup.py")["project"]["dependencies"] == [
+        "six",
+        "attrs",
+    ]
@@ -0,0 +1,197 @@
+"""Validates the loading of `setup.cfg`"""
+import pathlib
+
+import pytest
+
+from tomlize.exceptions import FailedToParseError
+from tomlize.setup_cfg import extract
+from tomlize.setup_py.transformer import extract as extract_setup_py
+
+SETUP_CFG = """
+[metadata]
+name = package
+version = 1.0.1
+description = My cool package
+author = John Doe
+author_email = john@doe.com
+url = chooserandom.com
+project_urls =
+    Source = https://example.com/source
+keywords = one, two
+classifiers =
+    Programming Language :: Python :: 3.11
+
+[options]
+python_requires = >=3.11
+zip_safe = False
+include_package_data = true
+package_dir =
+    =src
+packages = find:
+install_requires =
+    six
+    python-dateutil>=2.7.0,<3
+setup_requires = setuptools >= 70.0.0
+
+[options.packages.find]
+where = src
+exclude = tests*
+
+[options.extras_require]
+docker = binaryornot
+
+[options.entry_points]
+console_scripts =
+    package = package.cli:main
+
+[options.package_data]
+package = *.json, *.txt
+"""
+
+
+@pytest.fixture
+def setup_cfg(tmp_path):
+    return tmp_path / "setup.cfg"
+
+
+def test_all_attributes(setup_cfg):
+    setup_cfg.write_text(SETUP_CFG)
+    assert extract(setup_cfg) == {
+        "build-system": {
+            "requires": ["setuptools >= 70.0.0"],
+            "build-backend": "setuptools.build_meta",
+        },
+        "project": {
+            "name": "package",
+            "version": "1.0.1",
+            "description": "My cool package",
+            "urls": {
+                "Home-page": "chooserandom.com",
+                "Source": "https://example.com/source",
+            },
+            "keywords": ["one", "two"],
+            "classifiers": ["Programming Language :: Python :: 3.11"],
+            "requires-python": ">=3.11",
+            "authors": [{"email": "john@doe.com", "name": "John Doe"}],
+            "dependencies": ["six", "python-dateutil>=2.7.0,<3"],
+            "optional-dependencies": {"docker": ["binaryornot"]},
+            "entry-points": {"console_scripts": {"package": "package.cli:main"}},
+        },
+        "tool": {
+            "setuptools": {
+                "include-package-data": True,
+                "package-dir": {"": "src"},
+                "packages": {
+                    "find": {
+                        "where": ["src"],
+                        "exclude": ["tests*"],
+                        "namespaces": False,
+                    }
+                },
+                "package-data": {"package": ["*.json", "*.txt"]},
+            }
+        },
+    }
+
+
+def test_directives(setup_cfg):
+    setup_cfg.write_text(
+        """
+[metadata]
+name = package
+version = attr: package.__version__
+long_description = file: README.md
+long_description_content_type = text/markdown
+classifiers = file: classifiers.txt
+
+[options]
+install_requires = file: requirements.txt, requirements-extra.txt
+
+[options.extras_require]
+test = file: requirements-test.txt
+"""
+    )
+    ret = extract(setup_cfg)
+    assert ret["project"] == {
+        "name": "package",
+        "readme": {"file": "README.md", "content-type": "text/markdown"},
+        "dynamic": ["version", "classifiers", "dependencies", "optional-dependencies"],
+    }
+    assert ret["tool"]["setuptools"]["dynamic"] == {
+        "version": {"attr": "package.__version__"},
+        "classifiers": {"file": ["classifiers.txt"]},
+        "dependencies": {"file": ["requirements.txt", "requirements-extra.txt"]},
+        "optional-dependencies": {"test": {"file": ["requirements-test.txt"]}},
+    }
+
+
+def test_readme_from_several_files(setup_cfg):
+    setup_cfg.write_text(
+        """
+[metadata]
+long_description = file: README.rst, CHANGELOG.rst
+long_description_content_type = text/x-rst
+"""
+    )
+    setup_cfg.parent.joinpath("README.rst").write_text("")
+    ret = extract(setup_cfg)
+    assert "readme" not in ret["project"]
+    assert ret["project"]["dynamic"] == ["readme"]
+    assert ret["tool"]["setuptools"]["dynamic"] == {
+        "readme": {
+            "file": ["README.rst", "CHANGELOG.rst"],
+            "content-type": "text/x-rst",
+        }
+    }
+
+
+def test_content_type_without_readme_file_warns(setup_cfg, caplog):
+    caplog.set_level("WARN")
+    setup_cfg.write_text("[metadata]\nlong_description_content_type = text/x-rst\n")
+    extract(setup_cfg)
+    assert caplog.messages == ["Unexpected field found: long_description_content_type"]
+
+
+def test_unexpected_directive_warns(setup_cfg, caplog):
+    caplog.set_level("WARN")
+    setup_cfg.write_text("[metadata]\nlicense = file: LICENSE\n")
+    extract(setup_cfg)
+    assert caplog.messages == ["Unexpected field found: license"]
+
+
+def test_invalid_setup_cfg(setup_cfg):
+    setup_cfg.write_text("name = package\n")
+    with pytest.raises(FailedToParseError, match="setup.cfg"):
+        extract(setup_cfg)
+
+
+def test_invalid_dict_option(setup_cfg):
+    setup_cfg.write_text(
+        "[metadata]\nproject_urls =\n    Source = https://example.com\n    Docs\n"
+    )
+    with pytest.raises(FailedToParseError, match="Invalid line in dict option"):
+        extract(setup_cfg)
+
+
+def test_non_existing_setup_cfg():
+    with pytest.raises(FailedToParseError, match="File not found"):
+        extract(pathlib.Path("ashfjsak/setup.cfg"))
+
+
+def test_setup_py_shim_reads_setup_cfg(setup_cfg):
+    setup_cfg.write_text(SETUP_CFG)
+    setup_py = setup_cfg.parent / "setup.py"
+    setup_py.write_text("import setuptools\nsetuptools.setup()\n")
+    assert extract_setup_py(setup_py) == extract(setup_cfg)
+
+
+def test_setup_py_arguments_take_precedence(setup_cfg):
+    setup_cfg.write_text(
+        "[metadata]\nname = package\nversion = attr: package.__version__\n"
+    )
+    setup_py = setup_cfg.parent / "setup.py"
+    setup_py.write_text("import setuptools\nsetuptools.setup(version='2.0')\n")
+    assert extract_setup_py(setup_py)["project"] == {
+        "name": "package",
+        "version": "2.0",
+    }
@@ -1,9 +1,14 @@
 """Validates the loading of `setup.py`"""
+import os
 import pathlib
+import pickle
+from unittest import mock
 
 import pytest
 
 from tomlize.exceptions import FailedToParseError
+from tomlize.options import Options
+from tomlize.setup_py import packages
 from tomlize.setup_py.transformer import extract
 
 EMPTY_RESULT = {
@@ -240,3 +245,140 @@ setuptools.setup(
     setup_py.parent.joinpath("README.md").write_text("")
 
     assert extract(setup_py)["project"]["keywords"] == ["many", "keywords"]
+
+
+def test_conditional_dependencies_only(setup_py):
+    setup_py.write_text(
+        """
+import setuptools
+setuptools.setup(extras_require={":python_version < '3.8'": ["importlib-metadata"]})
+"""
+    )
+    assert extract(setup_py)["project"] == {
+        "dependencies": ["importlib-metadata; python_version < '3.8'"]
+    }
+
+
+def test_dependencies_normalization(setup_py):
+    setup_py.write_text(
+        """
+import setuptools
+setuptools.setup(
+    install_requires="six\\n# comment\\nsix>=1.0\\nattrs",
+    extras_require={
+        "test": ["pytest", "pytest>=7"],
+        "test:sys_platform == 'win32'": ["pywin32"],
+        ":python_version < '3.8'": ["importlib-metadata"],
+    },
+    setup_requires=["toml", "toml > 1.0"],
+)
+        """
+    )
+    result = extract(setup_py)
+    assert result["project"]["dependencies"] == [
+        "six>=1.0",
+        "attrs",
+        "importlib-metadata; python_version < '3.8'",
+    ]
+    assert result["project"]["optional-dependencies"] == {
+        "test": ["pytest>=7", "pywin32; sys_platform == 'win32'"]
+    }
+    assert result["build-system"]["requires"] == ["toml > 1.0", "setuptools >= 62.0.0"]
+
+
+@pytest.mark.parametrize(
+    "source, find",
+    [
+        (
+            "from setuptools import setup, find_packages\n"
+            "setup(packages=find_packages(exclude=['tests', 'tests.*']))",
+            {"exclude": ["tests", "tests.*"], "namespaces": False},
+        ),
+        (
+            "import setuptools\n"
+            "setuptools.setup(packages=setuptools.find_namespace_packages('src'))",
+            {"where": ["src"], "namespaces": True},
+        ),
+        (
+            "import os, setuptools\n"
+            "here = os.path.abspath(os.path.dirname(__file__))\n"
+            "src = os.path.join(here, 'src')\n"
+            "setuptools.setup(packages=setuptools.find_packages(src, include=['a*']))",
+            {"where": ["src"], "include": ["a*"], "namespaces": False},
+        ),
+    ],
+)
+@pytest.mark.parametrize("fork", [False, True])
+def test_find_packages(setup_py, source, find, fork):
+    setup_py.write_text(source)
+    with mock.patch("setuptools.discovery.PackageFinder.find") as walk:
+        result = extract(setup_py, Options(fork=fork))
+    assert result["tool"]["setuptools"]["packages"] == {"find": find}
+    walk.assert_not_called()
+
+
+def test_find_packages_used(setup_py):
+    setup_py.parent.joinpath("package").mkdir()
+    setup_py.parent.joinpath("package", "__init__.py").write_text("")
+    setup_py.write_text(
+        "from setuptools import setup, find_packages\n"
+        "packages = find_packages()\n"
+        "setup(packages=packages + ['extra'], py_modules=find_packages())"
+    )
+    assert extract(setup_py)["tool"]["setuptools"] == {
+        "packages": ["package", "extra"],
+        "py-modules": ["package"],
+    }
+
+
+def test_find_packages_from_another_folder(setup_py):
+    # Read statically, the current folder is not the one of setup.py
+    project = setup_py.parent / "nested/project"
+    project.joinpath("src/package").mkdir(parents=True)
+    project.joinpath("src/package/__init__.py").write_text("")
+    project.joinpath("../shared/common").mkdir(parents=True)
+    project.joinpath("../shared/common/__init__.py").write_text("")
+    project.joinpath("setup.py").write_text(
+        "from setuptools import setup, find_packages\n"
+        "setup(packages=find_packages('src'), py_modules=find_packages('../shared'))"
+    )
+    assert extract(project / "setup.py")["tool"]["setuptools"] == {
+        "packages": {"find": {"where": ["src"], "namespaces": False}},
+        "py-modules": ["common"],
+    }
+    assert packages.find_table(False, project / "src", root=project) == {
+        "where": ["src"],
+        "namespaces": False,
+    }
+    assert packages.find_table(False, project / "src", root=project / "src") == {
+        "where": ["."],
+        "namespaces": False,
+    }
+
+
+@pytest.mark.parametrize(
+    "arguments, find",
+    [
+        ({"include": "a*"}, {"include": ["a*"], "namespaces": False}),
+        ({"where": "."}, {"where": ["."], "namespaces": False}),
+        ({"where": ".."}, None),
+        ({"where": 1}, None),
+        ({"exclude": 1}, None),
+        ({"exclude": ["tests", 1]}, None),
+    ],
+)
+def test_find_table(arguments, find):
+    assert packages.find_table(False, **arguments) == find
+
+
+def test_found_packages(setup_py):
+    setup_py.parent.joinpath("package").mkdir()
+    setup_py.parent.joinpath("package", "__init__.py").write_text("")
+    found = packages.FoundPackages(False)
+    assert not found.filled
+    assert ["extra"] + found == ["extra", "package"]
+    assert pickle.loads(pickle.dumps(packages.FoundPackages(False))) == ["package"]
+    # Packages outside of the project can only be converted as found
+    outside = packages.FoundPackages(False, where=os.pardir)
+    assert outside.filled and outside.find is None
+    assert packages.resolve({"packages": outside}) == {"packages": list(outside)}
@@ -0,0 +1,169 @@
+"""Validates the static evaluation of `setup.py`"""
+import pathlib
+
+import pytest
+
+from tomlize.report import EXEC, STATIC, Report
+from tomlize.setup_py.reader import extract_setup_args
+from tomlize.setup_py.remover import CodeTarget
+from tomlize.setup_py.static import NotStaticError, evaluate_setup_args
+
+
+@pytest.fixture
+def setup_py(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / "setup.py"
+
+
+def evaluate(setup_py, source):
+    setup_py.write_text(source)
+    return evaluate_setup_args(setup_py, source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        """
+import setuptools
+version = "1.0.0"
+setuptools.setup(name="package", version=version)
+""",
+        """
+from setuptools import setup as s
+s(**{"name": "package"}, version="1." + "0.0")
+""",
+        """
+try:
+    from setuptools import setup
+except ImportError:
+    from distutils.core import setup
+
+if __name__ == "__main__":
+    setup(name="package", version=f"{1}.0.0")
+""",
+    ],
+)
+def test_declarative_files(setup_py, source):
+    assert evaluate(setup_py, source) == {"name": "package", "version": "1.0.0"}
+
+
+def test_reads_local_files(setup_py):
+    setup_py.parent.joinpath("requirements.txt").write_text("six\nattrs\n")
+    setup_py.parent.joinpath("README.md").write_text("# Readme\n")
+    assert (
+        evaluate(
+            setup_py,
+            """
+import setuptools
+with open("README.md", encoding="utf-8") as f:
+    long_description = f.read()
+setuptools.setup(
+    long_description=long_description,
+    install_requires=open("requirements.txt").read().splitlines(),
+)
+""",
+        )
+        == {"long_description": "# Readme\n", "install_requires": ["six", "attrs"]}
+    )
+
+
+def test_declarative_forms(setup_py):
+    setup_py.parent.joinpath("requirements.txt").write_text("six\nattrs\n")
+    assert (
+        evaluate(
+            setup_py,
+            """
+\"\"\"Docstring\"\"\"
+try:
+    import setuptools
+except ImportError:
+    pass
+name: str = "package"
+version: str
+pass
+with open("requirements.txt") as f:
+    requirements = f.readlines()
+setuptools.setup(
+    name=name,
+    keywords=(*["a"], "b"),
+    platforms={"any"},
+    install_requires=requirements,
+    **{**{"zip_safe": False}},
+)
+""",
+        )
+        == {
+            "name": "package",
+            "keywords": ("a", "b"),
+            "platforms": {"any"},
+            "install_requires": ["six\n", "attrs\n"],
+            "zip_safe": False,
+        }
+    )
+
+
+def test_ignores_unused_unknown_values(setup_py):
+    assert (
+        evaluate(
+            setup_py,
+            """
+import os
+import setuptools
+here = os.path.dirname(__file__)
+setuptools.setup(name="package")
+""",
+        )
+        == {"name": "package"}
+    )
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "THIS IS NOT PYTHON",
+        "import setuptools",
+        "import setuptools\nsetuptools.setup(version=get_version())",
+        "import setuptools\ndeps = []\ndeps.append('six')\nsetuptools.setup()",
+        "import setuptools\ndeps = []\nx = fill(deps)\nsetuptools.setup()",
+        "import setuptools\ndef f(): pass\nsetuptools.setup()",
+        "import setuptools\nsetuptools.setup(long_description=open('missing').read())",
+        "from distutils.core import setup\nsetup(name='package')",
+        "from os import *",
+        "import setuptools\nsetuptools.x = 1",
+        "import setuptools\nsetuptools.x: int = 1",
+        "try:\n    import os\nexcept ImportError:\n    pass",
+        "with 'README.md':\n    pass",
+        "with open('README.md') as (a, b):\n    pass",
+        "import setuptools\nsetuptools.setup()\nsetuptools.setup()",
+        "import setuptools\nsetuptools.setup('package')",
+        "import setuptools\nsetuptools.setup(**['package'])",
+        "import setuptools\nsetuptools.setup(name=f'{1!r}')",
+        "import setuptools\nsetuptools.setup(name=f'{[1]}')",
+        "import setuptools\nsetuptools.setup(name=''.join(*['a']))",
+        "import setuptools\nsetuptools.setup(name='a'.split(1))",
+        "import setuptools\nsetuptools.setup(name=open('a', 'w'))",
+    ],
+)
+def test_not_static(setup_py, source):
+    with pytest.raises(NotStaticError):
+        evaluate(setup_py, source)
+
+
+def test_reports_evaluation(setup_py):
+    setup_py.write_text("import setuptools\nsetuptools.setup(name='package')")
+    report = Report()
+    assert extract_setup_args(setup_py, report=report) == {
+        "name": {"value": "package", "code": CodeTarget(1, 17, 1, 31)}
+    }
+    assert report.evaluations == {setup_py: STATIC}
+
+
+def test_falls_back_to_exec(setup_py):
+    setup_py.write_text(
+        "import setuptools\ndef name(): return 'package'\nsetuptools.setup(name=name())"
+    )
+    report = Report()
+    assert extract_setup_args(setup_py, report=report) == {
+        "name": {"value": "package", "code": CodeTarget(2, 17, 2, 28)}
+    }
+    assert report.evaluations == {pathlib.Path(setup_py): EXEC}
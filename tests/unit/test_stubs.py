@@ -0,0 +1,141 @@
+import os
+import sys
+
+import pytest
+
+from tomlize.exceptions import FailedToParseError
+from tomlize.options import Options
+from tomlize.report import Report
+from tomlize.setup_py import stubs
+from tomlize.setup_py.reader import extract_setup_args
+
+SETUP_PY = """
+import setuptools
+import numpy as np
+from Cython.Build import cythonize
+from Cython.Distutils import build_ext
+
+
+class BuildExt(build_ext):
+    def run(self):
+        super().run()
+
+
+setuptools.setup(
+    name="package",
+    version="1.0.0",
+    description=f"Built with numpy {np.version.version}",
+    include_dirs=[np.get_include()],
+    ext_modules=cythonize(["package/*.pyx"]),
+    cmdclass={"build_ext": BuildExt},
+)
+"""
+
+
+@pytest.fixture
+def setup_py(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    setup_py = tmp_path / "setup.py"
+    setup_py.write_text(SETUP_PY)
+    yield setup_py
+
+
+def test_missing_imports_fail_by_default(setup_py):
+    with pytest.raises(FailedToParseError, match="missing a dependency"):
+        extract_setup_args(setup_py)
+
+
+@pytest.mark.parametrize("fork", [False, True])
+def test_stub_imports(setup_py, caplog, fork):
+    report = Report()
+    data = extract_setup_args(setup_py, Options(stub_imports=True, fork=fork), report)
+    assert {key: value["value"] for key, value in data.items()} == {
+        "name": "package",
+        "version": "1.0.0",
+    }
+    assert report.stubs == {
+        setup_py: {
+            "imports": ["numpy", "Cython", "Cython.Build", "Cython.Distutils"],
+            "arguments": [
+                "description",
+                "include_dirs",
+                "ext_modules",
+                "cmdclass",
+            ],
+        }
+    }
+    assert "Ignoring field ext_modules" in caplog.text
+    assert "Cython.Build" not in sys.modules
+
+
+def test_iterated_stubs_are_derived(tmp_path):
+    setup_py = tmp_path / "setup.py"
+    setup_py.write_text(
+        """
+import setuptools
+import stubmod
+setuptools.setup(
+    name="package",
+    install_requires=list(stubmod.REQS),
+    extras_require={"all": [*stubmod.EXTRAS], "test": ["pytest"]},
+    keywords=sorted(stubmod.KEYWORDS),
+)
+"""
+    )
+    report = Report()
+    data = extract_setup_args(setup_py, Options(stub_imports=True), report)
+    assert list(data) == ["name"]
+    assert report.stubs[setup_py]["arguments"] == [
+        "install_requires",
+        "extras_require",
+        "keywords",
+    ]
+
+
+def test_stub_imports_only_from_namespace():
+    namespace = {"__name__": "__main__"}
+    with stubs.missing_imports(namespace) as stubbed:
+        exec("import not_installed_module", namespace)
+        with pytest.raises(ImportError):
+            exec("import not_installed_elsewhere", {"__name__": "__main__"})
+        with pytest.raises(ImportError):
+            __import__("not_installed_other")
+    assert stubbed == ["not_installed_module"]
+
+
+def test_stub_object():
+    stub = stubs.StubObject("numpy")
+    assert [repr(item) for item in stub.reqs] == ["<stub numpy.reqs[0]>"]
+    assert len(stub) == 1
+    assert repr(stub.version[0]("x").full) == "<stub numpy.version[0]().full>"
+    stub.version = "1.0"
+    assert repr(stub.version) == "<stub numpy.version>"
+    assert not hasattr(stub, "__version__")
+    assert not hasattr(stubs.StubModule("numpy"), "__version__")
+
+    class Extension(stub.Extension):
+        pass
+
+    assert isinstance(Extension("name", sources=[]), stubs.StubClass)
+
+    class Derived(stub.Base):
+        pass
+
+    assert stubs.is_derived(Derived)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1.0.0", False),
+        (["a", {"b": ("c",)}], False),
+        ([stubs.StubObject("a")], True),
+        ("d" + str(stubs.StubObject("a").x), True),
+        (f"{stubs.StubObject('a')}.{stubs.StubObject('b'):>10}", True),
+        ({"key": os.path.join(stubs.StubObject("a"), "b")}, True),
+        ({"key": {stubs.StubObject("a")}}, True),
+        (stubs.StubModule("a"), True),
+    ],
+)
+def test_is_derived(value, expected):
+    assert stubs.is_derived(value) is expected
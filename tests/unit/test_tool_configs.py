@@ -0,0 +1,159 @@
+"""Validates the conversion of the INI configuration of tools"""
+import pytest
+import tomlkit
+
+from tomlize.exceptions import FailedToParseError
+from tomlize.tool_configs import extract
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    return tmp_path
+
+
+def test_tox_ini(config_dir):
+    tox_ini = config_dir / "tox.ini"
+    tox_ini.write_text(
+        """\
+# Environments
+[tox]
+envlist = py311, lint
+
+[testenv]
+commands = pytest {posargs}
+
+[flake8]
+max-line-length = 88
+extend-ignore =
+    E203,
+    W503
+
+[pytest]
+addopts = -ra
+testpaths =
+    tests
+xfail_strict = true
+
+[isort]
+profile = black
+
+[coverage:run]
+branch = true
+omit = */tests/*, setup.py
+
+[coverage:report]
+fail_under = 100
+"""
+    )
+    ret = extract(tox_ini)
+    assert ret["tool"]["flake8"] == {
+        "max-line-length": 88,
+        "extend-ignore": ["E203", "W503"],
+    }
+    assert ret["tool"]["pytest"] == {
+        "ini_options": {
+            "addopts": "-ra",
+            "testpaths": ["tests"],
+            "xfail_strict": "true",
+        }
+    }
+    assert ret["tool"]["isort"] == {"profile": "black"}
+    assert ret["tool"]["coverage"] == {
+        "run": {"branch": True, "omit": ["*/tests/*", "setup.py"]},
+        "report": {"fail_under": 100},
+    }
+    assert ret["tool"]["tox"]["legacy_tox_ini"] == (
+        "[tox]\nenvlist = py311, lint\n\n[testenv]\ncommands = pytest {posargs}\n"
+    )
+    document = tomlkit.document()
+    document.update(ret)
+    assert "legacy_tox_ini = '''[tox]\nenvlist" in tomlkit.dumps(document)
+
+
+def test_tox_ini_repeated_section(config_dir):
+    tox_ini = config_dir / "tox.ini"
+    tox_ini.write_text(
+        "[testenv]\ndeps = pytest\n\n[flake8]\nmax-line-length = 88\n\n"
+        "[testenv]\ncommands = pytest\n"
+    )
+    assert extract(tox_ini)["tool"]["tox"]["legacy_tox_ini"] == (
+        "[testenv]\ndeps = pytest\n\n[testenv]\ncommands = pytest\n"
+    )
+
+
+def test_mypy_ini(config_dir):
+    mypy_ini = config_dir / "mypy.ini"
+    mypy_ini.write_text(
+        """\
+[mypy]
+python_version = 3.11
+strict = True
+
+[mypy-tests.*]
+disallow_untyped_defs = False
+
+[mypy-six.*,yaml]
+ignore_missing_imports = True
+"""
+    )
+    assert extract(mypy_ini) == {
+        "tool": {
+            "mypy": {
+                "python_version": "3.11",
+                "strict": True,
+                "overrides": [
+                    {"module": "tests.*", "disallow_untyped_defs": False},
+                    {"module": ["six.*", "yaml"], "ignore_missing_imports": True},
+                ],
+            }
+        }
+    }
+
+
+def test_coveragerc(config_dir):
+    coveragerc = config_dir / ".coveragerc"
+    coveragerc.write_text(
+        """\
+[run]
+source = tomlize
+
+[paths]
+source =
+    src/
+    */site-packages/
+"""
+    )
+    assert extract(coveragerc) == {
+        "tool": {
+            "coverage": {
+                "run": {"source": ["tomlize"]},
+                "paths": {"source": ["src/", "*/site-packages/"]},
+            }
+        }
+    }
+
+
+def test_isort_cfg(config_dir):
+    isort_cfg = config_dir / ".isort.cfg"
+    isort_cfg.write_text("[settings]\nline_length = 88\n")
+    assert extract(isort_cfg) == {"tool": {"isort": {"line_length": 88}}}
+
+
+def test_unexpected_section_warns(config_dir, caplog):
+    caplog.set_level("WARN")
+    flake8 = config_dir / ".flake8"
+    flake8.write_text("[flake8]\nmax-complexity = 10\n[pycodestyle]\n")
+    assert extract(flake8) == {"tool": {"flake8": {"max-complexity": 10}}}
+    assert caplog.messages == ["Unexpected section found: pycodestyle"]
+
+
+def test_invalid_config(config_dir):
+    pytest_ini = config_dir / "pytest.ini"
+    pytest_ini.write_text("addopts = -ra\n")
+    with pytest.raises(FailedToParseError, match="pytest.ini"):
+        extract(pytest_ini)
+
+
+def test_non_existing_config(config_dir):
+    with pytest.raises(FailedToParseError, match="File not found"):
+        extract(config_dir / "mypy.ini")
@@ -0,0 +1,125 @@
+import os
+from unittest import mock
+
+import pytest
+
+from tomlize import converter
+from tomlize.options import Options
+from tomlize.watch import Watcher, watch
+
+SETUP_PY = """
+import setuptools
+setuptools.setup(name="package", version={version!r}, **{extra})
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write(path, content):
+    """Writes making sure the modification is seen, whatever the mtime resolution"""
+    stat = os.stat(path) if path.exists() else None
+    path.write_text(content)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def make_setup_py(project, version="1.0", extra="{}"):
+    setup_py = project / "setup.py"
+    write(setup_py, SETUP_PY.format(version=version, extra=extra))
+    return setup_py
+
+
+def test_updates_on_changes(project):
+    setup_py = make_setup_py(project)
+    pyproject = project / "pyproject.toml"
+    pyproject.write_text("[tool.black]\nline-length = 88\n")
+    watcher = Watcher(setup_py, pyproject)
+
+    assert watcher.update()
+    assert 'version = "1.0"' in pyproject.read_text()
+    assert not watcher.update()
+
+    make_setup_py(project, version="2.0")
+    assert watcher.update()
+    content = pyproject.read_text()
+    assert 'version = "2.0"' in content
+    assert "line-length = 88" in content
+
+
+def test_only_changed_inputs_are_converted(project):
+    setup_py = make_setup_py(project)
+    (project / "mypy.ini").write_text("[mypy]\nstrict = True\n")
+    watcher = Watcher(setup_py, project / "pyproject.toml")
+    watcher.update()
+
+    with mock.patch.object(converter, "extract", wraps=converter.extract) as extract:
+        write(project / "mypy.ini", "[mypy]\nstrict = False\n")
+        assert watcher.update()
+    extract.assert_called_once_with(project / "mypy.ini", watcher.options, mock.ANY)
+    assert "strict = false" in (project / "pyproject.toml").read_text()
+
+
+def test_files_read_are_watched(project):
+    write(project / "VERSION", "1.0")
+    setup_py = make_setup_py(project, extra='{"version": open("VERSION").read()}')
+    watcher = Watcher(setup_py, project / "pyproject.toml")
+    watcher.update()
+
+    write(project / "VERSION", "3.0")
+    assert watcher.update()
+    assert 'version = "3.0"' in (project / "pyproject.toml").read_text()
+
+
+def test_failures_keep_watching(project, caplog):
+    setup_py = make_setup_py(project)
+    watcher = Watcher(setup_py, project / "pyproject.toml")
+    watcher.update()
+
+    write(setup_py, "THIS IS NOT PYTHON")
+    assert not watcher.update()
+    assert "Failed to convert" in caplog.text
+    make_setup_py(project, version="2.0")
+    assert watcher.update()
+
+
+@pytest.mark.parametrize(
+    ["on_conflict", "updated"], [("error", False), ("overwrite", True)]
+)
+def test_manual_edits_are_kept(project, caplog, on_conflict, updated):
+    setup_py = make_setup_py(project)
+    pyproject = project / "pyproject.toml"
+    watcher = Watcher(setup_py, pyproject, Options(on_conflict=on_conflict))
+    watcher.update()
+
+    write(pyproject, pyproject.read_text() + "\n[tool.black]\nline-length = 88\n")
+    assert not watcher.update()  # Nothing to add
+    # The edited file holds the previous version now
+    make_setup_py(project, version="2.0")
+    assert watcher.update() is updated
+    content = pyproject.read_text()
+    assert "line-length = 88" in content
+    assert ('version = "2.0"' in content) is updated
+    assert ("Conflicting value for 'project.version'" in caplog.text) is not updated
+
+
+def test_removed_inputs_are_dropped(project):
+    setup_py = make_setup_py(project)
+    (project / "mypy.ini").write_text("[mypy]\nstrict = True\n")
+    watcher = Watcher(setup_py, project / "pyproject.toml")
+    watcher.update()
+
+    (project / "mypy.ini").unlink()
+    assert watcher.update()
+    assert list(watcher.extractions) == [setup_py]
+
+
+def test_watch_loop(project):
+    setup_py = make_setup_py(project)
+    with mock.patch("time.sleep", side_effect=[None, KeyboardInterrupt]):
+        with pytest.raises(KeyboardInterrupt):
+            watch(setup_py, project / "pyproject.toml")
+    assert (project / "pyproject.toml").exists()